@@ -0,0 +1,240 @@
+# batch_runner.py
+"""
+Wsadowe rozgrywki bez UI – do balansu bonusów STATES i trudności ROYAL_MISSIONS.
+
+Każda gra to ColonyEngine (ziarno = --seed + numer gry) prowadzony przez prostą politykę (skrypt gracza),
+wołaną co `step` dni aż do horyzontu, śmierci kolonii albo zwycięstwa.
+Gry idą równolegle w ProcessPoolExecutor, a metryki (przeżycie, misje,
+dukaty, krzywa populacji) lądują w CSV albo Parquet (wymaga pandas + pyarrow).
+
+Przykład:
+    python batch_runner.py --policy missions --state england france \
+        --runs 500 --seed 1 --days 3650 --out balance.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import BUILDINGS, SHIP_STATUS_IN_PORT, SHIP_STATUS_TO_EUROPE, STATES
+from engine import GAME_LENGTHS, ColonyEngine
+
+
+# === Polityki (skryptowany gracz) ===
+def policy_idle(engine):
+    """Nic nie robi – punkt odniesienia dla samych bonusów państwa."""
+
+
+def policy_missions(engine):
+    """Wysyła wolny statek z brakującymi towarami misji królewskiej, gdy żaden nie płynie."""
+    if not engine.current_mission:
+        return
+    if engine.ships.count(SHIP_STATUS_TO_EUROPE):
+        return
+
+    end, req, sent, diff, text, idx = engine.current_mission
+    ship_idx = engine.ships.first_with_status(SHIP_STATUS_IN_PORT)
+    if ship_idx is None:
+        return
+
+    room = engine._ship_capacity(engine.ships[ship_idx].ship_type)
+    load = {}
+    for res, amount in req.items():
+        missing = amount - sent.get(res, 0)
+        take = int(min(missing, engine.resources.get(res, 0), room))
+        if take > 0:
+            load[res] = take
+            room -= take
+    if load:
+        engine.send_ship(load, ship_idx)
+
+
+def policy_builder(engine):
+    """Misje jak wyżej + pola uprawne przy głodzie, namioty przy ciasnocie i obsada budynków."""
+    policy_missions(engine)
+
+    daily = engine.daily_production_net()
+    if daily.get("food", 0) - engine.daily_food_need() < 0:
+        pos = _free_tile(engine, "cropland")
+        if pos and engine.can_afford(BUILDINGS["cropland"]["base_cost"]):
+            engine.start_construction_at("cropland", pos)
+
+    if engine.people >= engine.calculate_population_capacity() and engine.can_afford(BUILDINGS["tent"]["base_cost"]):
+        engine.start_construction_at("tent", engine.settlement_pos)
+
+    _staff_buildings(engine)
+
+
+POLICIES = {
+    "idle": policy_idle,
+    "missions": policy_missions,
+    "builder": policy_builder,
+}
+
+
+def _free_tile(engine, name):
+    """Pierwsze odkryte, wolne pole, na którym wolno postawić budynek `name`."""
+    allowed = BUILDINGS[name]["allowed_terrain"]
+    for y, x in engine.map_grid.positions(allowed, discovered=True):
+        if not engine.map_grid[y][x]["building"] and not engine.constructions_at((y, x)):
+            return (y, x)
+    return None
+
+
+def _staff_buildings(engine):
+    """Dokłada wolnych ludzi do budynków do ich limitu."""
+    free = engine.free_workers()
+    changed = False
+    for b in engine.buildings:
+        if free <= 0:
+            break
+        if b.get("is_district") or b["base"] == "tent":
+            continue
+        add = min(free, engine.get_max_workers(b) - b.get("workers", 0))
+        if add > 0:
+            b["workers"] = b.get("workers", 0) + add
+            free -= add
+            changed = True
+    if changed:
+        engine.mark_production_dirty()
+
+
+# === Pojedyncza gra ===
+_worker_loc = None
+
+
+def _engine_for_run(seed):
+    # Localization ładujemy raz na proces, nie raz na grę
+    global _worker_loc
+    engine = ColonyEngine(loc=_worker_loc, seed=seed)
+    _worker_loc = engine.loc
+    return engine
+
+
+def run_game(config):
+    """Jedna gra wg `config` (dict); zwraca wiersz metryk."""
+    seed = config["seed"]
+    engine = _engine_for_run(seed)
+    engine.new_game(config["state"], length_key=config["length"])
+    policy = POLICIES[config["policy"]]
+
+    outcome = {"victory_day": None}
+
+    def on_event(event, **payload):
+        if event == "victory" and outcome["victory_day"] is None:
+            outcome["victory_day"] = engine.days_passed
+
+    engine.subscribe(on_event)
+
+    horizon, step, sample = config["days"], config["step"], config["sample_every"]
+    curve = [engine.people]
+    next_sample = sample
+    while engine.days_passed < horizon and not engine.game_over and outcome["victory_day"] is None:
+        policy(engine)
+        engine.run_days(min(step, horizon - engine.days_passed))
+        while engine.days_passed >= next_sample:
+            curve.append(engine.people)
+            next_sample += sample
+
+    return {
+        "run": config["run"],
+        "seed": seed,
+        "state": config["state"],
+        "policy": config["policy"],
+        "length": config["length"],
+        "days": engine.days_passed,
+        "survived": not engine.game_over,
+        "victory_day": outcome["victory_day"],
+        "people": engine.people,
+        "missions_completed": engine.completed_missions,
+        "ducats": round(engine.resources.get("ducats", 0), 2),
+        "buildings": len(engine.buildings),
+        "population_curve": curve,
+    }
+
+
+def _configs(args):
+    run = 0
+    for state in args.state:
+        for i in range(args.runs):
+            yield {
+                "run": run,
+                "seed": args.seed + i,
+                "state": state,
+                "policy": args.policy,
+                "length": args.length,
+                "days": args.days,
+                "step": args.step,
+                "sample_every": args.sample_every,
+            }
+            run += 1
+
+
+def run_batch(args):
+    configs = list(_configs(args))
+    if args.workers == 1:
+        return [run_game(c) for c in configs]
+
+    chunk = max(1, len(configs) // ((args.workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        return list(pool.map(run_game, configs, chunksize=chunk))
+
+
+# === Zapis metryk ===
+def write_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        for row in rows:
+            # krzywa populacji jako jedna kolumna "p0;p1;p2;..."
+            writer.writerow({**row, "population_curve": ";".join(str(p) for p in row["population_curve"])})
+
+
+def write_parquet(rows, path):
+    import pandas as pd
+    pd.DataFrame(rows).to_parquet(path, index=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowe gry bez UI z metrykami do CSV/Parquet.")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="missions")
+    parser.add_argument("--state", nargs="+", default=["england"],
+                        help="państwo (albo kilka); 'all' = wszystkie ze STATES")
+    parser.add_argument("--length", choices=list(GAME_LENGTHS), default="normal")
+    parser.add_argument("--runs", type=int, default=100, help="liczba gier na państwo")
+    parser.add_argument("--seed", type=int, default=0, help="ziarno pierwszej gry (kolejne: seed+1, ...)")
+    parser.add_argument("--days", type=int, default=3650, help="horyzont w dniach")
+    parser.add_argument("--step", type=int, default=7, help="co ile dni polityka podejmuje decyzje")
+    parser.add_argument("--sample-every", type=int, default=30, help="co ile dni próbka populacji")
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (1 = bez puli)")
+    parser.add_argument("--out", default="batch_runs.csv", help="plik wyników .csv albo .parquet")
+    args = parser.parse_args(argv)
+
+    if "all" in args.state:
+        args.state = list(STATES)
+    unknown = [s for s in args.state if s not in STATES]
+    if unknown:
+        parser.error(f"nieznane państwo: {', '.join(unknown)}")
+    if args.out.endswith(".parquet"):
+        try:
+            import pandas  # noqa: F401
+        except ImportError:
+            parser.error("zapis do Parquet wymaga pandas (i pyarrow)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rows = run_batch(args)
+    if args.out.endswith(".parquet"):
+        write_parquet(rows, args.out)
+    else:
+        write_csv(rows, args.out)
+
+    survived = sum(r["survived"] for r in rows)
+    print(f"{len(rows)} gier → {args.out} (przeżyło: {survived})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
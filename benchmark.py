@@ -0,0 +1,253 @@
+# benchmark.py
+"""
+Pomiary gorących ścieżek symulacji na sztucznych koloniach (bez UI).
+
+Dla każdego scenariusza (liczba budynków × statków × plemion) budujemy
+kolonię od razu „dojrzałą”: obsadzone budynki na różnych poziomach, statki
+w porcie i w drodze, pełne magazyny. Każdy przypadek mierzymy `--repeat`
+razy na świeżej kolonii (budowa nie wlicza się do czasu):
+
+    advance_1 / advance_7 / advance_365   advance_date + tick o N dni
+    production                            calculate_production()
+    display                               odczyty silnika z update_display
+                                          (pojemność, wolni ludzie, magazyny, bilans)
+    ships                                 process_arriving_ships(), gdy całej flocie minęły daty
+
+Wyniki (min i mediana w ms) lądują w JSON-ie z hashem commita – drugi plik
+podany w --compare pokazuje różnice między commitami.
+
+Przykład:
+    python benchmark.py --out bench/HEAD.json
+    python benchmark.py --buildings 1000 --ships 50 --tribes 6 --compare bench/HEAD.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import product
+
+from constants import BUILDINGS, SHIP_STATUS_TO_EUROPE, TRIBE_DISPLAY_KEYS
+from engine import ColonyEngine
+from fleet import Fleet, Ship
+from native_economy import NativeEconomy
+
+# domyślne scenariusze: (budynki, statki, plemiona)
+DEFAULT_SCENARIOS = [(10, 1, 3), (100, 10, 4), (1000, 50, 6)]
+
+# budynki produkcyjne, które wkładamy do sztucznej kolonii (po kolei, w kółko)
+COLONY_MIX = [
+    "cropland", "lumber_camp", "hunting_camp", "herb_garden", "mine", "tannery",
+    "herbal_clinic", "field_forge", "sugarcane_plantation", "manual_sugar_mill",
+    "tobacco_plantation", "tobacco_drying_house", "tent",
+]
+
+
+# === Sztuczna kolonia ===
+_bench_loc = None
+
+
+def make_colony(n_buildings, n_ships, n_tribes, seed=0):
+    """ColonyEngine z n_buildings obsadzonymi budynkami, n_ships statkami i n_tribes plemionami."""
+    global _bench_loc
+    engine = ColonyEngine(loc=_bench_loc, seed=seed)
+    _bench_loc = engine.loc
+    # mapa na tyle duża, żeby budynki nie tłoczyły się na kilku polach
+    map_size = max(8, int((n_buildings / 4) ** 0.5) + 1)
+    engine.new_game("england", map_size=map_size)
+
+    rng = engine.rng("world")
+    cells_by_terrain = {}
+    for y, row in enumerate(engine.map_grid):
+        for x, cell in enumerate(row):
+            cells_by_terrain.setdefault(cell["terrain"], []).append((y, x))
+
+    workers = 0
+    for i in range(n_buildings):
+        base = COLONY_MIX[i % len(COLONY_MIX)]
+        data = BUILDINGS[base]
+        cells = [p for t in data["allowed_terrain"] for p in cells_by_terrain.get(t, ())]
+        pos = rng.choice(cells) if cells else engine.settlement_pos
+        b = {"base": base, "level": rng.randint(0, len(data["upgrades"])), "workers": 0, "pos": pos}
+        if base == "mine":
+            b["resource"] = engine.map_grid[pos[0]][pos[1]].get("resource") or "iron"
+        engine.buildings.add(b)
+        b["workers"] = 0 if base == "tent" else engine.get_max_workers(b)
+        workers += b["workers"]
+        engine.map_grid.add_building(pos[0], pos[1], b["id"])
+
+    engine.people = workers + 10
+    engine.resources = {r: 5000 for r in engine.resources}
+
+    # połowa floty w porcie, reszta płynie do Europy z rozłożonymi datami
+    ships = []
+    for i in range(n_ships):
+        if i % 2 == 0:
+            ships.append(Ship(name=f"Bench {i}"))
+        else:
+            arrival = engine.current_date + timedelta(days=1 + i % 60)
+            ships.append(Ship(arrival_to_eu=arrival, load={"wood": 10}, status=SHIP_STATUS_TO_EUROPE,
+                              name=f"Bench {i}"))
+    engine.ships = Fleet(ships)
+    engine.flagship_index = 0
+
+    tribes = list(TRIBE_DISPLAY_KEYS)[:n_tribes]
+    engine.native_relations = {tribe: 50 for tribe in tribes}
+    engine.native_trade_value = {tribe: 0 for tribe in tribes}
+    engine.natives = NativeEconomy.roll(tribes, rng)
+    engine.native_missions_next = {}
+    # od razu aktywny system misji indiańskich
+    engine.native_missions_enabled_start = engine.current_date
+
+    engine.mark_production_dirty()
+    engine.rebuild_schedule()
+    return engine
+
+
+# === Przypadki ===
+def _advance(days):
+    def run(engine):
+        engine.advance_date(days)
+        engine.tick()
+    return run
+
+
+def _production(engine):
+    engine.calculate_production()
+
+
+def _display(engine):
+    # to samo, o co pytają _refresh_population/resource/net_labels w main.py
+    engine.calculate_population_capacity()
+    engine.free_workers()
+    engine.calculate_storage_limits()
+    engine.daily_production_net()
+
+
+def _prepare_ships(engine):
+    engine.current_date += timedelta(days=120)
+
+
+def _ships(engine):
+    engine.process_arriving_ships()
+
+
+# nazwa → (przygotowanie poza pomiarem albo None, mierzona funkcja)
+CASES = {
+    "advance_1": (None, _advance(1)),
+    "advance_7": (None, _advance(7)),
+    "advance_365": (None, _advance(365)),
+    "production": (None, _production),
+    "display": (None, _display),
+    "ships": (_prepare_ships, _ships),
+}
+
+
+def time_case(scenario, case, repeat, seed):
+    prepare, run = CASES[case]
+    samples = []
+    for i in range(repeat):
+        engine = make_colony(*scenario, seed=seed + i)
+        if prepare:
+            prepare(engine)
+        start = time.perf_counter()
+        run(engine)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(samples), 4), "median_ms": round(statistics.median(samples), 4)}
+
+
+def run_suite(scenarios, cases, repeat=5, seed=0, progress=None):
+    results = {}
+    for scenario in scenarios:
+        key = "b{}_s{}_t{}".format(*scenario)
+        results[key] = {}
+        for case in cases:
+            results[key][case] = time_case(scenario, case, repeat, seed)
+            if progress:
+                progress(key, case, results[key][case])
+    return results
+
+
+# === Zapis / porównanie ===
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def write_results(results, path, repeat):
+    payload = {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results,
+    }
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def compare(results, baseline_path):
+    """Wiersze (scenariusz, przypadek, stary ms, nowy ms, stosunek) dla wspólnych pomiarów (mediany)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    rows = []
+    for key, cases in results.items():
+        for case, new in cases.items():
+            old = baseline.get(key, {}).get(case)
+            if old:
+                ratio = new["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+                rows.append((key, case, old["median_ms"], new["median_ms"], ratio))
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pomiary czasu symulacji na sztucznych koloniach.")
+    parser.add_argument("--buildings", type=int, nargs="+", help="liczby budynków (domyślnie scenariusze 10/100/1000)")
+    parser.add_argument("--ships", type=int, nargs="+", default=[10], help="liczby statków (z --buildings)")
+    parser.add_argument("--tribes", type=int, nargs="+", default=[3], help="liczby plemion, 1–6 (z --buildings)")
+    parser.add_argument("--case", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5, help="pomiarów na przypadek (każdy na świeżej kolonii)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="plik JSON z wynikami (domyślnie bench/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="wcześniejszy plik JSON do porównania")
+    args = parser.parse_args(argv)
+
+    if args.buildings:
+        args.scenarios = list(product(args.buildings, args.ships, args.tribes))
+    else:
+        args.scenarios = DEFAULT_SCENARIOS
+    if any(not 1 <= t <= len(TRIBE_DISPLAY_KEYS) for _, _, t in args.scenarios):
+        parser.error(f"liczba plemion musi być w zakresie 1–{len(TRIBE_DISPLAY_KEYS)}")
+    if args.out is None:
+        args.out = os.path.join("bench", f"{_git_commit() or 'local'}.json")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def progress(key, case, r):
+        print(f"{key:<20} {case:<12} min {r['min_ms']:>10.3f} ms   mediana {r['median_ms']:>10.3f} ms")
+
+    results = run_suite(args.scenarios, args.case, repeat=args.repeat, seed=args.seed, progress=progress)
+    write_results(results, args.out, args.repeat)
+    print(f"wyniki → {args.out}")
+
+    if args.compare:
+        for key, case, old, new, ratio in compare(results, args.compare):
+            print(f"{key:<20} {case:<12} {old:>10.3f} → {new:>10.3f} ms  (x{ratio:.2f})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
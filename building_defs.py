@@ -0,0 +1,139 @@
+# building_defs.py
+"""
+Skompilowane definicje budynków: jeden płaski rekord na (budynek, poziom).
+
+BUILDINGS w constants.py to zagnieżdżone dicty z zapasowymi kluczami
+("prod" albo "base_prod" w ulepszeniu, "workers" albo "base_workers"
+z poziomu bazowego, "name"/"name_key"/klucz domyślny…). Rozwiązujemy je
+raz, przy imporcie modułu, do BuildingLevel – symulacja pyta potem
+o jeden rekord zamiast przechodzić po słownikach.
+
+Premie państw (STATES) zależą od państwa gracza i od surowca, który
+budynek faktycznie daje (kopalnia – surowiec z pola), więc składamy je
+osobno: production_terms(state) zwraca tablicę (budynek, poziom, surowiec
+kopalni) → składniki produkcji z wliczoną premią, budowaną raz na państwo.
+"""
+from constants import BUILDINGS, MINE_RESOURCES, STATES
+
+
+class BuildingLevel:
+    __slots__ = ("base", "level", "prod", "cons", "max_workers", "capacity",
+                 "food_limit", "goods_limit", "name_key")
+
+    def __init__(self, base, level, prod, cons, max_workers, capacity, food_limit, goods_limit, name_key):
+        self.base = base
+        self.level = level
+        # ((surowiec, ilość na pracownika), ...) w kolejności: poziom bazowy, ulepszenie
+        self.prod = prod
+        self.cons = cons
+        self.max_workers = max_workers
+        self.capacity = capacity
+        self.food_limit = food_limit
+        self.goods_limit = goods_limit
+        self.name_key = name_key
+
+    def __repr__(self):
+        return f"BuildingLevel({self.base!r}, {self.level})"
+
+
+def _compile_level(base_key, base_def, level):
+    upgrades = base_def.get("upgrades", [])
+
+    # standardowo: klucz "prod" jak w innych budynkach;
+    # ale gdybyś w kopalni trzymał to w "base_prod", też to złapiemy
+    sources = [base_def.get("base_prod", {})]
+    food_limit = base_def.get("food_limit", 0)
+    goods_limit = base_def.get("goods_limit", 0)
+    max_workers = base_def.get("base_workers", 0)
+    capacity = base_def.get("capacity", 0)
+    raw_name = base_def.get("name") or base_def.get("name_key") or f"building.{base_key}.name"
+
+    if level > 0:
+        up = upgrades[level - 1]
+        sources.append(up.get("prod", up.get("base_prod", {})))
+        food_limit += up.get("food_limit", 0)
+        goods_limit += up.get("goods_limit", 0)
+        max_workers = up.get("workers", max_workers)
+        capacity = up.get("capacity", 0)
+        raw_name = up.get("name") or up.get("name_key") or f"building.{base_key}.upgrade.level_{level}"
+
+    prod = tuple((res, amt) for source in sources for res, amt in source.items())
+    # zużycie tylko z poziomu bazowego
+    cons = tuple(base_def.get("consumes", {}).items())
+    return BuildingLevel(base_key, level, prod, cons, max_workers, capacity, food_limit, goods_limit, raw_name)
+
+
+def compile_buildings(buildings):
+    """{(budynek, poziom): BuildingLevel} dla poziomu 0 i każdego ulepszenia."""
+    table = {}
+    for base_key, base_def in buildings.items():
+        for level in range(len(base_def.get("upgrades", [])) + 1):
+            table[(base_key, level)] = _compile_level(base_key, base_def, level)
+    return table
+
+
+BUILDING_LEVELS = compile_buildings(BUILDINGS)
+
+
+def building_level(base, level=0):
+    """Rekord (budynek, poziom); poziom spoza definicji → poziom bazowy (nie powinno się zdarzyć)."""
+    rec = BUILDING_LEVELS.get((base, level))
+    return rec if rec is not None else BUILDING_LEVELS[(base, 0)]
+
+
+# === Premie państw ===
+def production_bonus(state, base, target_res):
+    bonus = 1.0
+    # premie państw zależne od surowca (po mapowaniu)
+    if state == "sweden" and target_res == "wood":
+        bonus = STATES[state]["wood"]
+    if state == "denmark" and target_res == "food":
+        bonus = STATES[state]["food"]
+    if state == "brandenburg" and target_res == "steel":
+        bonus = STATES[state]["steel"]
+
+    # bonus Genui dla wszystkich kopalń
+    if state == "genua" and base == "mine":
+        bonus *= STATES[state].get("mine", 1.0)
+    return bonus
+
+
+def _state_terms(state, rec, resource):
+    terms = []
+    for res, amt in rec.prod:
+        # dla kopalni: zamiast sztucznego zasobu z constants
+        # używamy faktycznego surowca z pola (węgiel/żelazo/srebro/złoto)
+        target_res = resource if rec.base == "mine" and resource else res
+        terms.append((target_res, amt, production_bonus(state, rec.base, target_res)))
+    return tuple(terms)
+
+
+_STATE_TERMS = {}
+
+
+def production_terms(state):
+    """
+    {(budynek, poziom, surowiec kopalni albo None): ((surowiec, ilość na pracownika, premia), ...)}
+    dla państwa `state`; kompilowane przy pierwszym użyciu i trzymane do końca procesu.
+    """
+    table = _STATE_TERMS.get(state)
+    if table is None:
+        table = {}
+        for (base, level), rec in BUILDING_LEVELS.items():
+            table[(base, level, None)] = _state_terms(state, rec, None)
+            if base == "mine":
+                for resource in MINE_RESOURCES:
+                    table[(base, level, resource)] = _state_terms(state, rec, resource)
+        _STATE_TERMS[state] = table
+    return table
+
+
+def building_terms(state, base, level=0, resource=None):
+    """Składniki produkcji budynku dla państwa `state` – jeden odczyt z tablicy production_terms()."""
+    table = production_terms(state)
+    key = (base, level, resource if base == "mine" else None)
+    terms = table.get(key)
+    if terms is None:
+        # poziom spoza definicji albo nietypowy surowiec kopalni (np. ze starego zapisu)
+        terms = table[key] = _state_terms(state, building_level(base, level), key[2])
+    return terms
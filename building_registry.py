@@ -0,0 +1,51 @@
+# building_registry.py
+"""
+Rejestr budynków kolonii pod stałymi identyfikatorami.
+
+Budynek (dict) dostaje przy dodaniu pole "id", które nie zmienia się do
+końca gry – nawet gdy wcześniejsze budynki zostaną zburzone. Ulepszenia
+w toku i pola mapy (cell["building"]) trzymają tylko te id, więc wyszukanie
+budynku to jeden odczyt ze słownika, a zapis gry nie powiela budynków.
+
+Iteracja idzie po budynkach (dictach) w kolejności dodania, jak po dawnej liście.
+"""
+
+
+class BuildingRegistry:
+
+    def __init__(self, buildings=(), next_id=1):
+        self._by_id = {}
+        self.next_id = next_id
+        for b in buildings:
+            self.add(b)
+
+    def add(self, b):
+        """Dodaje budynek; nadaje mu nowe id, jeśli nie ma własnego (albo jest zajęte)."""
+        building_id = b.get("id")
+        if not isinstance(building_id, int) or building_id in self._by_id:
+            building_id = self.next_id
+            b["id"] = building_id
+        self.next_id = max(self.next_id, building_id + 1)
+        self._by_id[building_id] = b
+        return building_id
+
+    def remove(self, building_id):
+        return self._by_id.pop(building_id)
+
+    def get(self, building_id, default=None):
+        return self._by_id.get(building_id, default)
+
+    def ids(self):
+        return list(self._by_id)
+
+    def __getitem__(self, building_id):
+        return self._by_id[building_id]
+
+    def __contains__(self, building_id):
+        return building_id in self._by_id
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __len__(self):
+        return len(self._by_id)
@@ -1,413 +1,12 @@
 # buildings.py
 import tkinter as tk
 from tkinter import ttk
-from datetime import timedelta
 
 from constants import BUILDINGS, RESOURCES, STATES, RESOURCE_DISPLAY_KEYS
 from tooltip import Tooltip
 
 
 class BuildingsMixin:
-    # === Pomocnicze dot. osady / pól ===
-    def get_settlement_areas(self):
-        return [
-            (y, x)
-            for y in range(self.map_size)
-            for x in range(self.map_size)
-            if self.map_grid[y][x]["terrain"] in ["settlement", "district"]
-        ]
-
-    def get_free_settlement_slots(self):
-        total = 0
-        for y in range(self.map_size):
-            for x in range(self.map_size):
-                cell = self.map_grid[y][x]
-                if cell["terrain"] not in ["settlement", "district"]:
-                    continue
-                used = len([b for b in cell["building"] if not b.get("is_district", False)])
-                in_progress = [c for c in self.constructions if c[1]["pos"] == (y, x)]
-                used += len(in_progress)
-                total += max(0, 5 - used)
-        return total
-
-    def get_buildings_in_cell(self, pos):
-        y, x = pos
-        return self.map_grid[y][x]["building"]
-
-    def is_adjacent_to_settlement(self, pos):
-        y, x = pos
-        for dy, dx in [
-            (0, 1),
-            (1, 0),
-            (0, -1),
-            (-1, 0),
-            (1, 1),
-            (1, -1),
-            (-1, 1),
-            (-1, -1),
-        ]:
-            ny, nx = y + dy, x + dx
-            if 0 <= ny < self.map_size and 0 <= nx < self.map_size:
-                if self.map_grid[ny][nx]["terrain"] in ["settlement", "district"]:
-                    return True
-        return False
-
-    # === Nazwa budynku na podstawie poziomu (tent -> chata -> dom) ===
-    def get_building_display_name(self, b):
-        base_data = BUILDINGS[b["base"]]
-        level = b.get("level", 0)
-
-        # --- nazwa z upgrade'u (poziom 1+) ---
-        if level > 0 and level <= len(base_data.get("upgrades", [])):
-            up = base_data["upgrades"][level - 1]
-            raw = up.get("name") or up.get("name_key") or f"building.{b['base']}.upgrade.level_{level}"
-            return self.loc.t(raw, default=b["base"])
-
-        # --- nazwa bazowa (poziom 0) ---
-        raw = base_data.get("name") or base_data.get("name_key") or f"building.{b['base']}.name"
-        return self.loc.t(raw, default=b["base"])
-
-    # === Pojemność populacji (z budynków mieszkalnych) ===
-    def calculate_population_capacity(self):
-        from constants import BUILDINGS
-
-        total = 0
-        base_data = BUILDINGS["tent"]
-
-        for b in self.buildings:
-            if b["base"] != "tent":
-                continue
-
-            level = b.get("level", 0)
-
-            # --- poziom 0 ---
-            if level == 0:
-                total += base_data.get("capacity", 0)
-
-            # --- poziomy 1+ ---
-            else:
-                upgrades = base_data.get("upgrades", [])
-                if 1 <= level <= len(upgrades):
-                    total += upgrades[level - 1].get("capacity", 0)
-                else:
-                    # fallback – nie powinno się zdarzyć
-                    total += base_data.get("capacity", 0)
-
-        return total
-
-    # === Produkcja ===
-    def calculate_production(self):
-        building_output = []
-
-        for b in self.buildings:
-            if b.get("is_district"):
-                continue
-
-            base = BUILDINGS[b["base"]]
-            level = b.get("level", 0)
-            workers = b.get("workers", 0)
-
-            if not workers:
-                building_output.append((b, {r: 0 for r in RESOURCES}, {}, 0.0))
-                continue
-
-            prod = {}
-
-            # --- produkcja bazowa ---
-            for res, amt in base.get("base_prod", {}).items():
-                # dla kopalni: zamiast sztucznego zasobu z constants
-                # używamy faktycznego surowca z pola (węgiel/żelazo/srebro/złoto)
-                target_res = res
-                if b["base"] == "mine" and b.get("resource"):
-                    target_res = b["resource"]
-
-                bonus = 1.0
-                # premie państw zależne od surowca (po mapowaniu)
-                if self.state == "sweden" and target_res == "wood":
-                    bonus = STATES[self.state]["wood"]
-                if self.state == "denmark" and target_res == "food":
-                    bonus = STATES[self.state]["food"]
-                if self.state == "brandenburg" and target_res == "steel":
-                    bonus = STATES[self.state]["steel"]
-
-                # bonus Genui dla wszystkich kopalń
-                if self.state == "genua" and b["base"] == "mine":
-                    bonus *= STATES[self.state].get("mine", 1.0)
-
-                prod[target_res] = prod.get(target_res, 0) + amt * workers * bonus
-
-            # --- ulepszenia (poziomy 1+) ---
-            if level > 0:
-                up = base["upgrades"][level - 1]
-
-                # standardowo: klucz "prod" jak w innych budynkach;
-                # ale gdybyś w kopalni trzymał to w "base_prod", też to złapiemy
-                upgrade_prod = up.get("prod", up.get("base_prod", {}))
-
-                for res, amt in upgrade_prod.items():
-                    target_res = res
-                    if b["base"] == "mine" and b.get("resource"):
-                        target_res = b["resource"]
-
-                    bonus = 1.0
-                    if self.state == "sweden" and target_res == "wood":
-                        bonus = STATES[self.state]["wood"]
-                    if self.state == "denmark" and target_res == "food":
-                        bonus = STATES[self.state]["food"]
-                    if self.state == "brandenburg" and target_res == "steel":
-                        bonus = STATES[self.state]["steel"]
-
-                    if self.state == "genua" and b["base"] == "mine":
-                        bonus *= STATES[self.state].get("mine", 1.0)
-
-                    prod[target_res] = prod.get(target_res, 0) + amt * workers * bonus
-
-            # --- konsumpcja surowców ---
-            cons = {}
-            if "consumes" in base:
-                for res, amt in base["consumes"].items():
-                    cons[res] = amt * workers
-
-            # --- sprawdzenie, czy starcza surowców (wydajność) ---
-            efficiency = 1.0
-            for res, needed in cons.items():
-                available = self.resources.get(res, 0)
-                if needed > 0 and available < needed:
-                    efficiency = min(efficiency, available / needed)
-
-            building_output.append((b, prod, cons, efficiency))
-
-        return building_output
-
-    def get_max_workers(self, b):
-        base = BUILDINGS[b["base"]]
-        level = b.get("level", 0)
-        if level == 0:
-            return base["base_workers"]
-        upgrade = base["upgrades"][level - 1]
-        return upgrade.get("workers", base["base_workers"])
-
-    # === Budowa ===
-    def start_construction_at(self, name, pos):
-        y, x = pos
-        data = BUILDINGS[name]
-        cell = self.map_grid[y][x]
-
-        if cell["terrain"] not in data.get("allowed_terrain", []):
-            self.log(
-                self.loc.t(
-                    "log.cannot_build_here",
-                    building=self.loc.t(f"building.{name}.name", default=name),
-                    terrain=self.loc.t(f"terrain.{cell['terrain']}.name", default=cell["terrain"])
-                ),
-                "red"
-            )
-            return
-
-        if data.get("requires_settlement"):
-            if cell["terrain"] not in ["settlement", "district"]:
-                self.log(self.loc.t("ui.must_be_in_settlement"), "red")
-                return
-            used = len([b for b in cell["building"] if not b.get("is_district", False)])
-            in_progress = [c for c in self.constructions if c[1]["pos"] == (y, x)]
-            if used + len(in_progress) >= 5:
-                self.log(self.loc.t("ui.no_space_in_settlement"), "red")
-                return
-        else:
-            if cell["building"]:
-                self.log(self.loc.t("log.building_already_exists"), "red")
-                return
-            if any(c[1]["pos"] == (y, x) for c in self.constructions):
-                self.log(self.loc.t("log.construction_in_progress_here"), "red")
-                return
-
-        if data.get("requires_adjacent_settlement"):
-            if not self.is_adjacent_to_settlement(pos):
-                self.log(self.loc.t("log.requires_adjacent_settlement"), "red")
-                return
-            if cell["terrain"] == "sea" and name != "harbor":
-                self.log(self.loc.t("log.cannot_build_on_sea"), "red")
-                return
-
-        if not self.can_afford(data["base_cost"]):
-            self.log(self.loc.t("log.not_enough_resources"), "red")
-            return
-        if self.free_workers() < data["base_workers"]:
-            self.log(self.loc.t("ui.not_enough_workers"), "red")
-            return
-
-        self.spend_resources(data["base_cost"])
-        start_date = self.current_date
-        end_date = start_date + timedelta(days=data["build_time"])
-        new_b = {"base": name, "level": 0, "workers": 0, "pos": pos}
-        if name == "mine":
-            new_b["resource"] = cell["resource"]
-        if name == "district":
-            new_b["is_district"] = True
-            cell["terrain"] = "district"
-        if name == "tent":
-            new_b["capacity"] = 4
-
-        self.constructions.append((end_date, new_b, data["base_workers"], start_date))
-        self.busy_people += data["base_workers"]
-        name = self.get_building_display_name(new_b)
-        self.log(
-            self.loc.t(
-                "log.construction_started",
-                building=name,
-                date=end_date.strftime('%d %b %Y')
-            ),
-            "blue"
-        )
-
-    # === Ulepszenia (w górę) ===
-    def start_upgrade(self, building_idx):
-        b = self.buildings[building_idx]
-        base_data = BUILDINGS[b["base"]]
-        current_level = b.get("level", 0)
-
-        # 🔒 jeśli ten budynek już ma ulepszenie w toku – nie zaczynamy kolejnego
-        if any(u[1] == building_idx for u in self.upgrades_in_progress):
-            self.log(self.loc.t("ui.building_already_in_progress"), "red")
-            return
-
-        if current_level >= len(base_data["upgrades"]):
-            self.log(self.loc.t("ui.max_level_reached"), "red")
-            return
-
-        upgrade = base_data["upgrades"][current_level]
-        cost = upgrade.get("cost", {})
-        workers_needed = upgrade.get("workers", 1)
-        build_time = upgrade.get("build_time", 7)
-
-        if self.state == "netherlands":
-            mult = STATES[self.state]["build_cost"]  # np. 0.8
-            cost = {k: int(v * mult) for k, v in cost.items()}
-
-        if not self.can_afford(cost):
-            self.log(self.loc.t("log.not_enough_resources"), "red")
-            return
-        if self.free_workers() < workers_needed:
-            self.log(self.loc.t("ui.not_enough_workers"), "red")
-            return
-
-        self.spend_resources(cost)
-        start_date = self.current_date
-        end_date = start_date + timedelta(days=build_time)
-
-        # (end_date, building_idx, new_level, start_date)
-        self.upgrades_in_progress.append((end_date, building_idx, current_level + 1, start_date))
-        self.busy_people += workers_needed
-
-        self.log(
-            self.loc.t(
-                "log.upgrading_started",
-                building=self.get_building_display_name(b),
-                level=current_level + 1,
-                date=end_date.strftime('%d %b %Y')
-            ),
-            "purple",
-        )
-
-    # === Degradacja / zburzenie (w dół) ===
-    def degrade_or_demolish(self, building_idx):
-        b = self.buildings[building_idx]
-        base_data = BUILDINGS[b["base"]]
-        level = b.get("level", 0)
-        y, x = b["pos"]
-
-        # 🔄 jeśli jest trwające ulepszenie tego budynku – przerwij je
-        to_cancel = [u for u in self.upgrades_in_progress if u[1] == building_idx]
-        for u in to_cancel:
-            _, _, new_level, _ = u
-            prev_level = new_level - 1
-            upgrades = base_data.get("upgrades", [])
-            workers_needed = 1
-            if 0 <= prev_level < len(upgrades):
-                workers_needed = upgrades[prev_level].get("workers", 1)
-            self.busy_people -= workers_needed
-            self.upgrades_in_progress.remove(u)
-        if to_cancel:
-            self.log(self.loc.t("ui.upgrade_cancelled_no_refund"), "orange")
-
-        # DEGRADACJA POZIOMU (zwraca 50% kosztu poprzedniego ulepszenia)
-        if level > 0:
-            prev_upgrade = base_data["upgrades"][level - 1]
-            prev_cost = prev_upgrade.get("cost", {})
-            for r, a in prev_cost.items():
-                self.resources[r] = self.resources.get(r, 0) + a // 2
-
-            new_level = level - 1
-            b["level"] = new_level
-
-            # po degradacji dopasuj capacity, jeśli zdefiniowane
-            if new_level > 0:
-                new_up = base_data["upgrades"][new_level - 1]
-                if "capacity" in new_up:
-                    b["capacity"] = new_up["capacity"]
-            else:
-                if b["base"] == "tent":
-                    b["capacity"] = BUILDINGS["tent"].get("capacity", 4)
-
-            current_name = self.get_building_display_name(b)
-            self.log(
-                self.loc.t(
-                    "log.building_downgraded",
-                    level=new_level,
-                    building=current_name
-                ),
-                "orange",
-            )
-            return
-
-        # ZBURZENIE BUDYNKU (poziom 0, zwrot 50% kosztu budowy)
-        base_cost = base_data.get("base_cost", {})
-        for r, a in base_cost.items():
-            self.resources[r] = self.resources.get(r, 0) + a // 2
-
-        self.buildings.pop(building_idx)
-        self.map_grid[y][x]["building"] = [bb for bb in self.map_grid[y][x]["building"] if bb is not b]
-        self.log(self.loc.t("log.building_demolished_refund"), "orange")
-
-    def cancel_upgrade(self, building_idx):
-        """Anuluje trwające ulepszenie budynku, zwraca 100% surowców i zwalnia ludzi."""
-        b = self.buildings[building_idx]
-        base_data = BUILDINGS[b["base"]]
-
-        # znajdź ulepszenia w toku dotyczące tego budynku
-        to_cancel = [u for u in self.upgrades_in_progress if u[1] == building_idx]
-
-        if not to_cancel:
-            self.log(self.loc.t("log.no_upgrade_to_cancel"), "red")
-            return
-
-        for u in to_cancel:
-            end_date, idx, new_level, start_date = u
-
-            prev_level = new_level - 1
-            upgrades = base_data.get("upgrades", [])
-
-            # --- zwrot surowców ---
-            if 0 <= prev_level < len(upgrades):
-                original_cost = upgrades[prev_level].get("cost", {}).copy()
-
-                # uwzględnij bonus Holandii (koszty budowy -20%)
-                if self.state == "netherlands":
-                    mult = STATES[self.state]["build_cost"]  # np. 0.8
-                    original_cost = {k: int(v * mult) for k, v in original_cost.items()}
-
-                # zwracamy 100%
-                for r, a in original_cost.items():
-                    self.resources[r] = self.resources.get(r, 0) + a
-
-            # --- zwrot robotników ---
-            workers_used = upgrades[prev_level].get("workers", 1) if 0 <= prev_level < len(upgrades) else 1
-            self.busy_people -= workers_used
-
-            # usuń zadanie ulepszenia
-            self.upgrades_in_progress.remove(u)
-
-        self.log(self.loc.t("log.upgrade_cancelled_refunded"), "orange")
 
     # === Menu: Ulepsz/Zdegraduj (jeden przycisk) ===
     def show_upgrade_menu(self):
@@ -424,7 +23,8 @@ class BuildingsMixin:
         ).pack(pady=10)
 
         has_any = False
-        for i, b in enumerate(self.buildings):
+        for b in self.buildings:
+            i = b["id"]
             if b.get("is_district"):
                 continue
 
@@ -433,7 +33,7 @@ class BuildingsMixin:
             level = b.get("level", 0)
             current_name = self.get_building_display_name(b)
 
-            in_progress = any(u[1] == i for u in self.upgrades_in_progress)
+            in_progress = self.is_upgrading(i)
 
             frame = ttk.Frame(win)
             frame.pack(fill="x", padx=20, pady=3)
@@ -725,7 +325,7 @@ class BuildingsMixin:
         title_font = getattr(self, "top_title_font", ("Cinzel", 14, "bold"))
 
         self.worker_sliders = []
-        for i, b in enumerate(self.buildings):
+        for b in self.buildings:
             if b["base"] in ["district", "tent"]:
                 continue
 
@@ -747,7 +347,7 @@ class BuildingsMixin:
             scale.set(b.get("workers", 0))
             scale.pack(side="right")
 
-            self.worker_sliders.append((i, scale))
+            self.worker_sliders.append((b["id"], scale))
 
         # jeśli nie ma żadnych miejsc pracy
         if not self.worker_sliders:
@@ -767,7 +367,7 @@ class BuildingsMixin:
 
         def save():
             # ile ludzi pracuje teraz (przed zmianą suwaków)
-            current_total = sum(self.buildings[idx].get("workers", 0) for idx, _ in self.worker_sliders)
+            current_total = sum(self.buildings[bid].get("workers", 0) for bid, _ in self.worker_sliders)
 
             # ile będzie pracować po zmianie suwaków
             new_total = sum(s.get() for _, s in self.worker_sliders)
@@ -781,8 +381,9 @@ class BuildingsMixin:
                 return
 
             # zapisujemy nowe wartości
-            for idx, scale in self.worker_sliders:
-                self.buildings[idx]["workers"] = scale.get()
+            for bid, scale in self.worker_sliders:
+                self.buildings[bid]["workers"] = scale.get()
+            self.mark_production_dirty(*(bid for bid, _ in self.worker_sliders))
 
             self.log(self.loc.t("log.workers_assigned"), "green")
 
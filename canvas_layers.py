@@ -0,0 +1,95 @@
+# canvas_layers.py
+"""
+Trwałe warstwy elementów Canvas – jedna lista elementów na pole mapy.
+
+Zamiast canvas.delete("all") i tworzenia wszystkiego od nowa, każde pole
+pamięta swój klucz stanu (odkryte? teren i sąsiedzi, procent budowy, ikona,
+ramka trybu budowy…) i elementy, które dla niego narysowaliśmy. Przy
+odświeżeniu pole z tym samym kluczem pomijamy, a zmienione aktualizujemy
+w miejscu (coords / itemconfigure); gdy zmienia się skład elementów albo
+zestaw ich opcji (np. znika obramowanie), usuwamy je i tworzymy od nowa.
+
+Opis elementu to krotka z item(): (warstwa, rodzaj, współrzędne, opcje) –
+rodzaj to "image" / "rectangle" / "text", czyli canvas.create_<rodzaj>.
+Każdy element dostaje tag swojej warstwy, a restack() układa warstwy
+w kolejności `layers` – nowo utworzony element nie przykryje więc
+nakładek sąsiednich pól z wyższych warstw.
+"""
+
+
+def item(layer, kind, *coords, **options):
+    """Opis jednego elementu Canvas (porównywalny, więc łatwo wykryć zmianę)."""
+    return layer, kind, coords, tuple(sorted(options.items()))
+
+
+def _shape(spec):
+    # warstwa, rodzaj i klucze opcji – przy zmianie któregoś element tworzymy od nowa
+    return spec[0], spec[1], tuple(k for k, _ in spec[3])
+
+
+class CanvasLayers:
+
+    def __init__(self, canvas, layers):
+        self.canvas = canvas
+        # kolejność warstw od spodu do góry
+        self.layers = tuple(layers)
+        # pole -> (klucz stanu, [(opis, id elementu)])
+        self._cells = {}
+        self._needs_restack = False
+
+    def update(self, pos, key, build_items):
+        """
+        Uaktualnia elementy pola `pos`. build_items() (lista opisów) wołamy tylko,
+        gdy klucz stanu pola się zmienił – tam siedzą drogie rzeczy jak autotiling.
+        """
+        old = self._cells.get(pos)
+        if old is not None and old[0] == key:
+            return False
+
+        specs = build_items()
+        drawn = old[1] if old is not None else []
+        canvas = self.canvas
+
+        if [_shape(d[0]) for d in drawn] == [_shape(s) for s in specs]:
+            # ten sam skład elementów i opcji – poprawiamy tylko to, co się zmieniło
+            new_drawn = []
+            for (prev, item_id), spec in zip(drawn, specs):
+                if spec[2] != prev[2]:
+                    canvas.coords(item_id, *spec[2])
+                if spec[3] != prev[3]:
+                    changed = {k: v for (k, v), (_, old_v) in zip(spec[3], prev[3]) if v != old_v}
+                    canvas.itemconfigure(item_id, **self._options(spec[0], changed))
+                new_drawn.append((spec, item_id))
+        else:
+            for _, item_id in drawn:
+                canvas.delete(item_id)
+            new_drawn = [(spec, self._create(spec)) for spec in specs]
+            self._needs_restack = True
+
+        self._cells[pos] = (key, new_drawn)
+        return True
+
+    def _options(self, layer, options):
+        if "tags" in options:
+            options = dict(options, tags=(*options["tags"], layer))
+        return options
+
+    def _create(self, spec):
+        layer, kind, coords, options = spec
+        options = dict(options)
+        options["tags"] = (*options.get("tags", ()), layer)
+        return getattr(self.canvas, f"create_{kind}")(*coords, **options)
+
+    def restack(self):
+        """Po utworzeniu nowych elementów przywraca kolejność warstw (od spodu do góry)."""
+        if not self._needs_restack:
+            return
+        for layer in self.layers:
+            self.canvas.tag_raise(layer)
+        self._needs_restack = False
+
+    def clear(self):
+        for _, drawn in self._cells.values():
+            for _, item_id in drawn:
+                self.canvas.delete(item_id)
+        self._cells = {}
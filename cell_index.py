@@ -0,0 +1,56 @@
+# cell_index.py
+"""
+Indeks przestrzenny kolonii: co stoi, co się buduje i co się ulepsza na danym
+polu mapy, plus zbiór pól osady/dzielnic.
+
+Zamiast przeszukiwać `constructions` / `upgrades_in_progress` dla każdego pola
+(sloty osady, zielone ramki budowy, rysowanie mapy) budujemy raz słowniki
+pole → lista i dalej pytamy w O(1). ColonyEngine unieważnia indeks przy każdej
+zmianie budów, ulepszeń, budynków lub terenu (mark_cells_dirty) i odbudowuje go
+leniwie przy pierwszym pytaniu.
+"""
+
+SETTLEMENT_TERRAINS = ("settlement", "district")
+
+# ile budynków mieści jedno pole osady/dzielnicy
+SETTLEMENT_SLOTS = 5
+
+
+class CellIndex:
+
+    def __init__(self, map_grid, buildings, constructions, upgrades):
+        # pos -> [budowa], pos -> [ulepszenie]
+        self.constructions = {}
+        self.upgrades = {}
+        # id budynków z ulepszeniem w toku
+        self.upgrading = set()
+        # pos -> liczba budynków zajmujących slot (bez dzielnic)
+        self.occupied = {}
+        self.settlement_cells = set()
+
+        for c in constructions:
+            self.constructions.setdefault(c[1]["pos"], []).append(c)
+
+        for u in upgrades:
+            building_id = u[1]
+            self.upgrading.add(building_id)
+            b = buildings.get(building_id)
+            if b is not None:
+                self.upgrades.setdefault(b["pos"], []).append(u)
+
+        for b in buildings:
+            if not b.get("is_district", False):
+                self.occupied[b["pos"]] = self.occupied.get(b["pos"], 0) + 1
+
+        if map_grid:
+            self.settlement_cells.update(map_grid.positions(SETTLEMENT_TERRAINS))
+
+    def constructions_at(self, pos):
+        return self.constructions.get(pos, ())
+
+    def upgrades_at(self, pos):
+        return self.upgrades.get(pos, ())
+
+    def used_slots(self, pos):
+        """Zajęte sloty pola: stojące budynki + budowy w toku."""
+        return self.occupied.get(pos, 0) + len(self.constructions.get(pos, ()))
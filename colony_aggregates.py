@@ -0,0 +1,66 @@
+# colony_aggregates.py
+"""
+Sumy po budynkach kolonii trzymane na bieżąco: pojemność namiotów,
+limity magazynów (żywność / towary) i ludzie pracujący w budynkach.
+
+Każdy budynek ma zapamiętany swój wkład (id → krotka), a sumy zmieniamy
+o różnicę, gdy budynek powstaje, zmienia poziom/obsadę albo znika.
+ColonyEngine woła update() przez mark_production_dirty(id, ...); bez
+podanych id (hurtowe zmiany, wczytanie gry) przelicza wszystko od nowa.
+check() w trybie debug porównuje sumy z pełnym przeliczeniem.
+"""
+from building_defs import building_level
+from constants import BASE_FOOD_LIMIT, BASE_GOODS_LIMIT
+
+_ZERO = (0, 0, 0, 0)
+
+
+def building_contribution(b):
+    """(pojemność, limit żywności, limit towarów, pracownicy) jednego budynku."""
+    rec = building_level(b["base"], b.get("level", 0))
+    capacity = rec.capacity if rec.base == "tent" else 0
+    if b.get("is_district"):
+        return capacity, 0, 0, 0
+    workers = 0 if rec.base == "tent" else b.get("workers", 0)
+    return capacity, rec.food_limit, rec.goods_limit, workers
+
+
+class ColonyAggregates:
+
+    def __init__(self, buildings=()):
+        self.rebuild(buildings)
+
+    def rebuild(self, buildings):
+        self._by_id = {}
+        self.capacity = 0
+        self.food_limit = BASE_FOOD_LIMIT
+        self.goods_limit = BASE_GOODS_LIMIT
+        self.workers = 0
+        for b in buildings:
+            self._apply(b["id"], building_contribution(b))
+
+    def update(self, building_id, b):
+        """Budynek `building_id` się zmienił (b = jego dict) albo zniknął (b = None)."""
+        self._apply(building_id, building_contribution(b) if b is not None else None)
+
+    def _apply(self, building_id, new):
+        old = self._by_id.pop(building_id, _ZERO)
+        if new is not None:
+            self._by_id[building_id] = new
+        else:
+            new = _ZERO
+        self.capacity += new[0] - old[0]
+        self.food_limit += new[1] - old[1]
+        self.goods_limit += new[2] - old[2]
+        self.workers += new[3] - old[3]
+
+    def totals(self):
+        return self.capacity, self.food_limit, self.goods_limit, self.workers
+
+    def check(self, buildings):
+        """Porównuje sumy z pełnym przeliczeniem; rzuca AssertionError przy rozjeździe."""
+        fresh = ColonyAggregates(buildings)
+        if fresh.totals() != self.totals():
+            raise AssertionError(
+                f"sumy kolonii rozjechane: przyrostowo {self.totals()}, od nowa {fresh.totals()}"
+            )
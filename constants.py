@@ -8,14 +8,20 @@ START_YEAR_MAX = 1742
 BASE_FOOD_LIMIT = 1000
 BASE_GOODS_LIMIT = 1000
 
+# debug: po każdej zmianie budynków porównuj sumy kolonii (pojemność, magazyny, pracownicy) z pełnym przeliczeniem
+DEBUG_CHECK_AGGREGATES = False
+# debug: czasy faz pętli dnia / UI (profiling.py); ścieżka pliku JSONL albo None = bez śladu na dysku
+DEBUG_PROFILE = False
+DEBUG_PROFILE_TRACE = None
+
 # Konfiguracja mapy
 MAP_SIZE = 8
 
-def generate_start_date():
+def generate_start_date(rng=random):
     from datetime import datetime
-    year = random.randint(START_YEAR_MIN, START_YEAR_MAX)
-    month = random.randint(1, 12)
-    day = random.randint(1, 28)
+    year = rng.randint(START_YEAR_MIN, START_YEAR_MAX)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
     return datetime(year, month, day)
 
 # ile żywności zjada 1 osoba dziennie
@@ -24,6 +30,11 @@ FOOD_CONSUMPTION_PER_PERSON = 1.0
 # mnożnik zużycia żywności dla osób ponad pojemność kolonii
 FOOD_OVERCROWDING_MULTIPLIER = 1.5
 
+# ile wpisów dziennika trzyma silnik (i zapis gry)
+LOG_LINES_MAX = 1000
+# ile ostatnich wpisów pokazuje okno dziennika
+LOG_VISIBLE_LINES = 100
+
 # # constants.py
 # MAX_SHIP_CARGO = 1500
 
@@ -935,6 +946,9 @@ ROYAL_MISSIONS = [
     },
 ]
 
+# szansa, że wolne plemię poprosi danego dnia o misję (np. 1/14, żeby nie waliło się wszystko naraz)
+NATIVE_MISSION_DAILY_CHANCE = 1 / 14
+
 NATIVE_MISSIONS_DETAILS = [
     {
         "name_key": "mission.native.bison_hunt_help.name",
@@ -0,0 +1,115 @@
+# economy.py
+"""
+Tablicowa wersja dziennej ekonomii (opcjonalna – wymaga NumPy).
+
+Budynki kolonii zamieniamy na dwie macierze budynki × surowce (produkcja
+i zużycie przy pełnej wydajności), a zapasy na wektor w stałej kolejności
+RESOURCES. Wydajność, bilans dnia i przycinanie do zapasów/magazynu to
+wtedy pojedyncze operacje na tablicach zamiast zagnieżdżonych pętli
+po słownikach. Bez NumPy ColonyEngine zostaje przy słownikach.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from constants import RESOURCES
+
+HAS_NUMPY = np is not None
+
+# stały indeks surowców: RESOURCES[i] <-> kolumna i
+RES_INDEX = {r: i for i, r in enumerate(RESOURCES)}
+
+# poniżej tylu budynków narzut NumPy jest większy niż zysk
+ARRAY_ECONOMY_MIN_BUILDINGS = 32
+
+
+class ArrayEconomy:
+    """Macierze produkcji/zużycia zbudowane z wektorów (b, prod, cons) z ColonyEngine."""
+
+    def __init__(self, vectors):
+        # po tym ColonyEngine poznaje, czy macierze są aktualne
+        self.source = vectors
+
+        n, m = len(vectors), len(RESOURCES)
+        self.prod = np.zeros((n, m))
+        self.cons = np.zeros((n, m))
+        self.working = np.zeros(n, dtype=bool)
+
+        for i, (b, prod, cons) in enumerate(vectors):
+            for res, amt in prod.items():
+                self.prod[i, RES_INDEX[res]] += amt
+            for res, amt in cons.items():
+                self.cons[i, RES_INDEX[res]] += amt
+            self.working[i] = bool(b.get("workers", 0))
+
+        self.net = self.prod - self.cons
+        self.consumes = self.cons > 0
+        # dzielnik bez zer – tam, gdzie budynek nic nie zużywa, i tak bierzemy 1.0
+        self._cons_div = np.where(self.consumes, self.cons, 1.0)
+        # największe zapotrzebowanie pojedynczego budynku na dany surowiec
+        self.needed = self.cons.max(axis=0) if n else np.zeros(m)
+
+    @staticmethod
+    def stock_vector(resources):
+        return np.array([resources.get(r, 0) for r in RESOURCES], dtype=float)
+
+    @staticmethod
+    def limit_vector(food_limit, goods_limit):
+        limits = np.full(len(RESOURCES), float(goods_limit))
+        limits[RES_INDEX["food"]] = food_limit
+        return limits
+
+    def efficiency(self, stock):
+        """Wydajność budynków: min(1, zapas / potrzeba) po zużywanych surowcach, 0 gdy brak ludzi."""
+        if not len(self.working):
+            return np.zeros(0)
+        ratio = np.where(self.consumes, stock / self._cons_div, 1.0)
+        eff = np.minimum(1.0, ratio.min(axis=1))
+        return np.where(self.working, eff, 0.0)
+
+    def daily_net(self, stock):
+        """Dzienny bilans surowców (wektor) przy bieżących zapasach."""
+        return self.efficiency(stock) @ self.net
+
+    def stable_days(self, stock, net, limits, max_days):
+        """Wersja tablicowa ColonyEngine._stable_production_days."""
+        need = self.needed
+        if np.any((need > 0) & (stock < need) & (net != 0)):
+            return 1
+
+        span = max_days
+
+        neg = net < 0
+        if neg.any():
+            threshold = np.maximum(-net[neg], need[neg])
+            if np.any(stock[neg] < threshold):
+                return 1
+            span = min(span, int(((stock[neg] - threshold) // -net[neg]).min()) + 1)
+
+        pos = (net > 0) & (stock < limits)
+        if pos.any():
+            full_days = int(((limits[pos] - stock[pos]) // net[pos]).min())
+            if full_days == 0:
+                return 1
+            span = min(span, full_days)
+
+        return max(1, span)
+
+    @staticmethod
+    def apply(stock, net, days, limits):
+        """
+        Nakłada bilans `days` dni: zużycie ucięte do zapasu, produkcja do limitu.
+        Zwraca (nowe zapasy, maska surowców stojących przez pełny magazyn).
+        """
+        new = stock.copy()
+
+        neg = net < 0
+        new[neg] -= np.minimum(stock[neg], -net[neg] * days)
+
+        pos = net > 0
+        blocked = pos & (stock >= limits)
+        grow = pos & ~blocked
+        new[grow] += np.minimum(net[grow] * days, limits[grow] - stock[grow])
+
+        return new, blocked
@@ -0,0 +1,1800 @@
+# engine.py
+"""
+Rdzeń symulacji kolonii – bez Tkintera, pygame i fontów Windows.
+
+ColonyEngine trzyma cały stan gry (zasoby, budynki, statki, relacje, misje)
+i całą logikę dnia. UI (ColonySimulator w main.py) dziedziczy po nim
+i subskrybuje zdarzenia (log, dźwięk, koniec gry), więc tę samą
+symulację można odpalić headless, np.:
+
+    eng = ColonyEngine()
+    eng.new_game("england")
+    eng.run_days(365)
+"""
+import os
+from collections import deque
+from datetime import timedelta
+
+from constants import (
+    BUILDINGS, DEBUG_CHECK_AGGREGATES, DEBUG_PROFILE, DEBUG_PROFILE_TRACE, EUROPE_PRICES,
+    FOOD_CONSUMPTION_PER_PERSON, FOOD_OVERCROWDING_MULTIPLIER, LOG_LINES_MAX, MAP_SIZE,
+    NATIVE_MISSION_DAILY_CHANCE, NATIVE_MISSIONS_DETAILS, RESOURCES, RESOURCE_DISPLAY_KEYS,
+    ROYAL_MISSIONS, SHIP_NAMES_BY_STATE, SHIP_STATUS_IN_EUROPE_PORT, SHIP_STATUS_IN_PORT,
+    SHIP_STATUS_BUILDING, SHIP_STATUS_RETURNING, SHIP_STATUS_TO_EUROPE, SHIP_TYPES, STATES, TRIBE_DISPLAY_KEYS,
+    generate_start_date,
+)
+from building_defs import building_level, building_terms
+from building_registry import BuildingRegistry
+from cell_index import SETTLEMENT_SLOTS, SETTLEMENT_TERRAINS, CellIndex
+from colony_aggregates import ColonyAggregates
+from fleet import Fleet, Ship
+from economy import ARRAY_ECONOMY_MIN_BUILDINGS, HAS_NUMPY, ArrayEconomy, np
+from localization import Localization
+from randomness import RngStreams, binomial, geometric
+from scheduler import EventScheduler
+from map_generator import generate_map
+from map_grid import MapGrid
+from native_economy import NativeEconomy
+from profiling import Profiler
+
+LANG = "en"
+
+LOCATION_KEYS = [
+    "map.gulf_of_mexico",
+    "map.brazil_coast",
+    "map.caribbean",
+    "map.florida",
+    "map.patagonia",
+    "map.hudson_bay",
+    "map.bahamas",
+    "map.orinoco_delta",
+    "map.peru_coast",
+    "map.new_york",
+]
+
+GAME_LENGTHS = {
+    "flash": 1,
+    "fast": 30,
+    "normal": 50,
+    "long": 70,
+    "marathon": 100,
+    "epic": 150,
+}
+
+
+class ColonyEngine:
+
+    def __init__(self, loc=None, lang=LANG, seed=None):
+        if loc is None:
+            loc = Localization(lang, locales_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "loc"))
+        self.loc = loc
+
+        # subskrybenci zdarzeń silnika (UI, runner, testy)
+        self._listeners = []
+
+        self.state = None
+        self.location = None
+        self.current_date = None
+        self.people = 100
+        self.busy_people = 0
+        self.days_passed = 0
+        self.game_over = False
+
+        self.resources = {r: 0 for r in RESOURCES}
+
+        self.resources["food"] = 100000
+        self.resources["wood"] = 10000
+        self.resources["skins"] = 1000
+        self.resources["clothes"] = 1000
+        self.resources["herbs"] = 1000
+        self.resources["meds"] = 1000
+        self.resources["iron"] = 1000
+        self.resources["steel"] = 1000
+        self.resources["cane"] = 1000
+        self.resources["sugar"] = 1000
+        self.resources["tobacco"] = 1000
+        self.resources["cigars"] = 1000
+        self.resources["coal"] = 1000
+        self.resources["silver"] = 1000
+        self.resources["gold"] = 1000
+        self.resources["ducats"] = 10000
+
+        # id -> budynek (building_registry.py); pola mapy i ulepszenia trzymają id
+        self.buildings = BuildingRegistry()
+        self.constructions = []
+        self.upgrades_in_progress = []
+        self.expeditions = []
+        # statki (fleet.py): rekordy Ship + indeks po statusie
+        self.ships = Fleet()
+        self.auto_sail_timer = None
+
+        # kolejka dat: budowy, ulepszenia, ekspedycje (scheduler.py); statki mają własny kopiec we Fleet
+        self.scheduler = EventScheduler()
+
+        # strumienie losowań podsystemów z jednego ziarna gry (randomness.py)
+        self.rngs = RngStreams(seed)
+        world = self.rng("world")
+
+        self.native_relations = {
+            tribe: 50
+            for tribe in world.sample(list(TRIBE_DISPLAY_KEYS.keys()), 3)
+        }
+        # reputacja z państwami europejskimi – na start 0, później własne państwo podbijemy
+        self.europe_relations = {s: 0 for s in STATES}
+
+        # zapasy/produkcja/magazyny plemion jako tablice plemiona × surowce (native_economy.py)
+        self.natives = NativeEconomy.roll(self.native_relations, world)
+
+        # kumulacja wartości handlu (do progów reputacji)
+        self.native_trade_value = {tribe: 0 for tribe in self.native_relations}
+        self.europe_trade_value = {s: 0 for s in self.europe_relations}
+        self.trade_reputation_threshold = 1000
+
+        self.map_size = MAP_SIZE
+        self.map_grid = None
+        self.settlement_pos = None
+        self.selected_building = None
+        self.log_lines = deque(maxlen=LOG_LINES_MAX)
+
+        self.flagship_index = 0
+        self.current_mission = None  # (end_date, required, sent, difficulty, mission_text, index)
+        self.last_mission_date = None
+        self.mission_multiplier = 1.0
+        self.first_mission_given = False
+
+        self.completed_missions = 0
+        self.missions_to_win = 100
+
+        # Mechanika misji indiańskich
+        self.native_missions_active = {}  # tribe → dict z aktywną misją
+        self.native_missions_cd = {}  # tribe → data kiedy mogą poprosić ponownie
+        self.native_mission_multiplier = {}  # tribe → mnożnik trudności jak w misjach królewskich
+        self.native_missions_next = {}  # tribe → wylosowany dzień następnej prośby o misję
+        # prośby i wygaśnięcia misji indiańskich; osobna kolejka, bo nie przerywają odcinków produkcji
+        self.native_events = EventScheduler()
+
+        # przyszłe misje od Indian – na razie pusta lista
+        # struktura np.: {"tribe": "Irokezi", "text": "...", "end": data, "progress": "..."}
+        self.native_missions = []
+
+        self.current_monarch = ""
+
+        # (data, surowiec) – żeby „brak miejsca w magazynie” nie spamował
+        self._full_storage_logged = set()
+        # przeludnienie/głód zbierane przez odcinki jednego advance_date, logowane raz na końcu
+        self._starvation_report = None
+
+        # wektory produkcji budynków (calculate_production); None = do przeliczenia
+        self._production_cache = None
+        self._production_cache_state = None
+
+        # opcjonalna ekonomia na macierzach NumPy (economy.py) dla dużych kolonii
+        self.use_array_economy = HAS_NUMPY
+        self._economy_arrays = None
+
+        # indeks pól: budowy / ulepszenia / budynki / pola osady (cell_index.py); None = do przebudowy
+        self._cell_index = None
+
+        # sumy po budynkach: pojemność, limity magazynów, pracownicy (colony_aggregates.py)
+        self._aggregates = None
+        # debug: po każdej zmianie porównuj sumy z pełnym przeliczeniem
+        self.check_aggregates = DEBUG_CHECK_AGGREGATES
+
+        # opcjonalne pomiary faz (profiling.py); "cprofile" / "sampling" = profiluj najbliższe advance_date
+        self.profiler = Profiler(enabled=DEBUG_PROFILE, trace_path=DEBUG_PROFILE_TRACE)
+        self.profile_next_advance = None
+        self.profile_out_path = None
+
+    # === Zdarzenia (UI / runner się pod to podpina) ===
+    def subscribe(self, callback):
+        """callback(event, **payload) – wołany przy każdym zdarzeniu silnika."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def emit(self, event, **payload):
+        for cb in list(self._listeners):
+            cb(event, **payload)
+
+    # === Losowość ===
+    def rng(self, name):
+        """
+        Strumień losowań podsystemu: "world" (start, mapa, plemiona), "ships",
+        "missions", "native_missions", "mortality", "exploration", "tiles".
+        """
+        return self.rngs.get(name)
+
+    def seed_rng(self, seed=None):
+        """Nowe ziarno gry (None = losowe) – wszystkie strumienie od początku."""
+        self.rngs = RngStreams(seed)
+
+    @property
+    def rng_seed(self):
+        return self.rngs.seed
+
+    @rng_seed.setter
+    def rng_seed(self, seed):
+        self.seed_rng(seed)
+
+    @property
+    def rng_state(self):
+        """Stany strumieni do zapisu gry (po wczytaniu losowania idą dalej tak samo)."""
+        return self.rngs.getstate()
+
+    @rng_state.setter
+    def rng_state(self, state):
+        self.rngs.setstate(state)
+
+    # --- gospodarka plemion jako słowniki (zapis gry, debug) ---
+    @property
+    def native_prod(self):
+        return self.natives.table_dict("prod")
+
+    @native_prod.setter
+    def native_prod(self, mapping):
+        self.natives.load_table("prod", mapping)
+
+    @property
+    def native_cap(self):
+        return self.natives.table_dict("cap")
+
+    @native_cap.setter
+    def native_cap(self, mapping):
+        self.natives.load_table("cap", mapping)
+
+    @property
+    def native_stock(self):
+        return self.natives.table_dict("stock")
+
+    @native_stock.setter
+    def native_stock(self, mapping):
+        self.natives.load_table("stock", mapping)
+
+    def notify(self, *aspects):
+        """
+        Stan się zmienił – UI odświeży tylko widżety zależne od podanych aspektów:
+        "date", "population", "resources", "buildings".
+        """
+        self.emit("changed", aspects=set(aspects))
+
+    def log(self, text, color="black"):
+        # czas formatowania i rozsyłania wpisów (dziennik UI) liczony jako osobna faza profilu
+        with self.profiler.phase("logging"):
+            self._write_log(text, color)
+
+    def _write_log(self, text, color):
+        """log() bez pomiaru – dla miejsc, które same są już w fazie "logging"."""
+        if not self.current_date: return
+        entry = f"[{self.current_date.strftime('%d %b %Y')}] {text}"
+        self.profiler.count("log_lines")
+        # deque z maxlen sam zrzuca najstarszy wpis
+        self.log_lines.append((entry, color))
+        self.emit("log", text=entry, color=color)
+
+    def play_sound(self, name):
+        self.emit("sound", name=name)
+
+    # === Nowa gra ===
+    def new_game(self, state, map_size=MAP_SIZE, length_key="normal", location_key=None):
+        """Logika startu gry (to, co wcześniej robiło start_game poza UI)."""
+        self.state = state
+        self.state_display = self.loc.t(STATES[self.state]["name_key"], default=self.state)
+
+        if self.state == "france":
+            self.trade_reputation_threshold = STATES[self.state]["reputation_threshold"]
+
+        self.missions_to_win = GAME_LENGTHS.get(length_key, 50)
+
+        # własne państwo startuje z lepszą reputacją, reszta pozostaje 0
+        self.europe_relations[self.state] = 50
+
+        # --- losujemy KLUCZ lokacji, a tłumaczenie robimy na bieżąco ---
+        world = self.rng("world")
+        self.location_key = location_key or world.choice(LOCATION_KEYS)
+        self.location = self.loc.t(self.location_key)
+        if "pop_start" in STATES[self.state]:
+            self.people += STATES[self.state]["pop_start"]
+
+        self.map_size = map_size
+        rows, self.settlement_pos = generate_map(self.map_size, rng=world)
+        self.map_grid = MapGrid.from_rows(rows)
+        self.map_size = len(self.map_grid)
+        self.current_date = generate_start_date(world)
+
+        # Start systemu po 6 miesiącach
+        self.native_missions_enabled_start = self.current_date + timedelta(days=180)
+        self.native_missions_next = {}
+
+        sy, sx = self.settlement_pos
+        for _ in range(3):
+            tent = {"base": "tent", "level": 0, "workers": 0, "pos": (sy, sx)}
+            self.buildings.add(tent)
+            self.map_grid.add_building(sy, sx, tent["id"])
+        self.mark_production_dirty()
+
+        self.ships = Fleet([Ship()])
+        self.flagship_index = 0
+        self.auto_sail_timer = self.current_date + timedelta(days=14)
+        self.rebuild_schedule()
+
+    # === Nazwy (logi) ===
+    def tribe_name(self, tribe: str) -> str:
+        """Zwraca zlokalizowaną nazwę plemienia dla UI."""
+        key = TRIBE_DISPLAY_KEYS.get(tribe)
+        return self.loc.t(key, default=tribe) if key else tribe
+
+    def state_name(self, state_id: str) -> str:
+        data = STATES.get(state_id, {})
+        key = data.get("name_key")
+        return self.loc.t(key, default=state_id) if key else state_id
+
+    def get_monarch(self):
+        # zabezpieczenie na wypadek złego self.state
+        if self.state not in STATES:
+            return self.loc.t("state.unknown_ruler")
+
+        year = self.current_date.year
+        for monarch in STATES[self.state]["rulers"]:
+            if monarch["start"] <= year <= monarch["end"]:
+                if self.current_monarch != monarch.get("name_key"):
+                    self.europe_relations[self.state] = 50
+                self.current_monarch = monarch.get("name_key")
+                return self.loc.t(monarch.get("name_key"), default="Nieznany")
+
+        return self.loc.t("state.unknown_ruler")
+
+    # === Ludzie / zasoby ===
+    def free_workers(self):
+        # ile osób pracuje w budynkach (nie liczymy dzielnic i namiotów)
+        workers_in_buildings = self.colony_aggregates().workers
+
+        # Wolni = wszyscy ludzie - ci w budowach/expedycjach - ci w budynkach
+        return max(0, self.people - self.busy_people - workers_in_buildings)
+
+    def can_afford(self, cost):
+        # tworzymy kopię, by nie modyfikować oryginału
+        real_cost = cost.copy()
+
+        # --- BONUS HOLANDII ---
+        if self.state == "netherlands":
+            mult = STATES[self.state].get("build_cost", 1)
+            real_cost = {r: int(a * mult) for r, a in real_cost.items()}
+
+        return all(self.resources.get(r, 0) >= a for r, a in real_cost.items())
+
+    def spend_resources(self, cost):
+        # tworzymy kopię, by nie modyfikować oryginału
+        real_cost = cost.copy()
+
+        # --- BONUS HOLANDII ---
+        if self.state == "netherlands":
+            mult = STATES[self.state].get("build_cost", 1)
+            real_cost = {r: int(a * mult) for r, a in real_cost.items()}
+
+        # faktyczne pobranie zasobów
+        for r, a in real_cost.items():
+            self.resources[r] -= a
+
+    def calculate_storage_limits(self):
+        """
+        Zwraca (food_limit, goods_limit).
+        Bazowo 1000/1000, potem dodaje bonusy ze spichlerzy/magazynów i ich ulepszeń.
+        """
+        aggregates = self.colony_aggregates()
+        return aggregates.food_limit, aggregates.goods_limit
+
+    def colony_aggregates(self):
+        """Sumy po budynkach (ColonyAggregates) – odczyt O(1), przeliczane od nowa tylko po hurtowych zmianach."""
+        if self._aggregates is None:
+            self._aggregates = ColonyAggregates(self.buildings)
+        return self._aggregates
+
+    # === Osada / pola ===
+    def mark_cells_dirty(self):
+        """Zmieniły się budowy / ulepszenia / budynki / teren – indeks pól do przebudowy."""
+        self._cell_index = None
+
+    def cell_index(self):
+        if self._cell_index is None:
+            self._cell_index = CellIndex(self.map_grid, self.buildings, self.constructions, self.upgrades_in_progress)
+        return self._cell_index
+
+    def constructions_at(self, pos):
+        """Budowy w toku na polu `pos`."""
+        return self.cell_index().constructions_at(pos)
+
+    def is_upgrading(self, building_id):
+        return building_id in self.cell_index().upgrading
+
+    def get_settlement_areas(self):
+        return sorted(self.cell_index().settlement_cells)
+
+    def get_free_settlement_slots(self):
+        index = self.cell_index()
+        return sum(max(0, SETTLEMENT_SLOTS - index.used_slots(pos)) for pos in index.settlement_cells)
+
+    def get_buildings_in_cell(self, pos):
+        """Budynki (dicty) stojące na polu – komórka mapy trzyma tylko ich id."""
+        y, x = pos
+        return [self.buildings[bid] for bid in self.map_grid[y][x]["building"]]
+
+    def is_adjacent_to_settlement(self, pos):
+        y, x = pos
+        settlement_cells = self.cell_index().settlement_cells
+        for dy, dx in [
+            (0, 1),
+            (1, 0),
+            (0, -1),
+            (-1, 0),
+            (1, 1),
+            (1, -1),
+            (-1, 1),
+            (-1, -1),
+        ]:
+            if (y + dy, x + dx) in settlement_cells:
+                return True
+        return False
+
+    # === Budynki ===
+    def get_building_display_name(self, b):
+        rec = building_level(b["base"], b.get("level", 0))
+        return self.loc.t(rec.name_key, default=b["base"])
+
+    def calculate_population_capacity(self):
+        return self.colony_aggregates().capacity
+
+    def mark_production_dirty(self, *building_ids):
+        """
+        Zmienili się robotnicy / poziom / lista budynków – przelicz wektory produkcji przy następnym użyciu.
+        Podane id budynków (zmienionych lub zburzonych) poprawiają sumy kolonii przyrostowo,
+        bez id sumy przeliczą się od nowa.
+        """
+        self._production_cache = None
+        if building_ids and self._aggregates is not None:
+            for building_id in building_ids:
+                self._aggregates.update(building_id, self.buildings.get(building_id))
+        else:
+            self._aggregates = None
+        if self.check_aggregates:
+            self.colony_aggregates().check(self.buildings)
+        # lista budynków mogła się zmienić – indeks pól też
+        self._cell_index = None
+        self.notify("buildings")
+
+    def _building_vectors(self, b):
+        """Dzienna produkcja i zużycie budynku przy pełnej wydajności: (prod, cons)."""
+        workers = b.get("workers", 0)
+        if not workers:
+            return {r: 0 for r in RESOURCES}, {}
+
+        level = b.get("level", 0)
+        # składniki z premią państwa już wliczoną (building_defs.py)
+        prod = {}
+        for res, amt, bonus in building_terms(self.state, b["base"], level, b.get("resource")):
+            prod[res] = prod.get(res, 0) + amt * workers * bonus
+
+        # --- konsumpcja surowców ---
+        cons = {res: amt * workers for res, amt in building_level(b["base"], level).cons}
+
+        return prod, cons
+
+    def _production_vectors(self):
+        """[(budynek, prod, cons)] dla budynków poza dzielnicami – z cache'u, jeśli aktualny."""
+        cache = self._production_cache
+        if cache is None or self._production_cache_state != self.state:
+            cache = [
+                (b, *self._building_vectors(b))
+                for b in self.buildings
+                if not b.get("is_district")
+            ]
+            self._production_cache = cache
+            self._production_cache_state = self.state
+        return cache
+
+    def _uses_array_economy(self):
+        return self.use_array_economy and len(self.buildings) >= ARRAY_ECONOMY_MIN_BUILDINGS
+
+    def _array_economy(self):
+        """Macierze z economy.py, przebudowywane razem z cache'em wektorów produkcji."""
+        vectors = self._production_vectors()
+        econ = self._economy_arrays
+        if econ is None or econ.source is not vectors:
+            econ = ArrayEconomy(vectors)
+            self._economy_arrays = econ
+        return econ
+
+    def calculate_production(self):
+        """
+        Lista (budynek, prod, cons, wydajność) dla budynków poza dzielnicami.
+        prod/cons idą z cache'u (nie modyfikuj ich!), co wywołanie liczona jest
+        tylko wydajność, bo zależy od bieżących zapasów.
+        """
+        building_output = []
+        for b, prod, cons in self._production_vectors():
+            if not b.get("workers", 0):
+                building_output.append((b, prod, cons, 0.0))
+                continue
+
+            # --- sprawdzenie, czy starcza surowców (wydajność) ---
+            efficiency = 1.0
+            for res, needed in cons.items():
+                available = self.resources.get(res, 0)
+                if needed > 0 and available < needed:
+                    efficiency = min(efficiency, available / needed)
+
+            building_output.append((b, prod, cons, efficiency))
+
+        return building_output
+
+    def get_max_workers(self, b):
+        return building_level(b["base"], b.get("level", 0)).max_workers
+
+    def start_construction_at(self, name, pos):
+        y, x = pos
+        data = BUILDINGS[name]
+        cell = self.map_grid[y][x]
+
+        if cell["terrain"] not in data.get("allowed_terrain", []):
+            self.log(
+                self.loc.t(
+                    "log.cannot_build_here",
+                    building=self.loc.t(f"building.{name}.name", default=name),
+                    terrain=self.loc.t(f"terrain.{cell['terrain']}.name", default=cell["terrain"])
+                ),
+                "red"
+            )
+            return
+
+        if data.get("requires_settlement"):
+            if cell["terrain"] not in SETTLEMENT_TERRAINS:
+                self.log(self.loc.t("ui.must_be_in_settlement"), "red")
+                return
+            if self.cell_index().used_slots(pos) >= SETTLEMENT_SLOTS:
+                self.log(self.loc.t("ui.no_space_in_settlement"), "red")
+                return
+        else:
+            if cell["building"]:
+                self.log(self.loc.t("log.building_already_exists"), "red")
+                return
+            if self.constructions_at(pos):
+                self.log(self.loc.t("log.construction_in_progress_here"), "red")
+                return
+
+        if data.get("requires_adjacent_settlement"):
+            if not self.is_adjacent_to_settlement(pos):
+                self.log(self.loc.t("log.requires_adjacent_settlement"), "red")
+                return
+            if cell["terrain"] == "sea" and name != "harbor":
+                self.log(self.loc.t("log.cannot_build_on_sea"), "red")
+                return
+
+        if not self.can_afford(data["base_cost"]):
+            self.log(self.loc.t("log.not_enough_resources"), "red")
+            return
+        if self.free_workers() < data["base_workers"]:
+            self.log(self.loc.t("ui.not_enough_workers"), "red")
+            return
+
+        self.spend_resources(data["base_cost"])
+        start_date = self.current_date
+        end_date = start_date + timedelta(days=data["build_time"])
+        new_b = {"base": name, "level": 0, "workers": 0, "pos": pos}
+        if name == "mine":
+            new_b["resource"] = cell["resource"]
+        if name == "district":
+            new_b["is_district"] = True
+            cell["terrain"] = "district"
+        if name == "tent":
+            new_b["capacity"] = 4
+
+        construction = (end_date, new_b, data["base_workers"], start_date)
+        self.constructions.append(construction)
+        self.mark_cells_dirty()
+        self.scheduler.schedule(end_date, "construction", construction)
+        self.busy_people += data["base_workers"]
+        self.notify("resources", "population")
+        name = self.get_building_display_name(new_b)
+        self.log(
+            self.loc.t(
+                "log.construction_started",
+                building=name,
+                date=end_date.strftime('%d %b %Y')
+            ),
+            "blue"
+        )
+
+    # === Ulepszenia (w górę) ===
+    def start_upgrade(self, building_id):
+        b = self.buildings[building_id]
+        base_data = BUILDINGS[b["base"]]
+        current_level = b.get("level", 0)
+
+        # 🔒 jeśli ten budynek już ma ulepszenie w toku – nie zaczynamy kolejnego
+        if self.is_upgrading(building_id):
+            self.log(self.loc.t("ui.building_already_in_progress"), "red")
+            return
+
+        if current_level >= len(base_data["upgrades"]):
+            self.log(self.loc.t("ui.max_level_reached"), "red")
+            return
+
+        upgrade = base_data["upgrades"][current_level]
+        cost = upgrade.get("cost", {})
+        workers_needed = upgrade.get("workers", 1)
+        build_time = upgrade.get("build_time", 7)
+
+        if self.state == "netherlands":
+            mult = STATES[self.state]["build_cost"]  # np. 0.8
+            cost = {k: int(v * mult) for k, v in cost.items()}
+
+        if not self.can_afford(cost):
+            self.log(self.loc.t("log.not_enough_resources"), "red")
+            return
+        if self.free_workers() < workers_needed:
+            self.log(self.loc.t("ui.not_enough_workers"), "red")
+            return
+
+        self.spend_resources(cost)
+        start_date = self.current_date
+        end_date = start_date + timedelta(days=build_time)
+
+        # (end_date, building_id, new_level, start_date) – id z BuildingRegistry
+        upgrade = (end_date, building_id, current_level + 1, start_date)
+        self.upgrades_in_progress.append(upgrade)
+        self.mark_cells_dirty()
+        self.scheduler.schedule(end_date, "upgrade", upgrade)
+        self.busy_people += workers_needed
+        self.notify("resources", "population")
+
+        self.log(
+            self.loc.t(
+                "log.upgrading_started",
+                building=self.get_building_display_name(b),
+                level=current_level + 1,
+                date=end_date.strftime('%d %b %Y')
+            ),
+            "purple",
+        )
+
+    # === Degradacja / zburzenie (w dół) ===
+    def degrade_or_demolish(self, building_id):
+        b = self.buildings[building_id]
+        base_data = BUILDINGS[b["base"]]
+        level = b.get("level", 0)
+        y, x = b["pos"]
+
+        # 🔄 jeśli jest trwające ulepszenie tego budynku – przerwij je
+        to_cancel = [u for u in self.upgrades_in_progress if u[1] == building_id]
+        for u in to_cancel:
+            _, _, new_level, _ = u
+            prev_level = new_level - 1
+            upgrades = base_data.get("upgrades", [])
+            workers_needed = 1
+            if 0 <= prev_level < len(upgrades):
+                workers_needed = upgrades[prev_level].get("workers", 1)
+            self.busy_people -= workers_needed
+            self.upgrades_in_progress.remove(u)
+        if to_cancel:
+            self.mark_cells_dirty()
+            self.log(self.loc.t("ui.upgrade_cancelled_no_refund"), "orange")
+
+        # DEGRADACJA POZIOMU (zwraca 50% kosztu poprzedniego ulepszenia)
+        if level > 0:
+            prev_upgrade = base_data["upgrades"][level - 1]
+            prev_cost = prev_upgrade.get("cost", {})
+            for r, a in prev_cost.items():
+                self.resources[r] = self.resources.get(r, 0) + a // 2
+
+            new_level = level - 1
+            b["level"] = new_level
+            self.mark_production_dirty(building_id)
+
+            # po degradacji dopasuj capacity, jeśli zdefiniowane
+            if new_level > 0:
+                new_up = base_data["upgrades"][new_level - 1]
+                if "capacity" in new_up:
+                    b["capacity"] = new_up["capacity"]
+            else:
+                if b["base"] == "tent":
+                    b["capacity"] = BUILDINGS["tent"].get("capacity", 4)
+
+            current_name = self.get_building_display_name(b)
+            self.log(
+                self.loc.t(
+                    "log.building_downgraded",
+                    level=new_level,
+                    building=current_name
+                ),
+                "orange",
+            )
+            return
+
+        # ZBURZENIE BUDYNKU (poziom 0, zwrot 50% kosztu budowy)
+        base_cost = base_data.get("base_cost", {})
+        for r, a in base_cost.items():
+            self.resources[r] = self.resources.get(r, 0) + a // 2
+
+        self.buildings.remove(building_id)
+        self.mark_production_dirty(building_id)
+        self.map_grid[y][x]["building"] = [bid for bid in self.map_grid[y][x]["building"] if bid != building_id]
+        self.log(self.loc.t("log.building_demolished_refund"), "orange")
+
+    def cancel_upgrade(self, building_id):
+        """Anuluje trwające ulepszenie budynku, zwraca 100% surowców i zwalnia ludzi."""
+        b = self.buildings[building_id]
+        base_data = BUILDINGS[b["base"]]
+
+        # znajdź ulepszenia w toku dotyczące tego budynku
+        to_cancel = [u for u in self.upgrades_in_progress if u[1] == building_id]
+
+        if not to_cancel:
+            self.log(self.loc.t("log.no_upgrade_to_cancel"), "red")
+            return
+
+        for u in to_cancel:
+            end_date, idx, new_level, start_date = u
+
+            prev_level = new_level - 1
+            upgrades = base_data.get("upgrades", [])
+
+            # --- zwrot surowców ---
+            if 0 <= prev_level < len(upgrades):
+                original_cost = upgrades[prev_level].get("cost", {}).copy()
+
+                # uwzględnij bonus Holandii (koszty budowy -20%)
+                if self.state == "netherlands":
+                    mult = STATES[self.state]["build_cost"]  # np. 0.8
+                    original_cost = {k: int(v * mult) for k, v in original_cost.items()}
+
+                # zwracamy 100%
+                for r, a in original_cost.items():
+                    self.resources[r] = self.resources.get(r, 0) + a
+
+            # --- zwrot robotników ---
+            workers_used = upgrades[prev_level].get("workers", 1) if 0 <= prev_level < len(upgrades) else 1
+            self.busy_people -= workers_used
+
+            # usuń zadanie ulepszenia
+            self.upgrades_in_progress.remove(u)
+
+        self.mark_cells_dirty()
+        self.notify("resources", "population")
+
+        self.log(self.loc.t("log.upgrade_cancelled_refunded"), "orange")
+
+    # === Statki ===
+    def _ship_capacity(self, ship_type):
+        """Zwraca ładowność statku wynikającą z jego typu (fallback na galleon)."""
+        return SHIP_TYPES.get(ship_type, SHIP_TYPES["galleon"])["capacity"]
+
+    def _ensure_ship_names(self):
+        """Dla nowych gier i starych savów: dopina nazwy statkom, które ich nie mają."""
+        used = []
+        for ship in self.ships:
+            if ship.name is None:
+                ship.name = self.get_random_ship_name(self.state, used)
+            used.append(ship.name)
+
+    def _get_best_harbor_level(self):
+        """Zwraca najwyższy poziom przystani w kolonii albo -1 jeśli brak."""
+        best = -1
+        for b in getattr(self, "buildings", []):
+            base_id = b.get("base")
+            if base_id == "harbor":
+                best = max(best, b.get("level", 0))
+        return best
+
+    def _harbor_allows_ship(self, ship_type):
+        """
+        True jeśli gracz ma przystań i jej poziom pozwala na budowę tego typu statku.
+        Obsługuje dwa warianty:
+          - jeśli SHIP_TYPES[type] ma pole required_harbor_level -> używa go
+          - jeśli nie ma, bierze pole tier (1..3), a wymagany poziom = tier-1
+          - jeśli nie ma ani required_harbor_level ani tier, to traktuje kolejność
+            w SHIP_TYPES jako tier 1..N
+        """
+        data = SHIP_TYPES.get(ship_type, {})
+        harbor_lvl = self._get_best_harbor_level()
+
+        if harbor_lvl < 0:
+            return False, "no_harbor", {}
+
+        if "required_harbor_level" in data:
+            req_lvl = int(data["required_harbor_level"])
+        elif "tier" in data:
+            req_lvl = max(1, int(data["tier"]))
+        else:
+            # fallback: kolejność w SHIP_TYPES (pierwszy typ = tier 1)
+            types_order = list(SHIP_TYPES.keys())
+            tier = types_order.index(ship_type) + 1 if ship_type in types_order else 1
+            req_lvl = max(1, tier)
+
+        if harbor_lvl < req_lvl:
+            return False, "harbor_too_low", {"need": req_lvl, "have": harbor_lvl}
+
+        return True, None, {}
+
+    def build_ship(self, ship_type):
+        """Zleca budowę statku. Zwraca True, jeśli budowa ruszyła."""
+        self._ensure_ship_names()
+        data = SHIP_TYPES.get(ship_type)
+        if not data:
+            return False
+
+        ok, err, ctx = self._harbor_allows_ship(ship_type)
+        if not ok:
+            if err == "no_harbor":
+                self.log(self.loc.t("log.no_harbor_for_ship"), "red")
+            else:
+                self.log(self.loc.t("log.harbor_level_too_low", level_needed=ctx["need"], level_have=ctx["have"]), "red")
+            return False
+
+        # 1) sprawdź surowce
+        cost = data.get("cost", {})
+        missing = {r: a - self.resources.get(r, 0) for r, a in cost.items() if self.resources.get(r, 0) < a}
+        if missing:
+            miss_str = ", ".join(
+                f"{self.loc.t(RESOURCE_DISPLAY_KEYS.get(r, r), default=r)}: {v}"
+                for r, v in missing.items()
+            )
+            self.log(self.loc.t("log.not_enough_resources_for_ship", missing=miss_str), "red")
+            return False
+
+        # 2) sprawdź wolnych ludzi
+        crew_needed = data.get("crew", 0)
+        free_now = self.free_workers()
+        if free_now < crew_needed:
+            self.log(self.loc.t("log.not_enough_free_workers_for_ship", needed=crew_needed, free=free_now), "red")
+            return False
+
+        # odejmij koszt
+        for r, a in cost.items():
+            self.resources[r] -= a
+
+        # zabierz ludzi z puli na czas budowy
+        self.people -= crew_needed
+
+        # budowa: arrival_to_eu = data ukończenia
+        finish_date = self.current_date + timedelta(days=data.get("build_time", 1))
+
+        used = [s.name for s in self.ships if s.name]
+        name = self.get_random_ship_name(self.state, used)
+
+        self.ships.append(Ship(finish_date, None, {}, SHIP_STATUS_BUILDING, 0, name, ship_type))
+        self.notify("resources", "population")
+        self.log(self.loc.t("log.ship_build_started", name=name, days=data.get("build_time", 1)), "blue")
+        return True
+
+    def calculate_load_time(self, load):
+        return 1 + (sum(load.values()) // 500)
+
+    def calculate_travel_days(self, ship_type):
+        base = self.rng("ships").randint(40, 80)
+
+        # prędkość państwa (jeśli brak, to 1.0)
+        state_speed = STATES[self.state].get("speed", 1.0)
+
+        # prędkość statku z typu (fallback na galleon)
+        ship_speed = SHIP_TYPES.get(ship_type, SHIP_TYPES["galleon"]).get("speed", 1.0)
+
+        # im większa prędkość, tym mniej dni
+        days = int(base / state_speed / ship_speed)
+
+        return max(1, days)
+
+    def get_random_ship_name(self, state_key, used=None):
+        """Losuje nazwę statku dla danego państwa, unikając już użytych."""
+        pool = SHIP_NAMES_BY_STATE.get(state_key, [])
+        if not pool:
+            return f"Ship {self.rng('ships').randint(1, 999)}"
+        used = set(used or [])
+        candidates = [n for n in pool if n not in used]
+        return self.rng("ships").choice(candidates if candidates else pool)
+
+    def send_ship(self, load, ship_idx=None):
+        self._ensure_ship_names()
+        total_units = sum(load.values())
+
+        # jeśli wskazano konkretny statek – użyj go
+        if ship_idx is not None:
+            free_ship = ship_idx
+            if free_ship < 0 or free_ship >= len(self.ships):
+                self.log(self.loc.t("log.no_free_ship"), "red")
+                return False
+            if self.ships[free_ship].status != SHIP_STATUS_IN_PORT:
+                self.log(self.loc.t("log.no_free_ship"), "red")
+                return False
+        else:
+            # fallback: pierwszy wolny (jak było)
+            free_ship = self.ships.first_with_status(SHIP_STATUS_IN_PORT)
+            if free_ship is None:
+                self.log(self.loc.t("log.no_free_ship"), "red")
+                return False
+
+        # pojemność wynika z typu tego konkretnego statku
+        ship = self.ships[free_ship]
+        ship_type = ship.ship_type
+        max_cargo = self._ship_capacity(ship_type)
+
+        if total_units > max_cargo:
+            self.log(
+                self.loc.t("ui.too_much_cargo", max_cargo=max_cargo, total=total_units),
+                "red"
+            )
+            return False
+
+        # >>> NIE LICZYMY MISJI TUTAJ <<<
+
+        for r, a in load.items():
+            self.resources[r] -= a
+
+        load_time = self.calculate_load_time(load)
+        travel_days = self.calculate_travel_days(ship_type)
+        days_to_europe = load_time + travel_days
+        days_in_europe = 7
+        days_back = travel_days
+
+        arrival_to_europe = self.current_date + timedelta(days=days_to_europe)
+        arrival_back = arrival_to_europe + timedelta(days=days_in_europe + days_back)
+
+        ship.arrival_to_eu = arrival_to_europe
+        ship.arrival_back = arrival_back
+        ship.load = load.copy()
+        self.ships.set_status(free_ship, SHIP_STATUS_TO_EUROPE)
+
+        self.auto_sail_timer = None
+        self.notify("resources")
+
+        self.log(
+            self.loc.t(
+                "log.ship_departed_summary",
+                to_europe=arrival_to_europe.strftime("%d %b %Y"),
+                back=arrival_back.strftime("%d %b %Y"),
+                current=total_units,
+                max=max_cargo
+            ),
+            "blue"
+        )
+        return True
+
+    def process_arriving_ships(self):
+        self._ensure_ship_names()
+        # tylko statki, którym właśnie minęła data zmiany stanu (kopiec floty)
+        for i in self.ships.pop_due(self.current_date):
+            ship = self.ships[i]
+            arrival_to_eu, arrival_back, load, status = ship.arrival_to_eu, ship.arrival_back, ship.load, ship.status
+            ship_name = ship.name
+
+            # 0) budowa statku skończona
+            if status == SHIP_STATUS_BUILDING and arrival_to_eu and self.current_date >= arrival_to_eu:
+                ship.arrival_to_eu = ship.arrival_back = None
+                ship.load = {}
+                self.ships.set_status(i, SHIP_STATUS_IN_PORT)
+                self.log(self.loc.t("log.ship_built", name=ship_name), "green")
+                continue
+
+            # 1. Statek dotarł do Europy → ROZŁADUNEK + MISJA + 7 DNI POSTOJU
+            if status == SHIP_STATUS_TO_EUROPE and arrival_to_eu and self.current_date >= arrival_to_eu:
+                if load:
+                    excess = load.copy()
+
+                    # === MISJA KRÓLEWSKA (ładunek z każdego statku) ===
+                    if self.current_mission:
+                        _, req, sent, diff, text, idx = self.current_mission
+
+                        for res in req:
+                            if res in excess:  # <--- operujemy na excess
+                                needed = req[res] - sent.get(res, 0)
+                                if needed > 0:
+                                    take = min(excess[res], needed)
+                                    sent[res] = sent.get(res, 0) + take
+                                    excess[res] -= take
+                                    if excess[res] <= 0:
+                                        del excess[res]
+
+                        # misja kończy się dopiero po realnym dopłynięciu
+                        if all(sent.get(r, 0) >= req[r] for r in req):
+                            self.log(self.loc.t("log.royal_mission_done"), "DarkOrange")
+                            self.europe_relations[self.state] = min(
+                                100,
+                                self.europe_relations[self.state] + 10 * diff
+                            )
+                            self.current_mission = None
+                            self.mission_multiplier *= 0.9
+                            self.last_mission_date = self.current_date
+                            self.complete_royal_mission()
+
+                    # === SPRZEDAŻ NADMIARU (tylko to, co zostało po misji) ===
+                    sell_mult = self.get_europe_sell_mult_for_player()
+                    gold = round(
+                        sum(a * EUROPE_PRICES.get(r, 0) * sell_mult for r, a in excess.items())
+                    )
+
+                    if gold > 0:
+                        excess_str = ", ".join(
+                            f"{self.loc.t(RESOURCE_DISPLAY_KEYS.get(k, k), default=k)}: {v}"
+                            for k, v in excess.items()
+                        )
+                        self.log(
+                            self.loc.t(
+                                "log.ship_unloaded_in_europe",
+                                ship_name=ship_name,
+                                cargo=excess_str,
+                                gold=gold
+                            ),
+                            "green"
+                        )
+                        self.resources["ducats"] += gold
+
+                # Statek pusty, czeka 7 dni
+                departure_date = arrival_to_eu + timedelta(days=7)
+                ship.arrival_back = departure_date
+                ship.load = {}
+                self.ships.set_status(i, SHIP_STATUS_IN_EUROPE_PORT)
+                self.log(
+                    self.loc.t("log.ship_waiting_in_europe", ship_name=ship_name),
+                    "blue"
+                )
+
+            # 2. Koniec postoju → wypływa PUSTY w drogę powrotną
+            elif status == SHIP_STATUS_IN_EUROPE_PORT    and self.current_date >= arrival_back:
+                days_back = self.rng("ships").randint(60, 90)
+                return_date = self.current_date + timedelta(days=days_back)
+                ship.arrival_to_eu = None
+                ship.arrival_back = return_date
+                self.ships.set_status(i, SHIP_STATUS_RETURNING)
+                self.log(
+                    self.loc.t(
+                        "log.ship_sailed_from_europe",
+                        ship_name=ship_name,
+                        date=return_date.strftime("%d %b %Y")
+                    ),
+                    "blue"
+                )
+
+            # 3. Statek wrócił do kolonii
+            elif status == SHIP_STATUS_RETURNING and arrival_back and self.current_date >= arrival_back:
+                if ship.pending > 0:
+                    self.people += ship.pending
+                    self.log(
+                        self.loc.t("log.colonists_arrived", pending=ship.pending),
+                        "green"
+                    )
+                ship.arrival_to_eu = ship.arrival_back = None
+                ship.load = {}
+                ship.pending = 0  # zeruj po wysadzeniu
+                self.ships.set_status(i, SHIP_STATUS_IN_PORT)
+                if i == self.flagship_index:
+                    self.auto_sail_timer = self.current_date + timedelta(days=14)
+                    self.scheduler.schedule(self.auto_sail_timer, "auto_sail")
+                else:
+                    self.auto_sail_timer = None  # albo zostaw bez zmian, ale nie ustawiaj tu timera
+
+                self.log(
+                    self.loc.t("log.ship_returned_ready", ship_name=ship_name),
+                    "blue"
+                )
+                self.play_sound("ship_arrived")
+
+                # Nowa misja (jeśli minęło 90 dni)
+                if i == self.flagship_index:
+                    if (self.last_mission_date is None or
+                            (self.current_date - self.last_mission_date).days >= 90):
+                        if not self.current_mission:
+                            self.deliver_new_mission()
+
+    def get_europe_sell_mult_for_player(self):
+        # reputacja z własnym państwem europejskim
+        rel = self.europe_relations.get(self.state, 0)
+        t = max(0, min(100, rel)) / 100.0
+        sell_mult = 0.5 + 0.4 * t
+
+        # bonus handlowy gracza (Anglia/Wenecja)
+        if self.state in ("england", "venice"):
+            sell_mult += STATES[self.state]["trade"]
+
+        return sell_mult
+
+    def auto_send_empty_ship(self):
+        if self.auto_sail_timer and self.current_date >= self.auto_sail_timer:
+            i = self.flagship_index
+            # auto tylko jeśli flagowiec stoi w porcie
+            if i is not None and self.ships[i].status == SHIP_STATUS_IN_PORT:
+                self.send_ship({}, ship_idx=i)
+            self.auto_sail_timer = None
+
+    # === Misje królewskie ===
+    def deliver_new_mission(self):
+        rng = self.rng("missions")
+        mission_idx = rng.randint(0, len(ROYAL_MISSIONS) - 1)
+        mission = ROYAL_MISSIONS[mission_idx]
+
+        growth = rng.uniform(1.05, 1.15)
+
+        if not self.first_mission_given:
+            self.mission_multiplier = 1
+            self.first_mission_given = True
+
+        else:
+            self.mission_multiplier *= growth
+        difficulty = int(self.mission_multiplier * 1.5)  # <-- jak wcześniej
+
+        required = {}
+        mission_name = self.loc.t(mission["name_key"], default=mission["name_key"])
+        for res, base_amt in mission["base"].items():
+            required[res] = max(1, int(base_amt * self.mission_multiplier))
+
+        end_date = self.current_date + timedelta(days=365)
+        monarch = self.get_monarch()
+        resources_txt = ", ".join(
+            f"{v} {self.loc.t(RESOURCE_DISPLAY_KEYS.get(res, res), default=res)}"
+            for res, v in required.items()
+        )
+        mission_text = self.loc.t(
+            "mission.royal.request",
+            monarch=monarch,
+            missionName=mission_name,
+            resources=resources_txt,
+            date=end_date.strftime("%d %b %Y")
+        )
+
+        # (end_date, required, sent, difficulty, mission_text, mission_idx)
+        self.current_mission = (end_date, required.copy(), {}, difficulty, mission_text, mission_idx)
+        self.log(mission_text, "purple")
+        self.play_sound("new_mission")
+
+    def pay_mission_with_gold(self):
+        if not self.current_mission:
+            self.log(self.loc.t("mission.none_active"), "red")
+            return
+
+        end, req, sent, diff, text, idx = self.current_mission
+
+        # czego jeszcze brakuje
+        remaining = {r: req[r] - sent.get(r, 0) for r in req if sent.get(r, 0) < req[r]}
+        if not remaining:
+            self.log(self.loc.t("mission.already_done"), "gray")
+            return
+
+        # wartość brakujących towarów wg cen europejskich
+        total_value = sum(a * EUROPE_PRICES.get(r, 10) for r, a in remaining.items())
+
+        # zamiast stałego 1.5 bierzemy poziom trudności diff jako mnożnik
+        cost = int(total_value * diff)
+
+        if self.resources["ducats"] < cost:
+            self.log(self.loc.t("mission.royal.not_enough_ducats", cost=cost), "red")
+            return
+
+        self.resources["ducats"] -= cost
+        self.notify("resources")
+        self.log(self.loc.t("mission.royal.paid_log", cost=cost), "DarkOrange")
+
+        # nagroda jak poprzednio
+        self.europe_relations[self.state] = min(100, self.europe_relations[self.state] + 10 * diff)
+        self.complete_royal_mission()
+
+    def complete_royal_mission(self):
+        """Wywoływane po ukończeniu misji królewskiej."""
+        self.completed_missions += 1
+        self.current_mission = None
+        self.emit("mission_completed", completed=self.completed_missions, to_win=self.missions_to_win)
+
+        if self.completed_missions >= self.missions_to_win:
+            self.emit("victory")
+
+    # === Misje indiańskie ===
+    def schedule_native_mission(self, tribe):
+        """
+        Losuje dzień, w którym plemię poprosi o następną misję.
+
+        Dawniej co dzień każde wolne plemię rzucało kością z szansą 1/14;
+        dzień pierwszego sukcesu ma rozkład geometryczny, więc losujemy go
+        od razu – od startu systemu / końca cooldownu, nie wcześniej niż jutro.
+        """
+        start = self.current_date + timedelta(days=1)
+        for earliest in (self.native_missions_enabled_start, self.native_missions_cd.get(tribe)):
+            if earliest and earliest > start:
+                start = earliest
+        wait = geometric(self.rng("native_missions"), NATIVE_MISSION_DAILY_CHANCE) - 1
+        when = start + timedelta(days=wait)
+        self.native_missions_next[tribe] = when
+        self.native_events.schedule(when, "request", tribe)
+
+    def _process_native_missions(self, until):
+        """Obsługuje prośby i wygaśnięcia misji indiańskich z datą <= until, dzień po dniu zdarzeń."""
+        while True:
+            when = self.native_events.next_date()
+            if when is None or when > until:
+                return
+            for when, kind, tribe in self.native_events.pop_due(when):
+                self.current_date = when
+                active = self.native_missions_active.get(tribe)
+                if kind == "request":
+                    # nieaktualne: po wczytaniu / nowym losowaniu albo misja już trwa
+                    if self.native_missions_next.get(tribe) != when or active:
+                        continue
+                    self.native_missions_next.pop(tribe, None)
+                    self.generate_native_mission(tribe)
+                elif kind == "expiry" and active and active["end"] == when:
+                    self._expire_native_mission(tribe)
+
+    def _expire_native_mission(self, tribe):
+        # MISJA NIEWYKONANA → kara
+        self.native_relations[tribe] = max(
+            0, self.native_relations[tribe] - 15
+        )
+        self.log(
+            self.loc.t("log.native_mission_expired", tribe=self.tribe_name(tribe)),
+            "red"
+        )
+        self.native_missions_active[tribe] = None
+        # cooldown 2–3 miesiące
+        cd = self.rng("native_missions").randint(60, 90)
+        self.native_missions_cd[tribe] = self.current_date + timedelta(days=cd)
+        self.schedule_native_mission(tribe)
+
+    def generate_native_mission(self, tribe):
+        """Tworzy nową misję dla konkretnego plemienia."""
+
+        # pierwszy raz? ustaw mnożnik
+        if tribe not in self.native_mission_multiplier:
+            self.native_mission_multiplier[tribe] = 1.0
+        else:
+            # rośnie jak w misjach królewskich
+            self.native_mission_multiplier[tribe] *= self.rng("native_missions").uniform(1.05, 1.12)
+
+        multiplier = self.native_mission_multiplier[tribe]
+
+        # wybór misji
+        idx = self.rng("native_missions").randint(0, len(NATIVE_MISSIONS_DETAILS) - 1)
+        data = NATIVE_MISSIONS_DETAILS[idx]
+
+        # wymagania
+        required = {
+            res: max(1, int(base * multiplier))
+            for res, base in data["base"].items()
+        }
+
+        # czas trwania 3–6 miesięcy
+        months = self.rng("native_missions").randint(3, 6)
+        end_date = self.current_date + timedelta(days=30 * months)
+
+        mission = {
+            "tribe": tribe,
+            "name_key": data["name_key"],
+            "desc_key": data.get("desc_key", ""),
+            "required": required,
+            "sent": {},
+            "end": end_date,
+            "months_limit": months,
+            "idx": idx,
+        }
+
+        self.native_missions_active[tribe] = mission
+        self.native_events.schedule(end_date, "expiry", tribe)
+
+        mission_name = self.loc.t(data["name_key"], default=data["name_key"])
+        self.log(
+            self.loc.t(
+                "log.native_mission_new",
+                tribe=self.tribe_name(tribe),
+                name=mission_name,
+                months=months
+            ),
+            "purple"
+        )
+        self.play_sound("new_mission")
+
+    def deliver_to_native_mission(self, tribe, resources):
+        """resources = dict {res: amount} wysłanych towarów."""
+
+        mission = self.native_missions_active.get(tribe)
+        if not mission:
+            self.log(self.loc.t("log.native_mission_none", tribe=self.tribe_name(tribe)), "gray")
+            return False
+
+        req = mission["required"]
+        sent = mission["sent"]
+
+        # dodaj zasoby
+        for r, amount in resources.items():
+            if r in req:
+                need = req[r] - sent.get(r, 0)
+                add = min(amount, need)
+                sent[r] = sent.get(r, 0) + add
+
+        # sprawdzenie, czy skończone
+        completed = all(sent.get(r, 0) >= req[r] for r in req)
+
+        if completed:
+            # cooldown 2–3 miesiące
+            self.complete_native_mission(tribe, base_reward=5, cooldown=(60, 90))
+
+        return True
+
+    def complete_native_mission(self, tribe, base_reward, cooldown, log_key="log.native_mission_done"):
+        """
+        Zamyka wykonaną misję plemienia: nagroda (base_reward + 2 za każdy pełny
+        miesiąc zapasu), cooldown z zakresu `cooldown` dni i data następnej prośby.
+        """
+        mission = self.native_missions_active[tribe]
+        remaining_days = (mission["end"] - self.current_date).days
+        full_months_left = max(0, remaining_days // 30)
+
+        reward = base_reward + full_months_left * 2
+
+        self.native_relations[tribe] = min(
+            100, self.native_relations[tribe] + reward
+        )
+        self.log(self.loc.t(log_key, tribe=self.tribe_name(tribe), reward=reward), "green")
+
+        self.native_missions_active[tribe] = None
+
+        cd = self.rng("native_missions").randint(*cooldown)
+        self.native_missions_cd[tribe] = self.current_date + timedelta(days=cd)
+        self.schedule_native_mission(tribe)
+
+    def send_diplomatic_gift(self, state):
+
+        cost = {"gold": 10, "food": 250, "silver": 20, "steel": 15}
+        if not self.can_afford(cost):
+            self.log(self.loc.t("log.gift_not_enough", state=self.state_name(state)), "red")
+            return
+        self.spend_resources(cost)
+        self.notify("resources")
+        self.europe_relations[state] = min(100, self.europe_relations[state] + 5)
+        self.log(self.loc.t("log.gift_sent", state=self.state_name(state)), "purple")
+
+    # === Ekspedycje ===
+    def start_expedition(self, pos, end_date, kind="explore"):
+        exp = (end_date, pos, kind)
+        self.expeditions.append(exp)
+        self.scheduler.schedule(end_date, "expedition", exp)
+
+    def finish_expedition(self, exp):
+        self.busy_people -= 3
+        y, x = exp[1]
+        cell = self.map_grid[y][x]
+
+        if exp[2] == "explore":
+            cell["discovered"] = True
+
+            terrain = cell["terrain"]
+            terrain_name = self.loc.t(f"terrain.{terrain}.name", default=terrain)
+
+            raw_res = cell.get("resource")  # to jest ID albo None
+
+            if not raw_res:  # None / "" / brak
+                self.log(
+                    self.loc.t(
+                        "log.discovered_no_resource_cell",
+                        y=y, x=x,
+                        terrain=terrain_name
+                    ),
+                    "DarkOrange"
+                )
+            else:
+                res_name = self.loc.t(RESOURCE_DISPLAY_KEYS.get(raw_res, raw_res), default=raw_res)
+                self.log(
+                    self.loc.t(
+                        "log.discovered_cell",
+                        y=y, x=x,
+                        terrain=terrain_name,
+                        resource=res_name
+                    ),
+                    "DarkOrange"
+                )
+
+            # bonus eksploracyjny państwa (np. Hiszpania ma 'explore': 1.4)
+            explore_mult = STATES.get(self.state, {}).get("explore", 1.0)
+
+            def scaled(amount):
+                return max(1, int(amount * explore_mult))
+
+            gains = []
+
+            if terrain == "forest":
+                wood = scaled(50)
+                skins = scaled(25)
+                self.resources["wood"] += wood
+                self.resources["skins"] += skins
+                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.wood"), amount=wood))
+                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.skins"), amount=skins))
+
+            elif terrain == "field":
+                food = scaled(50)
+                self.resources["food"] += food
+                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
+
+            elif terrain == "sea":
+                food = scaled(50)
+                self.resources["food"] += food
+                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
+
+            elif terrain == "hills":
+                ore_type = cell.get("resource")
+                if ore_type:
+                    ore_amt = scaled(50)
+                    self.resources[ore_type] = self.resources.get(ore_type, 0) + ore_amt
+                    gains.append(self.loc.t("log.gain_resource", res=self.loc.t(RESOURCE_DISPLAY_KEYS.get(ore_type, ore_type)), amount=ore_amt))
+                else:
+                    food = scaled(50)
+                    self.resources["food"] += food
+                    gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
+
+            else:
+                food = scaled(50)
+                self.resources["food"] += food
+                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
+
+            if gains:
+                self.log(
+                    self.loc.t("log.exploration_loot") + ", ".join(gains),
+                    "green"
+                )
+
+    # === Upływ czasu ===
+    def advance_date(self, days):
+        """
+        Przewija czas o `days` dni.
+
+        Zamiast liczyć wszystko dzień po dniu dzielimy okres na odcinki między
+        „horyzontami zdarzeń” (koniec budowy/ulepszenia, statek, ekspedycja,
+        auto-rejs). W odcinku liczba ludzi i budynki są stałe, więc głód
+        i produkcja idą w formie zamkniętej; po każdym odcinku tick() domyka
+        to, co właśnie dojrzało.
+        """
+        # jednorazowy cProfile / profiler próbkujący wokół tego przewinięcia (profiling.py)
+        kind, self.profile_next_advance = self.profile_next_advance, None
+        if kind:
+            with self.profiler.profile(kind, self.profile_out_path):
+                self._advance_days(days)
+        else:
+            self._advance_days(days)
+
+    def _advance_days(self, days):
+        profiler = self.profiler
+        with profiler.frame("advance_date"):
+            self._starvation_report = {"excess": 0, "days": 0, "deaths": 0}
+            left = days
+            while left > 0:
+                span = min(left, self._days_to_next_event())
+                self._advance_span(span)
+                left -= span
+                with profiler.phase("tick"):
+                    self.tick()
+            self._log_starvation_report()
+
+            if self.current_mission is not None and self.current_mission[0] < self.current_date:
+                end, req, sent, diff, text, idx = self.current_mission
+                rep_penalty = 10 * diff
+                self.log(self.loc.t("log.royal_mission_failed", penalty=rep_penalty), "red")
+                self.europe_relations[self.state] = max(0, self.europe_relations[self.state] - rep_penalty)
+                self.current_mission = None
+
+            self.notify("date", "resources", "population")
+
+    def _days_to_next_event(self):
+        """Za ile dni (min. 1) dojrzeje najbliższe zdarzenie (kolejka silnika lub kopiec floty), które zamyka tick()."""
+        dates = [d for d in (self.scheduler.next_date(), self.ships.next_date()) if d is not None]
+        if not dates:
+            return float("inf")
+        next_date = min(dates)
+        return max(1, (next_date - self.current_date).days)
+
+    def _advance_span(self, days):
+        profiler = self.profiler
+        with profiler.phase("starvation"):
+            self._apply_starvation(days)
+
+        # --- PRODUKCJA / KONSUMPCJA: skoki o tyle dni, ile bilans jest stały ---
+        left = days
+        while left > 0:
+            with profiler.phase("production"):
+                food_limit, goods_limit = self.calculate_storage_limits()
+                if self._uses_array_economy():
+                    step = self._production_step_arrays(left, food_limit, goods_limit)
+                else:
+                    step = self._production_step(left, food_limit, goods_limit)
+
+            # --- produkcja plemion indiańskich: min(cap, stock + prod * dni) ---
+            with profiler.phase("native_production"):
+                self.natives.advance(step)
+
+            # --- czas; misje indiańskie tylko w dniach swoich zdarzeń ---
+            end_date = self.current_date + timedelta(days=step)
+            with profiler.phase("native_missions"):
+                self._process_native_missions(end_date)
+            self.current_date = end_date
+
+            left -= step
+            profiler.count("production_steps")
+
+    def _apply_starvation(self, days):
+        # --- GŁÓD: ludzie i pojemność stałe w odcinku → liczymy zbiorczo ---
+        report = self._starvation_report
+        self.days_passed += days
+        food = self.resources["food"]
+        cap = self.calculate_population_capacity()
+
+        food_needed = int(self.daily_food_need(cap))
+        if self.people > cap:
+            # przeludnienie — tylko log (brak wypędzania), raz na advance_date
+            report["excess"] = max(report["excess"], self.people - cap)
+
+        # ile dni z rzędu starczy jedzenia; po pierwszym głodnym dniu spichlerz jest pusty
+        fed_days = days if food_needed <= 0 else min(days, int(food // food_needed))
+        food -= fed_days * food_needed
+        starvation_days = days - fed_days
+        if starvation_days > 0:
+            food = 0
+
+        # jeśli w tej turze wystąpił głód choć jednego dnia → losowa śmiertelność
+        if starvation_days > 0 and self.people > 0:
+            # szansa przeżycia jednego kolonisty po N dniach głodu
+            survival_prob = 0.95 ** starvation_days
+            # każdy kolonista umiera niezależnie z p = 1 - survival_prob → jedno losowanie dwumianowe
+            deaths = binomial(self.rng("mortality"), self.people, 1.0 - survival_prob)
+
+            report["days"] += starvation_days
+            if deaths > 0:
+                self.people -= deaths
+                report["deaths"] += deaths
+
+        self.resources["food"] = food
+
+    def _log_starvation_report(self):
+        """Jeden wpis o przeludnieniu i jeden o ofiarach głodu na całe advance_date (jak dzień po dniu)."""
+        report, self._starvation_report = self._starvation_report, None
+        with self.profiler.phase("logging"):
+            if report["excess"] > 0:
+                self._write_log(self.loc.t("log.overcrowding", excess=report["excess"]), "orange")
+            if report["deaths"] > 0:
+                self._write_log(
+                    self.loc.t(
+                        "log.starvation_deaths",
+                        days=report["days"],
+                        deaths=report["deaths"]
+                    ),
+                    "red"
+                )
+
+    def _production_step(self, max_days, food_limit, goods_limit):
+        """Nakłada bilans na tyle dni (≤ max_days), ile się nie zmienia; zwraca liczbę dni."""
+        building_data = self.calculate_production()
+        daily_net = self._daily_net(building_data)
+
+        step = self._stable_production_days(building_data, daily_net, food_limit, goods_limit, max_days)
+        with self.profiler.phase("storage"):
+            self._apply_daily_net(daily_net, step, food_limit, goods_limit)
+        return step
+
+    def _production_step_arrays(self, max_days, food_limit, goods_limit):
+        """To samo co _production_step, ale na macierzach z economy.py."""
+        econ = self._array_economy()
+        stock = econ.stock_vector(self.resources)
+        limits = econ.limit_vector(food_limit, goods_limit)
+        net = econ.daily_net(stock)
+
+        step = econ.stable_days(stock, net, limits, max_days)
+        with self.profiler.phase("storage"):
+            new_stock, blocked = econ.apply(stock, net, step, limits)
+
+            for i in np.flatnonzero(new_stock != stock):
+                self.resources[RESOURCES[i]] = float(new_stock[i])
+            for i in np.flatnonzero(blocked):
+                self._log_storage_full(RESOURCES[i])
+        return step
+
+    def _daily_net(self, building_data):
+        daily_net = {r: 0 for r in RESOURCES}
+
+        for b, prod, cons, eff in building_data:
+            # jeśli nie działa (brak wejść) to pomijamy
+            if eff == 0 and any(cons.values()):
+                continue
+
+            for res, amt in prod.items():
+                daily_net[res] += amt * eff
+
+            for res, amt in cons.items():
+                daily_net[res] -= amt * eff
+
+        return daily_net
+
+    def daily_production_net(self):
+        """Dzienny bilans surowców z budynków przy obecnych zapasach (bez jedzenia ludzi)."""
+        if self._uses_array_economy():
+            econ = self._array_economy()
+            net = econ.daily_net(econ.stock_vector(self.resources))
+            return {r: float(net[i]) for i, r in enumerate(RESOURCES)}
+        return self._daily_net(self.calculate_production())
+
+    def daily_food_need(self, cap=None):
+        """Dzienne zużycie jedzenia przez ludzi; ponad pojemność osady z mnożnikiem przeludnienia."""
+        if cap is None:
+            cap = self.calculate_population_capacity()
+        if self.people > cap:
+            excess = self.people - cap
+            base_food = cap * FOOD_CONSUMPTION_PER_PERSON
+            extra_food = excess * FOOD_CONSUMPTION_PER_PERSON * FOOD_OVERCROWDING_MULTIPLIER
+            return base_food + extra_food
+        return self.people * FOOD_CONSUMPTION_PER_PERSON
+
+    def _stable_production_days(self, building_data, daily_net, food_limit, goods_limit, max_days):
+        """
+        Ile kolejnych dni (1..max_days) dzienny bilans pozostanie identyczny:
+        żaden surowiec nie zejdzie poniżej zapotrzebowania budynków (wydajność),
+        nie zostanie ucięty do zera ani nie dobije do limitu magazynu.
+        """
+        # największe dzienne zapotrzebowanie pojedynczego budynku na dany surowiec
+        needed = {}
+        for b, prod, cons, eff in building_data:
+            for res, amt in cons.items():
+                if amt > 0:
+                    needed[res] = max(needed.get(res, 0), amt)
+
+        span = max_days
+        for res, change in daily_net.items():
+            cur = self.resources.get(res, 0)
+            need = needed.get(res, 0)
+
+            # wydajność < 1 i stan się rusza → zmienia się z dnia na dzień
+            if need and cur < need and change != 0:
+                return 1
+
+            if change < 0:
+                threshold = max(-change, need)
+                if cur < threshold:
+                    return 1
+                span = min(span, int((cur - threshold) // -change) + 1)
+
+            elif change > 0:
+                limit = food_limit if res == "food" else goods_limit
+                if cur >= limit:
+                    continue  # magazyn pełny – i tak stoi
+                full_days = int((limit - cur) // change)
+                if full_days == 0:
+                    return 1
+                span = min(span, full_days)
+
+        return max(1, span)
+
+    def _apply_daily_net(self, daily_net, days, food_limit, goods_limit):
+        for res, change in daily_net.items():
+            if change < 0:
+                # ograniczamy zużycie do dostępnych zasobów
+                available = self.resources.get(res, 0)
+                to_consume = min(available, -change * days)
+                self.resources[res] -= to_consume
+
+            elif change > 0:
+                cur = self.resources.get(res, 0)
+
+                # rozróżnienie food vs goods
+                limit = food_limit if res == "food" else goods_limit
+
+                if cur >= limit:
+                    # produkcja staje – nic nie dodajemy
+                    self._log_storage_full(res)
+                    continue
+
+                # jak jest miejsce częściowo, to dotnij produkcję do limitu
+                addable = min(change * days, limit - cur)
+                self.resources[res] = cur + addable
+
+    def _log_storage_full(self, res):
+        # log tylko raz na dany surowiec na dzień
+        key = (self.current_date, res)
+        if key not in self._full_storage_logged:
+            with self.profiler.phase("logging"):
+                res_name = self.loc.t(RESOURCE_DISPLAY_KEYS.get(res, res), default=res)
+                self._write_log(self.loc.t("log.no_storage_space", res=res_name), "DarkOrange")
+            self._full_storage_logged.add(key)
+
+    # === Kolejka zdarzeń ===
+    def rebuild_schedule(self):
+        """Odtwarza kolejkę z list stanu gry (nowa gra, reset, wczytanie zapisu)."""
+        self.scheduler.clear()
+        for c in self.constructions:
+            self.scheduler.schedule(c[0], "construction", c)
+        for u in self.upgrades_in_progress:
+            self.scheduler.schedule(u[0], "upgrade", u)
+        for e in self.expeditions:
+            self.scheduler.schedule(e[0], "expedition", e)
+        # statki mają własny kopiec dat w Fleet
+        self.ships.rebuild_due()
+        self.scheduler.schedule(self.auto_sail_timer, "auto_sail")
+
+        self.native_events.clear()
+        # reset gry: bez daty nie ma od czego liczyć próśb o misje
+        if self.native_missions_enabled_start is None or self.current_date is None:
+            return
+        for tribe in self.native_relations:
+            active = self.native_missions_active.get(tribe)
+            if active:
+                self.native_events.schedule(active["end"], "expiry", tribe)
+            elif self.native_missions_next.get(tribe):
+                self.native_events.schedule(self.native_missions_next[tribe], "request", tribe)
+            else:
+                # nowa gra albo zapis sprzed losowania dni próśb
+                self.schedule_native_mission(tribe)
+
+    def tick(self):
+        """
+        Zamyka wszystko, co „dojrzało” do bieżącej daty: budowy, ulepszenia,
+        statki, auto-rejs flagowca, ekspedycje i koniec gry.
+        """
+        if not self.current_date:
+            return
+
+        # zdejmij z kolejki wszystko, co dojrzało, i rozdziel wg rodzaju
+        due = {}
+        for when, kind, payload in self.scheduler.pop_due(self.current_date):
+            due.setdefault(kind, []).append(payload)
+
+        # budów się nie anuluje – każdy wpis jest aktualny
+        finished = due.get("construction", [])
+        for c in finished:
+            self.constructions.remove(c)
+            new_b = c[1]
+            self.buildings.add(new_b)
+            self.busy_people -= c[2]
+            y, x = new_b["pos"]
+            self.map_grid.add_building(y, x, new_b["id"])
+            self.mark_production_dirty(new_b["id"])
+
+            nice_name = self.get_building_display_name(new_b)
+            self.log(self.loc.t("log.completed_generic", nice_name=nice_name), "green")
+            self.play_sound("building_done")
+
+        # ulepszenie mogło zostać anulowane / przerwane degradacją
+        finished_upgrades = [u for u in due.get("upgrade", []) if u in self.upgrades_in_progress]
+        for u in finished_upgrades:
+            self.upgrades_in_progress.remove(u)
+            bid = u[1]
+            old_level = self.buildings[bid]["level"]
+            self.buildings[bid]["level"] = u[2]
+            if "capacity" in BUILDINGS[self.buildings[bid]["base"]]["upgrades"][u[2]-1]:
+                self.buildings[bid]["capacity"] = BUILDINGS[self.buildings[bid]["base"]]["upgrades"][u[2]-1]["capacity"]
+            workers_used = BUILDINGS[self.buildings[bid]["base"]]["upgrades"][old_level].get("workers", 1)
+            self.busy_people -= workers_used
+            self.mark_production_dirty(bid)
+
+            self.log(self.loc.t("log.upgrade_done"), "DarkOrange")
+            self.play_sound("building_done")
+
+        ship_date = self.ships.next_date()
+        ships_due = ship_date is not None and ship_date <= self.current_date
+        if ships_due:
+            self.process_arriving_ships()
+        if "auto_sail" in due:
+            self.auto_send_empty_ship()
+
+        exp_done = due.get("expedition", [])
+        for e in exp_done:
+            self.expeditions.remove(e)
+            self.finish_expedition(e)
+
+        if exp_done or ships_due or "auto_sail" in due:
+            # budynki zgłaszają się same przez mark_production_dirty
+            self.notify("resources", "population")
+
+        if self.people <= 0 and not self.game_over:
+            self.game_over = True
+            self.emit("game_over")
+
+    def run_days(self, days, step=1):
+        """
+        Headless: przewija czas o `days` dni kawałkami po `step`
+        (jak gracz klikający „czekaj”), po każdym kawałku domyka zdarzenia.
+        """
+        left = days
+        while left > 0 and not self.game_over:
+            chunk = min(step, left)
+            self.advance_date(chunk)
+            self.tick()
+            left -= chunk
@@ -0,0 +1,148 @@
+# fleet.py
+"""
+Statki kolonii jako rekordy z __slots__ zamiast 7-elementowych krotek
+oraz flota z indeksem po statusie.
+
+Ship zmienia się w miejscu (bez przepakowywania krotki przy każdym
+przejściu stanu), a Fleet pamięta, które statki mają dany status –
+„pierwszy wolny w porcie” czy „statki w drodze” nie wymagają skanu
+całej floty. Status zmieniamy zawsze przez Fleet.set_status(), żeby
+indeks nie rozjechał się z rekordami.
+
+Flota trzyma też kopiec dat najbliższych zmian stanu (zbudowany, dopłynął
+do Europy, wypływa z Europy, wrócił). Wpisy są leniwe jak w scheduler.py:
+po zmianie stanu dochodzi nowy wpis, a stary odpada przy zdjęciu, bo data
+nie zgadza się już z Ship.next_event_date().
+"""
+import heapq
+from itertools import count
+
+from constants import (
+    SHIP_STATUS_BUILDING, SHIP_STATUS_IN_EUROPE_PORT, SHIP_STATUS_IN_PORT,
+    SHIP_STATUS_RETURNING, SHIP_STATUS_TO_EUROPE,
+)
+
+
+class Ship:
+    __slots__ = ("arrival_to_eu", "arrival_back", "load", "status", "pending", "name", "ship_type")
+
+    def __init__(self, arrival_to_eu=None, arrival_back=None, load=None, status=SHIP_STATUS_IN_PORT,
+                 pending=0, name=None, ship_type="galleon"):
+        self.arrival_to_eu = arrival_to_eu
+        self.arrival_back = arrival_back
+        self.load = load if load is not None else {}
+        self.status = status
+        self.pending = pending
+        self.name = name
+        self.ship_type = ship_type
+
+    @classmethod
+    def from_tuple(cls, t):
+        """
+        Stare formaty krotek:
+        7: (arrival_to_eu, arrival_back, load, status, pending, name, ship_type)
+        6: (arrival_to_eu, arrival_back, load, status, pending, name)       → galleon
+        5: (arrival_to_eu, arrival_back, load, status, pending)             → bez nazwy, galleon
+        """
+        arrival_to_eu, arrival_back, load, status, pending = t[:5]
+        name = t[5] if len(t) > 5 else None
+        ship_type = t[6] if len(t) > 6 else "galleon"
+        return cls(arrival_to_eu, arrival_back, dict(load or {}), status, pending, name, ship_type)
+
+    def to_tuple(self):
+        return (self.arrival_to_eu, self.arrival_back, self.load, self.status,
+                self.pending, self.name, self.ship_type)
+
+    def next_event_date(self):
+        """Data najbliższej zmiany stanu albo None (stoi w porcie)."""
+        if self.status in (SHIP_STATUS_BUILDING, SHIP_STATUS_TO_EUROPE):
+            return self.arrival_to_eu
+        if self.status in (SHIP_STATUS_IN_EUROPE_PORT, SHIP_STATUS_RETURNING):
+            return self.arrival_back
+        return None
+
+    def __repr__(self):
+        return f"Ship({self.name!r}, {self.ship_type}, {self.status})"
+
+
+class Fleet:
+    """Statki w stałej kolejności (indeks = numer w UI / flagship_index) + indeks status → indeksy."""
+
+    def __init__(self, ships=()):
+        self._ships = []
+        self._by_status = {}
+        # (data, seq, indeks statku)
+        self._due = []
+        self._seq = count()
+        for s in ships:
+            self.append(s if isinstance(s, Ship) else Ship.from_tuple(s))
+
+    def append(self, ship):
+        self._ships.append(ship)
+        idx = len(self._ships) - 1
+        self._by_status.setdefault(ship.status, set()).add(idx)
+        self._push(idx)
+        return idx
+
+    def set_status(self, idx, status):
+        """Zmienia status (daty statku ustaw wcześniej) i kolejkuje jego następne zdarzenie."""
+        ship = self._ships[idx]
+        if ship.status != status:
+            self._by_status.get(ship.status, set()).discard(idx)
+            self._by_status.setdefault(status, set()).add(idx)
+            ship.status = status
+        self._push(idx)
+        return ship
+
+    # === Kopiec zdarzeń ===
+    def _push(self, idx):
+        when = self._ships[idx].next_event_date()
+        if when is not None:
+            heapq.heappush(self._due, (when, next(self._seq), idx))
+
+    def _is_current(self, entry):
+        when, _, idx = entry
+        return self._ships[idx].next_event_date() == when
+
+    def rebuild_due(self):
+        self._due = []
+        for idx in range(len(self._ships)):
+            self._push(idx)
+
+    def next_date(self):
+        """Data najbliższej zmiany stanu w całej flocie albo None."""
+        while self._due and not self._is_current(self._due[0]):
+            heapq.heappop(self._due)
+        return self._due[0][0] if self._due else None
+
+    def pop_due(self, now):
+        """Zdejmuje statki, których zmiana stanu wypada <= now; zwraca ich indeksy rosnąco."""
+        due = set()
+        while self._due and self._due[0][0] <= now:
+            entry = heapq.heappop(self._due)
+            if self._is_current(entry):
+                due.add(entry[2])
+        return sorted(due)
+
+    def indices_with_status(self, *statuses):
+        """Indeksy statków o podanych statusach, rosnąco."""
+        out = set()
+        for status in statuses:
+            out |= self._by_status.get(status, set())
+        return sorted(out)
+
+    def first_with_status(self, status):
+        indices = self._by_status.get(status)
+        return min(indices) if indices else None
+
+    def count(self, status):
+        return len(self._by_status.get(status, ()))
+
+    def __getitem__(self, idx):
+        return self._ships[idx]
+
+    def __iter__(self):
+        return iter(self._ships)
+
+    def __len__(self):
+        return len(self._ships)
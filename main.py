@@ -13,11 +13,10 @@ import sys
 import tkinter as tk
 from ctypes import windll
 from tkinter import ttk
-from datetime import timedelta
 import pygame
 from PIL import Image, ImageTk
 from buildings import BuildingsMixin
-from map_generator import generate_map, MAP_SIZE
+from engine import ColonyEngine
 from constants import *
 from missions import MissionsMixin
 from relations import RelationsMixin
@@ -26,6 +25,24 @@ from map_views import MapUIMixin
 from tooltip import Tooltip
 from settings_manager import load_settings, save_settings
 
+# aspekt zmiany stanu (ColonyEngine.notify) → grupy widżetów górnego paska do odświeżenia
+DISPLAY_GROUPS = {
+    "date": ("date",),
+    "population": ("population", "net"),
+    "resources": ("resources", "net"),
+    "buildings": ("population", "resources", "net"),
+}
+
+# kolory wpisów dziennika – tagi rejestrujemy raz przy tworzeniu okna dziennika
+JOURNAL_COLORS = ("black", "red", "green", "blue", "orange", "purple", "DarkOrange", "gray")
+# okno dziennika może urosnąć o tyle linii ponad LOG_VISIBLE_LINES, zanim przytniemy górę
+JOURNAL_TRIM_BATCH = 50
+
+# nakładka debug z czasami faz (profiling.py): co ile ms odświeżana, gdzie trafia profil jednego „czekaj”
+PROFILER_OVERLAY_MS = 500
+PROFILE_ADVANCE_PATH = "profile_advance.prof"
+PROFILE_SAMPLES_PATH = "profile_advance.folded"
+
 def load_font_ttf(path):
     """
     Ładuje font TTF do pamięci procesu Windows.
@@ -37,7 +54,7 @@ def load_font_ttf(path):
     path = os.path.abspath(path)
     windll.gdi32.AddFontResourceExW(path, FR_PRIVATE, 0)
 
-class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin, MapUIMixin):
+class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin, MapUIMixin, ColonyEngine):
 
     def __init__(self, root):
         self.root = root
@@ -61,11 +78,16 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
         load_font_ttf(self.resource_path("fonts/EBGaramond-Italic.ttf"))
         load_font_ttf(self.resource_path("fonts/MedievalSharp-Regular.ttf"))
 
+        # stan gry i logika dnia siedzą w ColonyEngine (engine.py), UI tylko słucha zdarzeń;
+        # najpierw silnik – grafika mapy losuje ziarno kafli ze strumieni self.rngs
+        ColonyEngine.__init__(self, self.loc)
+
         # grafika mapy (kafelki lasu itp.)
         self.init_map_graphics()
         self.init_ocean_tiles()
         self.init_mountains_tiles()
         self.init_forest_tiles()
+        self.init_autotile_tables()
 
         self.title_font = ("IM Fell English SC", 28, "bold")
         self.ui_font = ("EB Garamond Italic", 18)
@@ -103,119 +125,78 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
                   relief=[("pressed", "sunken"), ("!pressed", "raised")]
                   )
 
-        self.state = None
-        self.location = None
-        self.current_date = None
-        self.people = 100
-        self.busy_people = 0
-        self.days_passed = 0
-
-        # self.resources = {r: 5000 if r in ["drewno", "żywność", "skóry", "żelazo", "stal"] else 0 for r in RESOURCES}
-        self.resources = {r: 0 for r in RESOURCES}
-
-        self.resources["food"] = 100000
-        self.resources["wood"] = 10000
-        self.resources["skins"] = 1000
-        self.resources["clothes"] = 1000
-        self.resources["herbs"] = 1000
-        self.resources["meds"] = 1000
-        self.resources["iron"] = 1000
-        self.resources["steel"] = 1000
-        self.resources["cane"] = 1000
-        self.resources["sugar"] = 1000
-        self.resources["tobacco"] = 1000
-        self.resources["cigars"] = 1000
-        self.resources["coal"] = 1000
-        self.resources["silver"] = 1000
-        self.resources["gold"] = 1000
-        self.resources["ducats"] = 10000
-
-        # self.resources["food"] = 1000
-        # self.resources["wood"] = 50
-        # self.resources["iron"] = 30
-        # self.resources["skins"] = 10
-        # self.resources["silver"] = 10
-        # self.resources["meds"] = 10
-        # self.resources["ducats"] = 300
-
-        self.buildings = []
-        self.constructions = []
-        self.upgrades_in_progress = []
-        self.expeditions = []
-        self.ships = []
-        self.auto_sail_timer = None
-
-        self.native_relations = {
-            tribe: 50
-            for tribe in random.sample(list(TRIBE_DISPLAY_KEYS.keys()), 3)
-        }
-        # reputacja z państwami europejskimi – na start 0, później własne państwo podbijemy
-        self.europe_relations = {s: 0 for s in STATES}
-
-        self.native_prod = {}
-        self.native_cap = {}
-        self.native_stock = {}
-
-        for tribe in self.native_relations:
-            prod_map = {}
-            cap_map = {}
-            stock_map = {}
-            for res, econ in NATIVE_RESOURCE_ECONOMY.items():
-                p_min, p_max = econ["daily_prod"]
-                c_min, c_max = econ["stockpile"]
-                prod_val = random.uniform(p_min, p_max)
-                cap_val = random.uniform(c_min, c_max)
-                prod_map[res] = prod_val
-                cap_map[res] = cap_val
-                stock_map[res] = cap_val  # startują pełni, żeby handel miał sens od razu
-            self.native_prod[tribe] = prod_map
-            self.native_cap[tribe] = cap_map
-            self.native_stock[tribe] = stock_map
-
-        # kumulacja wartości handlu (do progów reputacji)
-        self.native_trade_value = {tribe: 0 for tribe in self.native_relations}
-        self.europe_trade_value = {s: 0 for s in self.europe_relations}
-        self.trade_reputation_threshold = 1000
-
-        self.map_size = MAP_SIZE
-        self.map_grid = None
-        self.settlement_pos = None
-        self.selected_building = None
-        self.log_lines = []
-
-        self.flagship_index = 0
-        self.current_mission = None  # (end_date, required, sent, difficulty, mission_text, index)
-        self.last_mission_date = None
-        self.mission_multiplier = 1.0
-        self.first_mission_given = False
-
-        self.completed_missions = 0
-        self.missions_to_win = 100
-
-        # Mechanika misji indiańskich
-        self.native_missions_active = {}  # tribe → dict z aktywną misją
-        self.native_missions_cd = {}  # tribe → data kiedy mogą poprosić ponownie
-        self.native_mission_multiplier = {}  # tribe → mnożnik trudności jak w misjach królewskich
-
-        # przyszłe misje od Indian – na razie pusta lista
-        # struktura np.: {"tribe": "Irokezi", "text": "...", "end": data, "progress": "..."}
-        self.native_missions = []
-
-        self.current_monarch = ""
+        # odświeżanie górnego paska sterowane zdarzeniami "changed" (bez pollingu co 100 ms)
+        self._pending_display = set()
+        self._display_refresh_scheduled = False
+        self.subscribe(self._on_engine_event)
+
+        # debug: F3 = czasy faz + nakładka, F4 / Shift+F4 = cProfile / próbkowanie najbliższego „czekaj”
+        self._profiler_overlay = None
+        self._profiler_overlay_job = None
+        self.root.bind("<F3>", lambda _e: self.toggle_profiler_overlay())
+        self.root.bind("<F4>", lambda _e: self.profile_next_wait("cprofile"))
+        self.root.bind("<Shift-F4>", lambda _e: self.profile_next_wait("sampling"))
 
         self.start_screen()
         pygame.mixer.init()
         self.init_sounds()
 
 
-    # === Pomocnicze ===
-    def log(self, text, color="black"):
-        if not self.current_date: return
-        entry = f"[{self.current_date.strftime('%d %b %Y')}] {text}"
-        self.log_lines.append((entry, color))
-        if len(self.log_lines) > 1000: self.log_lines.pop(0)
-        self.update_log_display()
+    # === Zdarzenia silnika ===
+    def _on_engine_event(self, event, **payload):
+        if event == "log":
+            self._append_log_line(payload["text"], payload["color"])
+        elif event == "sound":
+            self._play_sound_effect(payload["name"])
+        elif event == "mission_completed":
+            if hasattr(self, "mission_counter_label") and self.mission_counter_label.winfo_exists():
+                self.mission_counter_label.config(
+                    text=self.loc.t(
+                        "mission.royal.counter",
+                        completed=payload["completed"],
+                        to_win=payload["to_win"]
+                    )
+                )
+        elif event == "changed":
+            self._schedule_display_refresh(payload["aspects"])
+        elif event == "victory":
+            self.win_game()
+        elif event == "game_over":
+            self.death_game()
+
+    # === Profilowanie (debug) ===
+    def toggle_profiler_overlay(self):
+        self.profiler.enabled = not self.profiler.enabled
+        if self._profiler_overlay_job is not None:
+            self.root.after_cancel(self._profiler_overlay_job)
+            self._profiler_overlay_job = None
+        if not self.profiler.enabled:
+            if self._profiler_overlay is not None and self._profiler_overlay.winfo_exists():
+                self._profiler_overlay.destroy()
+            self._profiler_overlay = None
+            return
+        self._refresh_profiler_overlay()
 
+    def _refresh_profiler_overlay(self):
+        if not self.profiler.enabled:
+            return
+        # main_game czyści okno – etykietę tworzymy od nowa, gdy zniknęła
+        if self._profiler_overlay is None or not self._profiler_overlay.winfo_exists():
+            self._profiler_overlay = tk.Label(self.root, justify="left", anchor="nw", font=("Consolas", 9),
+                                              background="#1d130c", foreground="#f0ddba")
+            self._profiler_overlay.place(relx=1.0, rely=1.0, anchor="se", x=-8, y=-8)
+        lines = self.profiler.summary_lines() or ["profiler: brak pomiarów"]
+        self._profiler_overlay.config(text="\n".join(lines))
+        self._profiler_overlay.lift()
+        self._profiler_overlay_job = self.root.after(PROFILER_OVERLAY_MS, self._refresh_profiler_overlay)
+
+    def profile_next_wait(self, kind):
+        """Najbliższe „czekaj” pójdzie pod cProfile albo profiler próbkujący; wynik do pliku."""
+        self.profile_next_advance = kind
+        self.profile_out_path = PROFILE_ADVANCE_PATH if kind == "cprofile" else PROFILE_SAMPLES_PATH
+        self.log(f"profiler: {kind} → {self.profile_out_path}", "gray")
+
+    # === Pomocnicze ===
     def center_window(self, win):
         self.loc.t("dev.center_window_comment")
         win.update_idletasks()
@@ -297,7 +278,7 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
             except Exception:
                 pass
 
-    def play_sound(self, name):
+    def _play_sound_effect(self, name):
         snd = getattr(self, "sounds", {}).get(name)
         if snd:
             snd.play()
@@ -331,66 +312,44 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
 
         self._game_menu_win = GameMenuWindow(self)
 
+    def _journal_tag(self, color):
+        """Tag koloru w oknie dziennika; nieznane kolory rejestrujemy przy pierwszym użyciu."""
+        if color not in self._journal_tags:
+            self.log_text.tag_config(color, foreground=color)
+            self._journal_tags.add(color)
+        return color
+
+    def _init_journal_tags(self):
+        self._journal_tags = set()
+        for color in JOURNAL_COLORS:
+            self._journal_tag(color)
+
+    def _append_log_line(self, text, color):
+        """Dopisuje jeden wpis na końcu dziennika, bez przebudowy całego okna."""
+        if not hasattr(self, 'log_text') or not self.log_text.winfo_exists(): return
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.insert(tk.END, text + "\n", self._journal_tag(color))
+        self._journal_line_count += 1
+        # górę przycinamy paczkami, a nie po jednej linii przy każdym wpisie
+        if self._journal_line_count > LOG_VISIBLE_LINES + JOURNAL_TRIM_BATCH:
+            excess = self._journal_line_count - LOG_VISIBLE_LINES
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self._journal_line_count = LOG_VISIBLE_LINES
+        self.log_text.see(tk.END)
+        self.log_text.config(state=tk.DISABLED)
+
     def update_log_display(self):
+        """Pełna przebudowa dziennika (start gry, wczytanie, zmiana języka)."""
         if not hasattr(self, 'log_text'): return
+        lines = list(self.log_lines)[-LOG_VISIBLE_LINES:]
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
-        for text, color in self.log_lines[-100:]:
-            self.log_text.insert(tk.END, text + "\n", color)
-            self.log_text.tag_config(color, foreground=color)
+        for text, color in lines:
+            self.log_text.insert(tk.END, text + "\n", self._journal_tag(color))
+        self._journal_line_count = len(lines)
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
 
-    def free_workers(self):
-        # ile osób pracuje w budynkach (nie liczymy dzielnic i namiotów)
-        workers_in_buildings = sum(
-            b.get("workers", 0)
-            for b in self.buildings
-            if not b.get("is_district", False) and b["base"] not in ["tent"]
-        )
-
-        # Wolni = wszyscy ludzie - ci w budowach/expedycjach - ci w budynkach
-        return max(0, self.people - self.busy_people - workers_in_buildings)
-
-    def can_afford(self, cost):
-        # tworzymy kopię, by nie modyfikować oryginału
-        real_cost = cost.copy()
-
-        # --- BONUS HOLANDII ---
-        if self.state == "netherlands":
-            mult = STATES[self.state].get("build_cost", 1)
-            real_cost = {r: int(a * mult) for r, a in real_cost.items()}
-
-        return all(self.resources.get(r, 0) >= a for r, a in real_cost.items())
-
-    def spend_resources(self, cost):
-        # tworzymy kopię, by nie modyfikować oryginału
-        real_cost = cost.copy()
-
-        # --- BONUS HOLANDII ---
-        if self.state == "netherlands":
-            mult = STATES[self.state].get("build_cost", 1)
-            real_cost = {r: int(a * mult) for r, a in real_cost.items()}
-
-        # faktyczne pobranie zasobów
-        for r, a in real_cost.items():
-            self.resources[r] -= a
-
-    def get_monarch(self):
-        # zabezpieczenie na wypadek złego self.state
-        if self.state not in STATES:
-            return self.loc.t("state.unknown_ruler")
-
-        year = self.current_date.year
-        for monarch in STATES[self.state]["rulers"]:
-            if monarch["start"] <= year <= monarch["end"]:
-                if self.current_monarch != monarch.get("name_key"):
-                    self.europe_relations[self.state] = 50
-                self.current_monarch = monarch.get("name_key")
-                return self.loc.t(monarch.get("name_key"), default="Nieznany")
-
-        return self.loc.t("state.unknown_ruler")
-
 
     # === Start gry ===
     def start_screen(self):
@@ -570,50 +529,13 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
     def start_game(self):
 
         display = self.state_var.get()
-        self.state = self.state_display_to_id.get(display, display)
-        if not self.state:
+        state = self.state_display_to_id.get(display, display)
+        if not state:
             return
 
-        # klucz nazwy państwa masz w STATES[self.state]['name_key']
-        self.state_display = self.loc.t(STATES[self.state]["name_key"], default=self.state)
-        if not self.state: return
-
-        if self.state == "france":
-            self.trade_reputation_threshold = STATES[self.state]["reputation_threshold"]
-
         # ustawienie długości gry na podstawie wyboru na ekranie startowym
         length_key = getattr(self, "game_length_var", None).get() if hasattr(self, "game_length_var") else "normal"
 
-        length_map = {
-            "flash": 1,
-            "fast": 30,
-            "normal": 50,
-            "long": 70,
-            "marathon": 100,
-            "epic": 150,
-        }
-        self.missions_to_win = length_map.get(length_key, 50)
-
-        # własne państwo startuje z lepszą reputacją, reszta pozostaje 0
-        self.europe_relations[self.state] = 50
-
-        # --- losujemy KLUCZ lokacji, a tłumaczenie robimy na bieżąco ---
-        self.location_key = random.choice([
-            "map.gulf_of_mexico",
-            "map.brazil_coast",
-            "map.caribbean",
-            "map.florida",
-            "map.patagonia",
-            "map.hudson_bay",
-            "map.bahamas",
-            "map.orinoco_delta",
-            "map.peru_coast",
-            "map.new_york"
-        ])
-        self.location = self.loc.t(self.location_key)
-        if "pop_start" in STATES[self.state]:
-            self.people += STATES[self.state]["pop_start"]
-
         # wybór wielkości mapy z ekranu startowego
         size_label = getattr(self, "map_size_var", None).get() if hasattr(self, "map_size_var") else self.loc.t("difficulty.map.medium")
         size_map = {
@@ -624,55 +546,9 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
             self.loc.t("difficulty.map.huge"): 10,
         }
 
-        self.map_size = size_map.get(size_label, 8)
-
-        self.map_grid, self.settlement_pos = generate_map(self.map_size)
-        self.map_size = len(self.map_grid)
-        self.current_date = generate_start_date()
-
-        # Start systemu po 6 miesiącach
-        self.native_missions_enabled_start = self.current_date + timedelta(days=180)
-
-        sy, sx = self.settlement_pos
-        for _ in range(3):
-            tent = {"base": "tent", "level": 0, "workers": 0, "pos": (sy, sx)}
-            self.buildings.append(tent)
-            self.map_grid[sy][sx]["building"].append(tent)
-
-        self.ships = [(None, None, {}, SHIP_STATUS_IN_PORT, 0)]
-        self.flagship_index = 0
-        self.auto_sail_timer = self.current_date + timedelta(days=14)
+        self.new_game(state, map_size=size_map.get(size_label, 8), length_key=length_key)
         self.main_game()
 
-    def calculate_storage_limits(self):
-        """
-        Zwraca (food_limit, goods_limit).
-        Bazowo 1000/1000, potem dodaje bonusy ze spichlerzy/magazynów i ich ulepszeń.
-        """
-        food_limit = BASE_FOOD_LIMIT
-        goods_limit = BASE_GOODS_LIMIT
-
-        for b in self.buildings:
-            if b.get("is_district"):
-                continue
-
-            base_key = b["base"]
-            level = b.get("level", 0)
-            base_def = BUILDINGS.get(base_key, {})
-
-            # bonus z poziomu bazowego (jeśli istnieje w definicji)
-            food_limit += base_def.get("food_limit", 0)
-            goods_limit += base_def.get("goods_limit", 0)
-
-            # bonus z ulepszeń (jeśli istnieją)
-            upgrades = base_def.get("upgrades", [])
-            if level > 0 and upgrades:
-                up_def = upgrades[min(level - 1, len(upgrades) - 1)]
-                food_limit += up_def.get("food_limit", 0)
-                goods_limit += up_def.get("goods_limit", 0)
-
-        return food_limit, goods_limit
-
     def order_colonists(self, state):
         self.loc.t("ui.order_colonists")
         if state != self.state:
@@ -789,31 +665,23 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
                     self.log(self.loc.t("ui.not_enough_ducats", cost=cost), "red")
                     return
                 self.resources["ducats"] -= cost
+                self.notify("resources")
                 self.log(self.loc.t("log.colonists_ordered_ducats", amt=amt, cost=cost), "purple")
 
             # Znajdź statek do transportu
             target_ship = None
             earliest = None
-            for i, ship in enumerate(self.ships):
-                a_eu = ship[0] if len(ship) > 0 else None
-                status = ship[3] if len(ship) > 3 else SHIP_STATUS_IN_PORT
-                if status in (SHIP_STATUS_TO_EUROPE, SHIP_STATUS_IN_EUROPE_PORT) and a_eu:
+            for i in self.ships.indices_with_status(SHIP_STATUS_TO_EUROPE, SHIP_STATUS_IN_EUROPE_PORT):
+                a_eu = self.ships[i].arrival_to_eu
+                if a_eu:
                     if earliest is None or a_eu < earliest:
                         earliest = a_eu
                         target_ship = i
 
             if target_ship is None:
-                target_ship = next((i for i, s in enumerate(self.ships) if s[3] == SHIP_STATUS_IN_PORT), 0)
+                target_ship = self.ships.first_with_status(SHIP_STATUS_IN_PORT) or 0
 
-            # Upewnij się, że statek ma 5 elementów
-            current = self.ships[target_ship]
-            if len(current) < 7:
-                # dopnij brakujące pola jak w _ensure_ship_names
-                self._ensure_ship_names()
-                current = self.ships[target_ship]
-
-            a_eu, a_back, load, st, pend, name, stype = current
-            self.ships[target_ship] = (a_eu, a_back, load, st, pend + amt, name, stype)
+            self.ships[target_ship].pending += amt
 
             self.log(self.loc.t("log.colonists_delivered_soon", amt=amt), "blue")
             win.destroy()
@@ -941,6 +809,8 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
 
         self.log_text.tag_configure("spacing", spacing3=4)
         self.log_text.tag_add("spacing", "1.0", "end")
+        self._init_journal_tags()
+        self.update_log_display()
         if not getattr(self, "log_lines", []):
             self.log(self.loc.t("log.colonization_started"), "green")
             self.log(self.loc.t("story.monarch_order", monarch=self.get_monarch()), "green")
@@ -971,154 +841,53 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
         self.update_display();
         self.update_log_display()
 
-    def advance_date(self, days):
-
-        # Liczymy dzień po dniu, ale śmierć z głodu losujemy zbiorczo
-        initial_food = self.resources["food"]
-        food = initial_food
-        starvation_days = 0
-        max_excess = 0  # do logowania przeludnienia
-
-        for _ in range(days):
-            self.days_passed += 1
-            cap = self.calculate_population_capacity()
-
-            if self.people > cap:
-                excess = self.people - cap
-                max_excess = max(max_excess, excess)
-
-                base_food = cap * FOOD_CONSUMPTION_PER_PERSON
-                extra_food = excess * FOOD_CONSUMPTION_PER_PERSON * FOOD_OVERCROWDING_MULTIPLIER
-                food_needed = int(base_food + extra_food)
-            else:
-                excess = 0
-                food_needed = int(self.people * FOOD_CONSUMPTION_PER_PERSON)
-
-            if food >= food_needed:
-                food -= food_needed
-            else:
-                # brak jedzenia tego dnia → głód
-                food = 0
-                starvation_days += 1
-
-        # ile żywności rzeczywiście zużyli ludzie w tej turze
-        people_food_consumption = max(0, initial_food - food)
-
-        # przeludnienie — tylko log (brak wypędzania)
-        if max_excess > 0:
-            self.log(
-                self.loc.t("log.overcrowding", excess=max_excess),
-                "orange"
-            )
-
-        # jeśli w tej turze wystąpił głód choć jednego dnia → losowa śmiertelność
-        if starvation_days > 0 and self.people > 0:
-            # szansa przeżycia jednego kolonisty po N dniach głodu
-            survival_prob = 0.95 ** starvation_days
-            deaths = 0
-            for _ in range(self.people):
-                # jeśli wylosujemy wynik > survival_prob → kolonista umiera
-                if random.random() > survival_prob:
-                    deaths += 1
-
-            if deaths > 0:
-                self.people -= deaths
-                self.log(
-                    self.loc.t(
-                        "log.starvation_deaths",
-                        days=starvation_days,
-                        deaths=deaths
-                    ),
-                    "red"
-                )
-
-        # po dziennej pętli głodu mamy finalną żywność w zmiennej `food`
-        # ustaw ją w zasobach, żeby stan się zgadzał
-        self.resources["food"] = food
-
-        # --- PRODUKCJA / KONSUMPCJA DZIEŃ PO DNIU ---
-        for _ in range(days):
-
-            # --- dzienna produkcja plemion indiańskich ---
-            for tribe in self.native_relations:
-                prod_map = self.native_prod.get(tribe, {})
-                cap_map = self.native_cap.get(tribe, {})
-                stock_map = self.native_stock.get(tribe, {})
-                for res, prod_val in prod_map.items():
-                    cap_val = cap_map.get(res, 0)
-                    cur = stock_map.get(res, 0)
-                    new_amt = min(cap_val, cur + prod_val)
-                    stock_map[res] = new_amt
-                self.native_stock[tribe] = stock_map
-
-            building_data = self.calculate_production()
-            daily_net = {r: 0 for r in RESOURCES}
-
-            for b, prod, cons, eff in building_data:
-                # jeśli nie działa (brak wejść) to pomijamy
-                if eff == 0 and any(cons.values()):
-                    continue
-
-                for res, amt in prod.items():
-                    daily_net[res] += amt * eff
-
-                for res, amt in cons.items():
-                    daily_net[res] -= amt * eff
-
-            # ograniczamy dzienne zużycie do dostępnych zasobów
-            food_limit, goods_limit = self.calculate_storage_limits()
-
-            # żeby nie spamować co turę tym samym
-            if not hasattr(self, "_full_storage_logged"):
-                self._full_storage_logged = set()
-
-            for res, change in daily_net.items():
-                if change < 0:
-                    available = self.resources.get(res, 0)
-                    to_consume = min(available, -change)
-                    self.resources[res] -= to_consume
-
-                elif change > 0:
-                    cur = self.resources.get(res, 0)
-
-                    # rozróżnienie food vs goods
-                    limit = food_limit if res == "food" else goods_limit
+    def update_display(self):
+        """Pełne odświeżenie górnego paska (start gry, wczytanie, zmiana języka)."""
+        if not hasattr(self, "day_lbl") or not self.current_date:
+            return
 
-                    if cur >= limit:
-                        # produkcja staje – nic nie dodajemy
-                        # log tylko raz na dany surowiec na dzień
-                        key = (self.current_date, res)
-                        if key not in self._full_storage_logged:
-                            res_name = self.loc.t(RESOURCE_DISPLAY_KEYS.get(res, res), default=res)
-                            self.log(self.loc.t("log.no_storage_space", res=res_name), "DarkOrange")
-                            self._full_storage_logged.add(key)
-                        continue
+        with self.profiler.frame("update_display"):
+            # domknij budowy / ulepszenia / statki / ekspedycje, które już dojrzały
+            self.tick()
 
-                    # jak jest miejsce częściowo, to dotnij produkcję do limitu
-                    addable = min(change, limit - cur)
-                    self.resources[res] = cur + addable
+            self._refresh_display_groups(("date", "population", "resources", "net"))
 
-            # --- czas i misje ---
-            self.current_date += timedelta(days=1)
+    def _schedule_display_refresh(self, aspects):
+        """Zbiera grupy widżetów do odświeżenia i robi to raz, gdy Tk będzie bezczynny."""
+        for aspect in aspects:
+            self._pending_display.update(DISPLAY_GROUPS.get(aspect, ()))
 
-            # sprawdź misje indiańskie każdego dnia
-            self.try_generate_native_missions()
+        if self._pending_display and not self._display_refresh_scheduled:
+            self._display_refresh_scheduled = True
+            self.root.after_idle(self._flush_display)
 
-        if self.current_mission is not None and self.current_mission[0] < self.current_date:
-            end, req, sent, diff, text, idx = self.current_mission
-            rep_penalty = 10 * diff
-            self.log(self.loc.t("log.royal_mission_failed", penalty=rep_penalty), "red")
-            self.europe_relations[self.state] = max(0, self.europe_relations[self.state] - rep_penalty)
-            self.current_mission = None
+    def _flush_display(self):
+        self._display_refresh_scheduled = False
+        groups, self._pending_display = self._pending_display, set()
 
-    def update_display(self):
-        if not hasattr(self, "day_lbl") or not self.current_date:
+        if not hasattr(self, "day_lbl") or not self.current_date or not self.day_lbl.winfo_exists():
             return
+        with self.profiler.frame("update_display"):
+            self._refresh_display_groups(groups)
+
+    def _refresh_display_groups(self, groups):
+        if "date" in groups:
+            self._refresh_date_labels()
+        if "population" in groups:
+            self._refresh_population_labels()
+        if "resources" in groups:
+            self._refresh_resource_labels()
+        if "net" in groups:
+            self._refresh_net_labels()
+
+    def _refresh_date_labels(self):
         self.day_lbl.config(text=self.loc.t("ui.date_label", date=self.current_date.strftime('%d %B %Y')))
 
         self.monarch_lbl.config(
             text=self.loc.t("ui.monarch_label", monarch=self.get_monarch())
         )
+
+    def _refresh_population_labels(self):
         cap = self.calculate_population_capacity()
         self.pop_lbl.config(
             text=self.loc.t("ui.population_label", people=self.people, cap=cap)
@@ -1127,6 +896,7 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
         free = self.free_workers()
         self.work_lbl.config(text=self.loc.t("ui.free_workers_label", free=free), foreground=("goldenrod" if free > 0 else "black"))
 
+    def _refresh_resource_labels(self):
         food_limit, goods_limit = self.calculate_storage_limits()
 
         for res, lbl in self.res_labels.items():
@@ -1153,27 +923,12 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
 
             lbl.config(foreground=color)
 
-        building_data = self.calculate_production()
-        net_total = {r: 0 for r in RESOURCES}
+    def _refresh_net_labels(self):
+        # produkcja netto z budynków (lista nie jest już wyświetlana na głównym ekranie)
+        net_total = self.daily_production_net()
 
         # uwzględnij dzienne zużycie pożywienia przez ludzi w szacunkach netto
-        cap = self.calculate_population_capacity()
-        if self.people > cap:
-            excess = self.people - cap
-            base_food = cap * FOOD_CONSUMPTION_PER_PERSON
-            extra_food = excess * FOOD_CONSUMPTION_PER_PERSON * FOOD_OVERCROWDING_MULTIPLIER
-            food_needed = base_food + extra_food
-        else:
-            food_needed = self.people * FOOD_CONSUMPTION_PER_PERSON
-        net_total["food"] -= food_needed
-
-        # produkcja netto z budynków (lista nie jest już wyświetlana na głównym ekranie)
-        for b, prod, cons, eff in building_data:
-            if b.get("is_district"):
-                continue
-            local_net = {r: prod.get(r, 0) - cons.get(r, 0) for r in RESOURCES}
-            for r, v in local_net.items():
-                net_total[r] += v * eff
+        net_total["food"] -= self.daily_food_need()
 
         # aktualizuj zmiany netto przy surowcach
         if hasattr(self, "res_net_labels"):
@@ -1193,60 +948,6 @@ class ColonySimulator(MissionsMixin, ShipsMixin, RelationsMixin, BuildingsMixin,
                 if lbl:
                     lbl.config(text=txt, foreground=color)
 
-        finished = [c for c in self.constructions if c[0] <= self.current_date]
-        for c in finished:
-            self.constructions.remove(c)
-            new_b = c[1]
-            self.buildings.append(new_b)
-            self.busy_people -= c[2]
-            y, x = new_b["pos"]
-            self.map_grid[y][x]["building"].append(new_b)
-
-            nice_name = self.get_building_display_name(new_b)
-            self.log(self.loc.t("log.completed_generic", nice_name=nice_name), "green")
-            self.play_sound("building_done")
-
-        finished_upgrades = [u for u in self.upgrades_in_progress if u[0] <= self.current_date]
-        for u in finished_upgrades:
-            self.upgrades_in_progress.remove(u)
-            idx = u[1]
-            old_level = self.buildings[idx]["level"]
-            self.buildings[idx]["level"] = u[2]
-            if "capacity" in BUILDINGS[self.buildings[idx]["base"]]["upgrades"][u[2]-1]:
-                self.buildings[idx]["capacity"] = BUILDINGS[self.buildings[idx]["base"]]["upgrades"][u[2]-1]["capacity"]
-            workers_used = BUILDINGS[self.buildings[idx]["base"]]["upgrades"][old_level].get("workers", 1)
-            self.busy_people -= workers_used
-            base_data = BUILDINGS[self.buildings[idx]["base"]]
-            # nazwa PRZED ulepszeniem
-            if old_level == 0:
-                old_name = self.loc.t(base_data.get("name_key"), default=self.buildings[idx]["base"])
-            else:
-                old_name = base_data["upgrades"][old_level - 1].get("name_key",
-                    self.loc.t(base_data.get("name_key"), default=self.buildings[idx]["base"])
-                )
-            # nazwa PO ulepszeniu
-            new_name = base_data["upgrades"][u[2] - 1].get("name_key",
-                self.loc.t(base_data.get("name_key"), default=self.buildings[idx]["base"])
-            )
-
-            self.log(self.loc.t("log.upgrade_done"), "DarkOrange")
-            self.play_sound("building_done")
-
-        self.process_arriving_ships()
-        self.auto_send_empty_ship()
-
-        self.root.after(100, self.update_display)
-
-        exp_done = [e for e in self.expeditions if e[0] <= self.current_date]
-        for e in exp_done:
-            self.expeditions.remove(e)
-            self.finish_expedition(e)
-
-        if self.people <= 0 and not getattr(self, "game_over", False):
-            self.game_over = True
-            self.death_game()
-            return
-
     def clear_root(self):
         for w in self.root.winfo_children():
             # NIE kasuj otwartych okien (settings, itp.)
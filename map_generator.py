@@ -1,5 +1,19 @@
 # map_generator.py
+"""
+Generator mapy świata: morze przy krawędzi, ląd z szumu, osada nad wodą.
+
+Działa dla dowolnego `size` (od 8×8 po 256×256 i więcej) w czasie ~liniowym:
+- morze rośnie z listy „frontu” (pola lądu przy wodzie, z krotnością = ile pól
+  wody dotykają), a nie z listy kandydatów budowanej od nowa w każdym kroku,
+- sąsiedzi liczeni z gotowych tablic przesunięć,
+- teren z dwóch pól szumu wartości (wysokość → wzgórza, wilgotność → las/pole),
+  więc tworzy spójne plamy zamiast losowej szachownicy,
+- osadę wybieramy tylko spośród pól przy wodzie.
+
+Całe losowanie idzie z przekazanego `rng`, więc to samo ziarno daje tę samą mapę.
+"""
 import random
+from collections import Counter
 
 from constants import MAP_SIZE, MINE_RESOURCES
 
@@ -7,139 +21,230 @@ from constants import MAP_SIZE, MINE_RESOURCES
 # BASE_COLORS = {"morze": "#0066CC", "pole": "#CCCC99", "las": "#228B22", "wzniesienia": "#8B4513", "osada": "#000000"}
 # FERTILITY = {"nieurodzaj": 0.7, "średni": 1.0, "płodny": 1.3}
 
+# przesunięcia sąsiadów: 8 kierunków (osada, odkrywanie) i 4 (wzrost morza – bez diagonali)
+NEIGHBOR_OFFSETS_8 = tuple((dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx)
+NEIGHBOR_OFFSETS_4 = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# udział morza w mapie (dla 8×8 to dawne 7–12 pól)
+SEA_SHARE = (0.11, 0.19)
+
+# udziały terenów lądu: pole / las / wzgórza
+TERRAIN_SHARES = {"field": 0.5, "forest": 0.3, "hills": 0.2}
+
+# rozkład urodzajności: (próg skumulowany, wartość)
+FERTILITY_THRESHOLDS = ((0.2, "nieurodzaj"), (0.8, "średni"), (1.0, "płodny"))
+
 
 def is_edge(y, x, size):
     """Sprawdza, czy pole jest przy krawędzi mapy"""
     return y == 0 or y == size - 1 or x == 0 or x == size - 1
 
 
-def get_neighbors(y, x, size):
-    """Zwraca listę sąsiadów (8-kierunkowych) w granicach mapy"""
-    neighbors = []
-    for dy in [-1, 0, 1]:
-        for dx in [-1, 0, 1]:
-            if dy == 0 and dx == 0:
-                continue
+def get_neighbors(y, x, size, offsets=NEIGHBOR_OFFSETS_8):
+    """Zwraca listę sąsiadów (domyślnie 8-kierunkowych) w granicach mapy"""
+    return [
+        (y + dy, x + dx)
+        for dy, dx in offsets
+        if 0 <= y + dy < size and 0 <= x + dx < size
+    ]
+
+
+def _sea_cell():
+    return {
+        "terrain": "sea",
+        "fertility": "średni",
+        "building": [],
+        "discovered": True,
+        "quality_known": True,
+        "resource": None
+    }
+
+
+# === Szum wartości ===
+def _smooth_axis(size, scale):
+    """Dla każdej współrzędnej: (indeks węzła siatki, wygładzona waga 0..1)."""
+    out = []
+    for i in range(size):
+        pos = i / scale
+        i0 = int(pos)
+        t = pos - i0
+        out.append((i0, t * t * (3 - 2 * t)))
+    return out
+
+
+def value_noise(size, rng, scale, octaves=2):
+    """Pole size×size wartości ~0..1: interpolowana siatka losowych węzłów, kilka oktaw."""
+    field = [[0.0] * size for _ in range(size)]
+    amplitude, total = 1.0, 0.0
+    for _ in range(octaves):
+        nodes = int(size / scale) + 2
+        lattice = [[rng.random() for _ in range(nodes)] for _ in range(nodes)]
+        axis = _smooth_axis(size, scale)
+        for y, (y0, ty) in enumerate(axis):
+            top, bottom, row = lattice[y0], lattice[y0 + 1], field[y]
+            for x, (x0, tx) in enumerate(axis):
+                a = top[x0] + (top[x0 + 1] - top[x0]) * tx
+                b = bottom[x0] + (bottom[x0 + 1] - bottom[x0]) * tx
+                row[x] += (a + (b - a) * ty) * amplitude
+        total += amplitude
+        amplitude *= 0.5
+        scale = max(1.0, scale / 2)
+    inv = 1.0 / total
+    return [[v * inv for v in row] for row in field]
+
+
+# === Morze ===
+def _grow_sea(grid, size, start, target, rng):
+    """
+    Rozrasta morze od `start` do `target` pól (4-kierunkowo, spójnie).
+
+    Front to lista pól lądu przy wodzie – pole występuje tyle razy, ile pól
+    wody dotyka, jak w dawnej liście kandydatów. Losujemy wpis jednostajnie
+    i przyjmujemy go z prawdopodobieństwem waga/2 (przy krawędzi 2.0, dalej
+    0.5); wpisy pól, które już są wodą, usuwamy leniwie.
+    """
+    water = [start]
+    frontier = []
+
+    def push_neighbors(y, x):
+        for dy, dx in NEIGHBOR_OFFSETS_4:
             ny, nx = y + dy, x + dx
-            if 0 <= ny < size and 0 <= nx < size:
-                neighbors.append((ny, nx))
-    return neighbors
+            if 0 <= ny < size and 0 <= nx < size and grid[ny][nx] is None:
+                frontier.append((ny, nx))
+
+    push_neighbors(*start)
+    while len(water) < target and frontier:
+        i = rng.randrange(len(frontier))
+        ny, nx = frontier[i]
+        if grid[ny][nx] is not None:
+            # nieaktualny wpis: zamień z ostatnim i zdejmij
+            frontier[i] = frontier[-1]
+            frontier.pop()
+            continue
+        dist_to_edge = min(ny, size - 1 - ny, nx, size - 1 - nx)
+        weight = 2.0 if dist_to_edge <= 1 else 0.5
+        if rng.random() * 2.0 >= weight:
+            continue
+        grid[ny][nx] = _sea_cell()
+        water.append((ny, nx))
+        push_neighbors(ny, nx)
+    return water
+
+
+# === Ląd ===
+def _fill_land(grid, size, rng):
+    """Wzgórza tam, gdzie szum wysokości największy, las tam, gdzie wilgotność – z udziałami TERRAIN_SHARES."""
+    scale = max(3.0, size / 6)
+    height = value_noise(size, rng, scale)
+    moisture = value_noise(size, rng, scale)
 
+    land = [(y, x) for y in range(size) for x in range(size) if grid[y][x] is None]
+    n_hills = round(len(land) * TERRAIN_SHARES["hills"])
+    n_forest = round(len(land) * TERRAIN_SHARES["forest"])
 
-def generate_map(size: int = MAP_SIZE):
+    by_height = sorted(land, key=lambda p: height[p[0]][p[1]], reverse=True)
+    hills = set(by_height[:n_hills])
+    rest = sorted(by_height[n_hills:], key=lambda p: moisture[p[0]][p[1]], reverse=True)
+    forest = set(rest[:n_forest])
+
+    for y, x in land:
+        if (y, x) in hills:
+            terrain = "hills"
+        elif (y, x) in forest:
+            terrain = "forest"
+        else:
+            terrain = "field"
+        r = rng.random()
+        fertility = next(value for limit, value in FERTILITY_THRESHOLDS if r < limit)
+        resource = rng.choice(MINE_RESOURCES) if terrain == "hills" else None
+        grid[y][x] = {
+            "terrain": terrain,
+            "fertility": fertility,
+            "building": [],
+            "discovered": False,
+            "quality_known": False,
+            "resource": resource
+        }
+
+
+# === Sąsiedztwo osady ===
+def _missing_terrains(grid, neighbors, required):
+    """Wymagane tereny lądu, których brak wśród sąsiadów osady (posortowane)."""
+    present = {grid[ny][nx]["terrain"] for ny, nx in neighbors}
+    return sorted(required - present)
+
+
+def _spare_neighbors(grid, neighbors, required):
+    """
+    Sąsiedzi osady, których teren można zmienić bez utraty jedynego pola morza
+    lub wymaganego terenu. Najpierw pola lądu; morze dopiero, gdy lądu brak.
+    """
+    counts = Counter(grid[ny][nx]["terrain"] for ny, nx in neighbors)
+
+    def spare(terrain):
+        return counts[terrain] > 1 or terrain not in required | {"sea"}
+
+    land = [(ny, nx) for ny, nx in neighbors
+            if grid[ny][nx]["terrain"] not in ("sea", "settlement") and spare(grid[ny][nx]["terrain"])]
+    if land:
+        return land
+    return [(ny, nx) for ny, nx in neighbors if grid[ny][nx]["terrain"] == "sea" and spare("sea")]
+
+
+def generate_map(size: int = MAP_SIZE, rng=random):
     """
     Generuje mapę x:x z:
     - brzegiem wody (połączony, dotyka krawędzi)
     - osadą NIE na krawędzi
     - wokół osady (8 sąsiadów): dokładnie 1 morze, 1 pole, 1 las, 1 wzniesienie
+    rng: źródło losowań (domyślnie globalny random; gra podaje swój strumień "world")
     """
     grid = [[None for _ in range(size)] for _ in range(size)]
 
     # === 1. Generowanie brzegu wody (połączony, dotyka krawędzi) ===
-    water_cells = []
-    edge = random.choice(["top", "bottom", "left", "right"])
+    edge = rng.choice(["top", "bottom", "left", "right"])
 
     # Startowy punkt na krawędzi
     if edge == "top":
-        start = (0, random.randint(1, size - 2))
+        start = (0, rng.randint(1, size - 2))
     elif edge == "bottom":
-        start = (size - 1, random.randint(1, size - 2))
+        start = (size - 1, rng.randint(1, size - 2))
     elif edge == "left":
-        start = (random.randint(1, size - 2), 0)
+        start = (rng.randint(1, size - 2), 0)
     else:  # right
-        start = (random.randint(1, size - 2), size - 1)
+        start = (rng.randint(1, size - 2), size - 1)
 
-    water_cells.append(start)
-    grid[start[0]][start[1]] = {
-        "terrain": "sea",
-        "fertility": "średni",
-        "building": [],
-        "discovered": True,
-        "quality_known": True,
-        "resource": None
-    }
+    grid[start[0]][start[1]] = _sea_cell()
 
-    # Losowa docelowa wielkość morza: (size - 2) .. (size + 2)
-    target_water = random.randint(max(1, size - 1), size + 4)
-
-    # Rozszerz wodę (co najmniej 6 pól, połączona)
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # brak diagonali
-    while len(water_cells) < target_water:
-        candidates = []
-        for y, x in water_cells:
-            for dy, dx in directions:
-                ny, nx = y + dy, x + dx
-                if 0 <= ny < size and 0 <= nx < size and grid[ny][nx] is None:
-                    dist_to_edge = min(ny, size - 1 - ny, nx, size - 1 - nx)
-                    weight = 2.0 if dist_to_edge <= 1 else 0.5
-                    candidates.append((ny, nx, weight))
-
-        if not candidates:
-            break
+    # Losowa docelowa wielkość morza jako ułamek mapy
+    area = size * size
+    target_water = rng.randint(max(1, int(area * SEA_SHARE[0])), max(1, int(area * SEA_SHARE[1])))
+    water_cells = _grow_sea(grid, size, start, target_water, rng)
 
-        total_weight = sum(w for _, _, w in candidates)
-        r = random.uniform(0, total_weight)
-        acc = 0
-        chosen = None
-        for ny, nx, w in candidates:
-            acc += w
-            if r <= acc:
-                chosen = (ny, nx)
-                break
-
-        if chosen:
-            water_cells.append(chosen)
-            grid[chosen[0]][chosen[1]] = {
-                "terrain": "sea",
-                "fertility": "średni",
-                "building": [],
-                "discovered": True,
-                "quality_known": True,
-                "resource": None
-            }
-
-    # === 2. Wypełnij resztę lądem (tymczasowo) ===
-    for y in range(size):
-        for x in range(size):
-            if grid[y][x] is None:
-                terrain = random.choices(["field", "forest", "hills"], weights=[50, 30, 20])[0]
-                fertility = random.choices(["nieurodzaj", "średni", "płodny"], weights=[20, 60, 20])[0]
-                resource = random.choice(MINE_RESOURCES) if terrain == "hills" else None
-                grid[y][x] = {
-                    "terrain": terrain,
-                    "fertility": fertility,
-                    "building": [],
-                    "discovered": False,
-                    "quality_known": False,
-                    "resource": resource
-                }
+    # === 2. Wypełnij resztę lądem ===
+    _fill_land(grid, size, rng)
 
     # === 3. Wybierz pozycję osady: nie na krawędzi, sąsiaduje z woda, ma miejsce na 4 różne tereny ===
+    # kandydaci to tylko pola przy wodzie
+    shore = set()
+    for wy, wx in water_cells:
+        for ny, nx in get_neighbors(wy, wx, size):
+            if grid[ny][nx]["terrain"] != "sea" and not is_edge(ny, nx, size):
+                shore.add((ny, nx))
+
     possible_settlement = []
-    for y in range(1, size - 1):
-        for x in range(1, size - 1):
-            if grid[y][x]["terrain"] == "sea":
-                continue
-            neighbors = get_neighbors(y, x, size)
-            has_water = any(grid[ny][nx]["terrain"] == "sea" for ny, nx in neighbors)
-            if has_water:
-                # Sprawdź, czy da się umieścić 1 pole, 1 las, 1 wzniesienie (oprócz wody)
-                land_neighbors = [(ny, nx) for ny, nx in neighbors if grid[ny][nx]["terrain"] != "sea"]
-                if len(land_neighbors) >= 3:  # potrzebujemy co najmniej 3 pola lądu na różne tereny
-                    possible_settlement.append((y, x))
+    for y, x in sorted(shore):
+        land_neighbors = [
+            (ny, nx) for ny, nx in get_neighbors(y, x, size) if grid[ny][nx]["terrain"] != "sea"
+        ]
+        if len(land_neighbors) >= 3:  # potrzebujemy co najmniej 3 pola lądu na różne tereny
+            possible_settlement.append((y, x))
 
     if not possible_settlement:
         # Fallback: wybierz dowolną nie-krawędziową komórkę z woda w sąsiedztwie
-        for y in range(1, size - 1):
-            for x in range(1, size - 1):
-                if grid[y][x]["terrain"] != "sea":
-                    if any(grid[ny][nx]["terrain"] == "sea" for ny, nx in get_neighbors(y, x, size)):
-                        possible_settlement.append((y, x))
-                        break
-            if possible_settlement:
-                break
-
-    sy, sx = random.choice(possible_settlement)
+        possible_settlement = sorted(shore)[:1]
+
+    sy, sx = rng.choice(possible_settlement)
     grid[sy][sx]["terrain"] = "settlement"
     grid[sy][sx]["building"] = []
     grid[sy][sx]["discovered"] = True
@@ -148,13 +253,6 @@ def generate_map(size: int = MAP_SIZE):
     # === 4. Gwarancja: wokół osady dokładnie 1 morze, 1 pole, 1 las, 1 wzniesienie ===
     neighbors = get_neighbors(sy, sx, size)
     required = {"field", "forest", "hills"}
-    placed = set()
-
-    # Najpierw sprawdź, co już jest
-    for ny, nx in neighbors:
-        terrain = grid[ny][nx]["terrain"]
-        if terrain in required:
-            placed.add(terrain)
 
     # Woda musi być — już sprawdziliśmy, że jest
     water_count = sum(1 for ny, nx in neighbors if grid[ny][nx]["terrain"] == "sea")
@@ -162,18 +260,25 @@ def generate_map(size: int = MAP_SIZE):
         # Siłowo dodaj wodę w losowym sąsiedzie (jeśli coś pójdzie nie tak)
         land_n = [(ny, nx) for ny, nx in neighbors if grid[ny][nx]["terrain"] != "sea"]
         if land_n:
-            wy, wx = random.choice(land_n)
+            wy, wx = rng.choice(land_n)
             grid[wy][wx]["terrain"] = "sea"
             grid[wy][wx]["resource"] = None
             water_cells.append((wy, wx))
 
-    # Ustaw brakujące tereny
-    for terrain in required - placed:
-        candidates = [(ny, nx) for ny, nx in neighbors if grid[ny][nx]["terrain"] not in ["sea", "settlement"]]
-        if candidates:
-            ny, nx = random.choice(candidates)
-            grid[ny][nx]["terrain"] = terrain
-            grid[ny][nx]["resource"] = random.choice(MINE_RESOURCES) if terrain == "hills" else None
+    # Ustaw brakujące tereny – tylko na polach, które nie są jedynym źródłem wymaganego terenu;
+    # po każdej zmianie sprawdzamy gwarancję od nowa
+    missing = _missing_terrains(grid, neighbors, required)
+    while missing:
+        candidates = _spare_neighbors(grid, neighbors, required)
+        if not candidates:
+            break
+        terrain = missing[0]
+        ny, nx = rng.choice(candidates)
+        if grid[ny][nx]["terrain"] == "sea":
+            water_cells.remove((ny, nx))
+        grid[ny][nx]["terrain"] = terrain
+        grid[ny][nx]["resource"] = rng.choice(MINE_RESOURCES) if terrain == "hills" else None
+        missing = _missing_terrains(grid, neighbors, required)
 
     # === 5. Odkryj osadę i wszystkich jej sąsiadów ===
     grid[sy][sx]["discovered"] = True
@@ -182,4 +287,4 @@ def generate_map(size: int = MAP_SIZE):
         grid[ny][nx]["discovered"] = True
         grid[ny][nx]["quality_known"] = True
 
-    return grid, (sy, sx)
\ No newline at end of file
+    return grid, (sy, sx)
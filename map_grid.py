@@ -0,0 +1,319 @@
+# map_grid.py
+"""
+Mapa świata w tablicach: każde pole to kilka małych kodów liczbowych.
+
+Teren, urodzajność, surowiec oraz flagi „odkryte” / „jakość znana” leżą
+w płaskich tablicach array('b') o długości size*size (indeks y*size + x),
+a listy id budynków tylko dla pól, które ich potrzebują. Kody tłumaczą
+tabele TERRAIN / FERTILITY / RESOURCE (wartość nieznana – np. ze starego
+zapisu – dostaje nowy kod przy pierwszym użyciu).
+
+Dla UI i reszty kodu mapa dalej wygląda jak 2D lista dictów:
+map_grid[y][x]["terrain"] zwraca CellView, który czyta i zapisuje tablice.
+Skany całej mapy (pola osady, front odkrywania, wolne pola) idą przez
+maski – z NumPy jako widok na te same tablice, bez niego pętlą po kodach.
+
+Zapis gry dalej trzyma mapę jako 2D listę dictów (to_rows()/from_rows()).
+
+MapGrid pamięta też przydziały kafli autotilingu (tiles: pole → plik), żeby
+UI liczyło je raz na mapę. Zmiana terenu pola czyści przydział jego i 8
+sąsiadów; w zapisie przydział to dodatkowy klucz "tile" pola.
+"""
+from array import array
+from collections.abc import MutableMapping
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from constants import MINE_RESOURCES
+
+
+class _Codes:
+    """Tabela wartość <-> kod (int8)."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.index = {v: i for i, v in enumerate(self.values)}
+
+    def code(self, value):
+        c = self.index.get(value)
+        if c is None:
+            c = self.index[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+
+TERRAIN = _Codes(["sea", "field", "forest", "hills", "settlement", "district"])
+FERTILITY = _Codes(["średni", "nieurodzaj", "płodny"])
+RESOURCE = _Codes([None] + list(MINE_RESOURCES))
+
+# bity maski sąsiadów (edge_mask): bit k <-> kierunek MASK_DIRECTIONS[k]
+MASK_DIRECTIONS = (("N", -1, 0), ("NE", -1, 1), ("E", 0, 1), ("SE", 1, 1),
+                   ("S", 1, 0), ("SW", 1, -1), ("W", 0, -1), ("NW", -1, -1))
+
+# klucze pola trzymane w tablicach; inne klucze idą do słownika `extra`
+CELL_KEYS = ("terrain", "fertility", "building", "discovered", "quality_known", "resource")
+
+
+class CellView(MutableMapping):
+    """Dict-podobny widok jednego pola mapy (odczyt i zapis idą do tablic MapGrid)."""
+    __slots__ = ("grid", "i")
+
+    def __init__(self, grid, i):
+        self.grid = grid
+        self.i = i
+
+    def __getitem__(self, key):
+        g, i = self.grid, self.i
+        if key == "terrain":
+            return TERRAIN.values[g.terrain[i]]
+        if key == "discovered":
+            return bool(g.discovered[i])
+        if key == "building":
+            # odczyt nie zakłada listy – dopisywanie idzie przez add_building / zapis klucza
+            return g.buildings.get(i, [])
+        if key == "resource":
+            return RESOURCE.values[g.resource[i]]
+        if key == "fertility":
+            return FERTILITY.values[g.fertility[i]]
+        if key == "quality_known":
+            return bool(g.quality_known[i])
+        extra = g.extra.get(i)
+        if extra is None or key not in extra:
+            raise KeyError(key)
+        return extra[key]
+
+    def __setitem__(self, key, value):
+        g, i = self.grid, self.i
+        if key == "terrain":
+            code = TERRAIN.code(value)
+            if g.terrain[i] != code:
+                g.terrain[i] = code
+                g.forget_tiles(i)
+        elif key == "discovered":
+            g.discovered[i] = 1 if value else 0
+        elif key == "building":
+            if value:
+                g.buildings[i] = value
+            else:
+                g.buildings.pop(i, None)
+        elif key == "resource":
+            g.resource[i] = RESOURCE.code(value)
+        elif key == "fertility":
+            g.fertility[i] = FERTILITY.code(value)
+        elif key == "quality_known":
+            g.quality_known[i] = 1 if value else 0
+        else:
+            g.extra.setdefault(self.i, {})[key] = value
+
+    def __delitem__(self, key):
+        if key in CELL_KEYS:
+            raise KeyError(f"nie można usunąć stałego klucza pola: {key}")
+        del self.grid.extra[self.i][key]
+
+    def __iter__(self):
+        yield from CELL_KEYS
+        yield from self.grid.extra.get(self.i, ())
+
+    def __len__(self):
+        return len(CELL_KEYS) + len(self.grid.extra.get(self.i, ()))
+
+    def __repr__(self):
+        return f"CellView({dict(self)!r})"
+
+
+class _Row:
+    """Wiersz mapy: map_grid[y][x] → CellView."""
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.y = y
+
+    def __getitem__(self, x):
+        size = self.grid.size
+        if x < 0:
+            x += size
+        if not 0 <= x < size:
+            raise IndexError("indeks pola poza mapą")
+        return CellView(self.grid, self.y * size + x)
+
+    def __len__(self):
+        return self.grid.size
+
+    def __iter__(self):
+        base = self.y * self.grid.size
+        for i in range(base, base + self.grid.size):
+            yield CellView(self.grid, i)
+
+
+class MapGrid:
+
+    def __init__(self, size):
+        self.size = size
+        n = size * size
+        self.terrain = array("b", bytes(n))
+        self.fertility = array("b", bytes(n))
+        self.resource = array("b", bytes(n))
+        self.discovered = array("b", bytes(n))
+        self.quality_known = array("b", bytes(n))
+        # indeks pola -> lista id budynków / inne klucze (tylko dla pól, które je mają)
+        self.buildings = {}
+        self.extra = {}
+        # indeks pola -> plik kafla autotilingu (przydziela UI, patrz MapUIMixin)
+        self.tiles = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """MapGrid z 2D listy dictów (generator mapy, zapis gry)."""
+        grid = cls(len(rows))
+        tiles = {}
+        for y, row in enumerate(rows):
+            for x, cell in enumerate(row):
+                i = y * grid.size + x
+                view = CellView(grid, i)
+                for key, value in cell.items():
+                    if key == "building":
+                        # puste listy nie zajmują miejsca – powstaną przy pierwszym budynku
+                        if value:
+                            grid.buildings[i] = list(value)
+                    elif key == "tile":
+                        tiles[i] = value
+                    else:
+                        view[key] = value
+        # przydziały kafli na końcu – ustawianie terenu je czyści
+        grid.tiles = tiles
+        return grid
+
+    def cell_dict(self, i):
+        """Zwykły dict pola o indeksie i (kopia, bez zakładania pustej listy budynków)."""
+        out = {
+            "terrain": TERRAIN.values[self.terrain[i]],
+            "fertility": FERTILITY.values[self.fertility[i]],
+            "building": list(self.buildings.get(i, ())),
+            "discovered": bool(self.discovered[i]),
+            "quality_known": bool(self.quality_known[i]),
+            "resource": RESOURCE.values[self.resource[i]],
+        }
+        out.update(self.extra.get(i, ()))
+        tile = self.tiles.get(i)
+        if tile is not None:
+            out["tile"] = tile
+        return out
+
+    def to_rows(self):
+        """2D lista dictów – format mapy w zapisie gry."""
+        size = self.size
+        return [[self.cell_dict(y * size + x) for x in range(size)] for y in range(size)]
+
+    def add_building(self, y, x, building_id):
+        """Dopisuje id budynku do pola (y, x), zakładając listę pola dopiero teraz."""
+        self.buildings.setdefault(y * self.size + x, []).append(building_id)
+
+    # === Dostęp jak do listy list ===
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.size
+        if not 0 <= y < self.size:
+            raise IndexError("indeks wiersza poza mapą")
+        return _Row(self, y)
+
+    def __iter__(self):
+        for y in range(self.size):
+            yield _Row(self, y)
+
+    def terrain_around(self, y, x):
+        """Kody terenu pola i jego 8 sąsiadów (-1 poza mapą) – klucz do wykrywania zmian autotilingu."""
+        size, terrain = self.size, self.terrain
+        return tuple(
+            terrain[ny * size + nx] if 0 <= ny < size and 0 <= nx < size else -1
+            for ny in (y - 1, y, y + 1)
+            for nx in (x - 1, x, x + 1)
+        )
+
+    def edge_mask(self, y, x):
+        """
+        Maska 0..255: bit kierunku ustawiony, gdy sąsiad leży na mapie i ma inny
+        teren niż pole (y, x) – „krawędź” dla autotilingu morza / lasu / wzgórz.
+        """
+        size, terrain = self.size, self.terrain
+        own = terrain[y * size + x]
+        mask = 0
+        for bit, (_, dy, dx) in enumerate(MASK_DIRECTIONS):
+            ny, nx = y + dy, x + dx
+            if 0 <= ny < size and 0 <= nx < size and terrain[ny * size + nx] != own:
+                mask |= 1 << bit
+        return mask
+
+    # === Przydziały kafli ===
+    def tile(self, y, x):
+        return self.tiles.get(y * self.size + x)
+
+    def set_tile(self, y, x, filename):
+        self.tiles[y * self.size + x] = filename
+
+    def forget_tiles(self, i):
+        """Teren pola i się zmienił: kafle jego i sąsiadów trzeba dobrać od nowa."""
+        if not self.tiles:
+            return
+        size = self.size
+        y, x = divmod(i, size)
+        for ny in (y - 1, y, y + 1):
+            for nx in (x - 1, x, x + 1):
+                if 0 <= ny < size and 0 <= nx < size:
+                    self.tiles.pop(ny * size + nx, None)
+
+    # === Maski ===
+    def _view(self, table):
+        return np.frombuffer(table, dtype=np.int8).reshape(self.size, self.size)
+
+    def positions(self, terrains=None, discovered=None):
+        """
+        Pola (y, x) w kolejności wierszami, o terenie z `terrains` (None = dowolny)
+        i – jeśli podano – o zadanej fladze odkrycia.
+        """
+        codes = None if terrains is None else [TERRAIN.index[t] for t in terrains if t in TERRAIN.index]
+        if np is not None:
+            mask = np.ones((self.size, self.size), dtype=bool)
+            if codes is not None:
+                mask &= np.isin(self._view(self.terrain), codes)
+            if discovered is not None:
+                mask &= (self._view(self.discovered) != 0) == bool(discovered)
+            ys, xs = np.nonzero(mask)
+            return list(zip(ys.tolist(), xs.tolist()))
+
+        out = []
+        for i in range(self.size * self.size):
+            if codes is not None and self.terrain[i] not in codes:
+                continue
+            if discovered is not None and bool(self.discovered[i]) != bool(discovered):
+                continue
+            out.append(divmod(i, self.size))
+        return out
+
+    def frontier(self):
+        """Nieodkryte pola, które sąsiadują (4-kierunkowo) z odkrytym – cel eksploracji."""
+        size = self.size
+        if np is not None:
+            known = self._view(self.discovered) != 0
+            near = np.zeros_like(known)
+            near[1:, :] |= known[:-1, :]
+            near[:-1, :] |= known[1:, :]
+            near[:, 1:] |= known[:, :-1]
+            near[:, :-1] |= known[:, 1:]
+            ys, xs = np.nonzero(near & ~known)
+            return set(zip(ys.tolist(), xs.tolist()))
+        return {(y, x) for y in range(size) for x in range(size) if self.is_frontier(y, x)}
+
+    def is_frontier(self, y, x):
+        size, known = self.size, self.discovered
+        i = y * size + x
+        if known[i]:
+            return False
+        return bool((y > 0 and known[i - size]) or (y < size - 1 and known[i + size])
+                    or (x > 0 and known[i - 1]) or (x < size - 1 and known[i + 1]))
@@ -1,14 +1,32 @@
 # map_views.py
+import hashlib
+import json
 import math
 import os, re
-import random
 import tkinter as tk
 from tkinter import ttk
 from datetime import timedelta
 
 from PIL import Image, ImageTk
 
-from constants import BASE_COLORS, MINE_COLORS, MINE_RESOURCES, MINE_NAMES, BUILDINGS, STATES, RESOURCE_DISPLAY_KEYS
+from constants import BASE_COLORS, MINE_COLORS, MINE_RESOURCES, MINE_NAMES, BUILDINGS
+from canvas_layers import CanvasLayers, item
+from cell_index import SETTLEMENT_SLOTS, SETTLEMENT_TERRAINS
+from map_grid import MASK_DIRECTIONS
+
+# skompilowane tablice autotilingu (maska sąsiadów -> kafel), patrz init_autotile_tables
+AUTOTILE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "autotile_cache.json")
+# podbij przy zmianie logiki _tile_candidates – stary cache przestanie pasować
+AUTOTILE_TABLE_VERSION = "1"
+
+# warstwy elementów mapy świata od spodu do góry (tagi Canvas, patrz CanvasLayers.restack);
+# nazwy osad/dzielnic na samej górze, bo wychodzą poza swoje pole
+MAP_GROUND, MAP_TERRAIN, MAP_MARKER, MAP_TEXT, MAP_HIGHLIGHT, MAP_LABEL = MAP_LAYERS = (
+    "map_ground", "map_terrain", "map_marker", "map_text", "map_highlight", "map_label",
+)
+
+# teren autotilingu -> pusty (wewnętrzny) kafel
+AUTOTILE_EMPTY = {"ocean": "ocean_inner.png", "forest": "forest_inner.png", "mountains": "mountains_inner.png"}
 
 
 class MapUIMixin:
@@ -29,7 +47,7 @@ class MapUIMixin:
         # Jeśli ustawisz self.tile_random_seed wcześniej (np. z save),
         # to ta linia go nie nadpisze.
         if not hasattr(self, "tile_random_seed"):
-            self.tile_random_seed = random.randint(0, 2**31 - 1)
+            self.tile_random_seed = self.rng("tiles").randint(0, 2**31 - 1)
 
         forest_path = self.resource_path("img/tiles/conifer_forest_inner.png")
         self.tile_forest_base = Image.open(forest_path)
@@ -144,8 +162,9 @@ class MapUIMixin:
         """Ładuje wszystkie pliki oceanu i rozbija ich nazwy na krawędzie/narożniki."""
         self.ocean_base_path = self.resource_path("img/tiles/ocean")
         self.ocean_tile_cache = {}   # (filename, cell_size) -> ImageTk.PhotoImage
+        self.ocean_autotile = None  # tablica masek, kompilowana z ocean_defs
         self.ocean_defs = []         # lista: {filename, card, inner, outer}
-        self.ocean_tile_assignments = {}  # (y, x) -> filename (na przyszłość, jeśli chcesz je utrwalać)
+        # przydziały kafli (pole -> plik) trzyma mapa: self.map_grid.tiles, patrz _assigned_tile_name
 
         if not os.path.isdir(self.ocean_base_path):
             return
@@ -177,6 +196,7 @@ class MapUIMixin:
         """Ładuje wszystkie pliki lasu i rozbija ich nazwy na krawędzie/narożniki."""
         self.forest_base_path = self.resource_path("img/tiles/forest")
         self.forest_tile_cache = {}  # (filename, cell_size) -> ImageTk.PhotoImage
+        self.forest_autotile = None  # tablica masek, kompilowana z forest_defs
         self.forest_defs = []  # lista: {filename, card, inner, outer}
 
         if not os.path.isdir(self.forest_base_path):
@@ -212,6 +232,7 @@ class MapUIMixin:
         """Ładuje wszystkie pliki wzgórz i rozbija ich nazwy na krawędzie/narożniki."""
         self.mountains_base_path = self.resource_path("img/tiles/mountains")
         self.mountains_tile_cache = {}  # (filename, cell_size) -> ImageTk.PhotoImage
+        self.mountains_autotile = None  # tablica masek, kompilowana z mountains_defs
         self.mountains_defs = []  # lista: {filename, card, inner, outer}
 
         if not os.path.isdir(self.mountains_base_path):
@@ -325,33 +346,8 @@ class MapUIMixin:
             return parts[0]
         return name
 
-    def _choose_tile_variant(self, base_filename: str, defs, terrain_tag: str, y: int, x: int) -> str:
-        """
-        Dla danego bazowego pliku (np. 'ocean_north_1.png') wybiera DETERMINISTYCZNIE
-        jeden z wariantów tej samej grupy (_1/_2/_3) na podstawie:
-        - self.tile_random_seed
-        - terrain_tag (np. 'ocean')
-        - grupy (np. 'ocean_north')
-        - współrzędnych (y, x)
-        """
-        group_key = self._variant_group_key(base_filename)
-
-        # znajdź wszystkie pliki z tej samej grupy
-        variants = []
-        for d in defs:
-            fname = d["filename"]
-            if self._variant_group_key(fname) == group_key:
-                variants.append(fname)
-
-        # jeśli nic nie znaleźliśmy, albo jest tylko jeden wariant – zwróć to co było
-        if not variants:
-            return base_filename
-        if len(variants) == 1:
-            return variants[0]
-
-        variants = sorted(variants)  # stała kolejność
-
-        # prosty deterministyczny "hash"
+    def _variant_index(self, terrain_tag: str, group_key: str, y: int, x: int, count: int) -> int:
+        """Prosty deterministyczny "hash" pola -> indeks wariantu 0..count-1."""
         seed = int(getattr(self, "tile_random_seed", 0)) & 0xFFFFFFFF
         key_str = f"{terrain_tag}:{group_key}:{y}:{x}"
 
@@ -359,18 +355,20 @@ class MapUIMixin:
         for ch in key_str:
             h = (h * 131 + ord(ch)) & 0xFFFFFFFF
 
-        idx = h % len(variants)
-        return variants[idx]
+        return h % count
 
-    def _pick_tile_from_defs(self, neigh, defs, empty_filename: str):
+    def _tile_candidates(self, neigh, defs, empty_filename: str):
         """
-        Ogólna logika dobierania kafelka (dla oceanu / lasu / wzgórz).
+        Ogólna logika dobierania kafelka (dla oceanu / lasu / wzgórz) – z niej
+        kompilujemy tablice masek w _autotile_table.
         - neigh: dict N/NE/.. -> bool (czy tam jest 'ląd' względem danego terenu)
         - defs: lista {filename, card, inner, outer}
         - empty_filename: nazwa 'pustego' tilesa (inner) na wypadek braku dopasowania
+        Zwraca krotkę równie dobrych plików (kilka tylko przy perfekcyjnym
+        dopasowaniu – wtedy _autotile_name losuje).
         """
         if not defs:
-            return empty_filename
+            return (empty_filename,)
 
         card_req, inner_req, _ = self._describe_ocean_neighbors(neigh)
 
@@ -378,8 +376,8 @@ class MapUIMixin:
         if not any(neigh.values()):
             for d in defs:
                 if not d["card"] and not d["inner"] and not d["outer"]:
-                    return d["filename"]
-            return empty_filename
+                    return (d["filename"],)
+            return (empty_filename,)
 
         # outer traktujemy jak dodatkowe krawędzie (NE => N+E itd.)
         def effective_edges(d):
@@ -403,7 +401,7 @@ class MapUIMixin:
                 perfect.append(d)
 
         if perfect:
-            return random.choice(perfect)["filename"]
+            return tuple(d["filename"] for d in perfect)
 
         # --- 2. Supersety (kafel ma wszystko co trzeba + może coś ekstra) ---
         superset = []
@@ -418,7 +416,7 @@ class MapUIMixin:
                 return len(edges - card_req) + len(d["inner"] - inner_req)
 
             best_d, _ = min(superset, key=extra_cost)
-            return best_d["filename"]
+            return (best_d["filename"],)
 
         # --- 3. Fallback: prosty scoring ---
         best_name = empty_filename
@@ -449,7 +447,84 @@ class MapUIMixin:
                 best_score = score
                 best_name = d["filename"]
 
-        return best_name
+        return (best_name,)
+
+    # ===== TABLICE AUTOTILINGU =====
+    def init_autotile_tables(self):
+        """Kompiluje (albo wczytuje z cache) tablice masek dla oceanu, lasu i wzgórz."""
+        for terrain_tag in AUTOTILE_EMPTY:
+            self._autotile_table(terrain_tag)
+
+    def _autotile_table(self, terrain_tag: str):
+        """
+        (masks, variants) dla terenu: masks[maska] to krotka kandydatów dla jednej
+        z 256 masek sąsiadów (bity jak map_grid.MASK_DIRECTIONS), variants to
+        grupa -> posortowane warianty _1/_2/_3. Kompilujemy raz na zestaw plików
+        kafli; wynik trafia do AUTOTILE_CACHE_PATH z kluczem z listy plików.
+        """
+        table = getattr(self, f"{terrain_tag}_autotile", None)
+        if table is not None:
+            return table
+
+        defs = getattr(self, f"{terrain_tag}_defs", None)
+        if not defs:
+            getattr(self, f"init_{terrain_tag}_tiles")()
+            defs = getattr(self, f"{terrain_tag}_defs")
+
+        empty_filename = AUTOTILE_EMPTY[terrain_tag]
+        filenames = sorted(d["filename"] for d in defs)
+        key = hashlib.sha1(
+            "\n".join([AUTOTILE_TABLE_VERSION, empty_filename, *filenames]).encode("utf-8")
+        ).hexdigest()
+
+        cache = self._read_autotile_cache()
+        entry = cache.get(terrain_tag)
+        if not (isinstance(entry, dict) and entry.get("key") == key):
+            masks = []
+            for mask in range(256):
+                neigh = {name: bool(mask >> bit & 1) for bit, (name, _, _) in enumerate(MASK_DIRECTIONS)}
+                masks.append(sorted(self._tile_candidates(neigh, defs, empty_filename)))
+            variants = {}
+            for fname in filenames:
+                variants.setdefault(self._variant_group_key(fname), []).append(fname)
+            entry = {"key": key, "masks": masks, "variants": variants}
+            cache[terrain_tag] = entry
+            self._write_autotile_cache(cache)
+
+        table = (
+            tuple(tuple(c) for c in entry["masks"]),
+            {group: tuple(v) for group, v in entry["variants"].items()},
+        )
+        setattr(self, f"{terrain_tag}_autotile", table)
+        return table
+
+    def _read_autotile_cache(self):
+        try:
+            with open(AUTOTILE_CACHE_PATH, "r", encoding="utf8") as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_autotile_cache(self, cache):
+        # cache jest tylko przyspieszeniem – brak zapisu (np. katalog tylko do odczytu) nic nie psuje
+        try:
+            with open(AUTOTILE_CACHE_PATH, "w", encoding="utf8") as f:
+                json.dump(cache, f)
+        except OSError:
+            pass
+
+    def _autotile_name(self, terrain_tag: str, y: int, x: int) -> str:
+        """Kafel pola (y, x) z tablicy masek: jeden odczyt + wybór wariantu."""
+        masks, variants = self._autotile_table(terrain_tag)
+        candidates = masks[self.map_grid.edge_mask(y, x)]
+        filename = candidates[0] if len(candidates) == 1 else self.rng("tiles").choice(candidates)
+
+        group_key = self._variant_group_key(filename)
+        group = variants.get(group_key)
+        if not group:
+            return filename
+        return group[self._variant_index(terrain_tag, group_key, y, x, len(group))]
 
     def get_terrain_icon(self, terrain: str, cell_size: int):
         """Zwraca miniaturkę terenu do legendy albo None."""
@@ -503,72 +578,6 @@ class MapUIMixin:
             self.tile_sea_cache[cell_size] = ImageTk.PhotoImage(img)
         return self.tile_sea_cache[cell_size]
 
-    def _is_land(self, y, x):
-        """True, jeśli to NIE jest sea (czyli ląd/brzeg)."""
-        if 0 <= y < self.map_size and 0 <= x < self.map_size:
-            return self.map_grid[y][x]["terrain"] != "sea"
-        return False
-
-    def _is_not_terrain(self, y, x, terrain_name: str) -> bool:
-        """
-        True, jeśli field NIE jest danym terenem (np. nie-forest, nie-wzgórza).
-        Używane do wykrywania 'krawędzi' lasu/wzgórz względem otoczenia.
-        """
-        if 0 <= y < self.map_size and 0 <= x < self.map_size:
-            return self.map_grid[y][x]["terrain"] != terrain_name
-        return False
-
-    def pick_ocean_tile_name(self, neigh):
-        if not hasattr(self, "ocean_defs") or not self.ocean_defs:
-            self.init_ocean_tiles()
-        return self._pick_tile_from_defs(neigh, self.ocean_defs, "ocean_inner.png")
-
-    def pick_forest_tile_name(self, neigh):
-        if not hasattr(self, "forest_defs") or not self.forest_defs:
-            self.init_forest_tiles()
-        return self._pick_tile_from_defs(neigh, self.forest_defs, "forest_inner.png")
-
-    def pick_mountains_tile_name(self, neigh):
-        if not hasattr(self, "mountains_defs") or not self.mountains_defs:
-            self.init_mountains_tiles()
-        return self._pick_tile_from_defs(neigh, self.mountains_defs, "mountains_inner.png")
-
-    def get_ocean_neighbors(self, y, x):
-        """Zwraca słownik booli: czy w danym kierunku jest ląd."""
-        n = self._is_land(y - 1, x)
-        ne = self._is_land(y - 1, x + 1)
-        e = self._is_land(y, x + 1)
-        se = self._is_land(y + 1, x + 1)
-        s = self._is_land(y + 1, x)
-        sw = self._is_land(y + 1, x - 1)
-        w = self._is_land(y, x - 1)
-        nw = self._is_land(y - 1, x - 1)
-        return {"N": n, "NE": ne, "E": e, "SE": se, "S": s, "SW": sw, "W": w, "NW": nw}
-
-    def get_forest_neighbors(self, y, x):
-        """Sąsiedzi względem lasu: True tam, gdzie field NIE jest lasem."""
-        n = self._is_not_terrain(y - 1, x, "forest")
-        ne = self._is_not_terrain(y - 1, x + 1, "forest")
-        e = self._is_not_terrain(y, x + 1, "forest")
-        se = self._is_not_terrain(y + 1, x + 1, "forest")
-        s = self._is_not_terrain(y + 1, x, "forest")
-        sw = self._is_not_terrain(y + 1, x - 1, "forest")
-        w = self._is_not_terrain(y, x - 1, "forest")
-        nw = self._is_not_terrain(y - 1, x - 1, "forest")
-        return {"N": n, "NE": ne, "E": e, "SE": se, "S": s, "SW": sw, "W": w, "NW": nw}
-
-    def get_mountains_neighbors(self, y, x):
-        """Sąsiedzi względem wzgórz: True tam, gdzie field NIE jest wzniesieniami."""
-        n = self._is_not_terrain(y - 1, x, "hills")
-        ne = self._is_not_terrain(y - 1, x + 1, "hills")
-        e = self._is_not_terrain(y, x + 1, "hills")
-        se = self._is_not_terrain(y + 1, x + 1, "hills")
-        s = self._is_not_terrain(y + 1, x, "hills")
-        sw = self._is_not_terrain(y + 1, x - 1, "hills")
-        w = self._is_not_terrain(y, x - 1, "hills")
-        nw = self._is_not_terrain(y - 1, x - 1, "hills")
-        return {"N": n, "NE": ne, "E": e, "SE": se, "S": s, "SW": sw, "W": w, "NW": nw}
-
     def get_cell_size(self):
         """
         Dynamiczny rozmiar pola mapy w pikselach.
@@ -580,6 +589,31 @@ class MapUIMixin:
         cell = max(40, min(100, cell))
         return cell
 
+    def _assigned_tile_name(self, y, x, terrain_tag):
+        """
+        Plik kafla autotilingu dla pola (y, x) z przydziałów mapy (map_grid.tiles).
+        Dobieramy go (maska sąsiadów -> tablica -> wariant _1/_2/_3) tylko przy pierwszym
+        użyciu, po zmianie terenu pola lub sąsiada (MapGrid czyści wtedy przydział)
+        albo gdy plik z zapisu nie istnieje już w katalogu kafli.
+        """
+        filename = self.map_grid.tile(y, x)
+        if filename is not None and filename in self._tile_filenames(terrain_tag):
+            return filename
+
+        filename = self._autotile_name(terrain_tag, y, x)
+        self.map_grid.set_tile(y, x, filename)
+        return filename
+
+    def _tile_filenames(self, terrain_tag):
+        """Zbiór plików kafli danego terenu (do sprawdzania przydziałów z zapisu)."""
+        defs = getattr(self, f"{terrain_tag}_defs", None) or ()
+        if not hasattr(self, "_tile_filename_sets"):
+            self._tile_filename_sets = {}
+        names = self._tile_filename_sets.get(terrain_tag)
+        if names is None or len(names) != len(defs):
+            names = self._tile_filename_sets[terrain_tag] = {d["filename"] for d in defs}
+        return names
+
     def get_ocean_tile_image(self, y, x, cell_size):
         """
         Zwraca ImageTk.PhotoImage z odpowiednim kaflem oceanu dla pola (y,x).
@@ -588,13 +622,7 @@ class MapUIMixin:
         - położenia pola (y, x)
         - grupy kafla (np. ocean_north)
         """
-        neigh = self.get_ocean_neighbors(y, x)
-        # najpierw wybieramy "logiczny" kafel (kształt brzegów)
-        filename = self.pick_ocean_tile_name(neigh)  # np. 'ocean_north_1.png'
-
-        # a teraz deterministycznie wybieramy wariant _1/_2/_3
-        if hasattr(self, "ocean_defs"):
-            filename = self._choose_tile_variant(filename, self.ocean_defs, "ocean", y, x)
+        filename = self._assigned_tile_name(y, x, "ocean")
 
         key = (filename, cell_size)
         if key in self.ocean_tile_cache:
@@ -619,13 +647,7 @@ class MapUIMixin:
 
     def get_forest_tile_image(self, y, x, cell_size):
         """Auto-tiling lasu – przezroczysty kafel na tle plains."""
-        neigh = self.get_forest_neighbors(y, x)
-        # najpierw wybieramy "logiczny" kafel (kształt brzegu lasu)
-        filename = self.pick_forest_tile_name(neigh)  # np. 'forest_north_1.png'
-
-        # teraz deterministycznie wybieramy wariant _1/_2/_3
-        if hasattr(self, "forest_defs"):
-            filename = self._choose_tile_variant(filename, self.forest_defs, "forest", y, x)
+        filename = self._assigned_tile_name(y, x, "forest")
 
         key = (filename, cell_size)
         if key in self.forest_tile_cache:
@@ -642,13 +664,7 @@ class MapUIMixin:
 
     def get_mountains_tile_image(self, y, x, cell_size):
         """Auto-tiling wzgórz – przezroczysty kafel na tle plains."""
-        neigh = self.get_mountains_neighbors(y, x)
-        # najpierw wybieramy "logiczny" kafel (kształt brzegu wzgórz)
-        filename = self.pick_mountains_tile_name(neigh)  # np. 'mountains_north_1.png'
-
-        # teraz deterministycznie wybieramy wariant _1/_2/_3
-        if hasattr(self, "mountains_defs"):
-            filename = self._choose_tile_variant(filename, self.mountains_defs, "mountains", y, x)
+        filename = self._assigned_tile_name(y, x, "mountains")
 
         key = (filename, cell_size)
         if key in self.mountains_tile_cache:
@@ -733,144 +749,75 @@ class MapUIMixin:
             )
 
     # ===== WSPÓLNE RYSOWANIE TERAENU =====
-    def _draw_terrain_cell(self, canvas, x, y, offset_x, offset_y, cell_size):
+    def _terrain_cell_items(self, x, y, offset_x, offset_y, cell_size):
         """
-        Wspólne rysowanie JEDNEGO odkrytego pola mapy:
+        Opisy elementów Canvas (canvas_layers.item) dla JEDNEGO odkrytego pola mapy:
         - sea / forest / hills: plains w tle + autotiling
         - settlement / district: plains w tle + camp overlay (district 50% mniejsza)
         - field: plains sprite
         - reszta terenów: prostokąt koloru
         """
-        cell = self.map_grid[y][x]
-        terrain = cell["terrain"]
+        terrain = self.map_grid[y][x]["terrain"]
+        x0, y0 = offset_x + x * cell_size, offset_y + y * cell_size
+        x1, y1 = x0 + cell_size, y0 + cell_size
 
-        # ===== sea / forest / hills (jak było) =====
-        if terrain in ("sea", "forest", "hills"):
-            # tło – field (plains)
+        def plains_or(color):
+            # tło – field (plains), a bez grafiki prostokąt koloru
             try:
-                bg_img = self.get_plains_tile(cell_size)
-                canvas.create_image(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    anchor="nw",
-                    image=bg_img
-                )
+                return item(MAP_GROUND, "image", x0, y0, anchor="nw", image=self.get_plains_tile(cell_size))
             except Exception:
-                ground = BASE_COLORS.get("field", "#7a6b4a")
-                canvas.create_rectangle(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    offset_x + (x + 1) * cell_size,
-                    offset_y + (y + 1) * cell_size,
-                    fill=ground,
-                    outline="gray"
-                )
-
-            img = None
+                return item(MAP_GROUND, "rectangle", x0, y0, x1, y1, fill=color, outline="gray")
+
+        # ===== sea / forest / hills (jak było) =====
+        if terrain in ("sea", "forest", "hills"):
+            items = [plains_or(BASE_COLORS.get("field", "#7a6b4a"))]
+
             if terrain == "sea":
                 img = self.get_ocean_tile_image(y, x, cell_size)
-                fallback_color = BASE_COLORS["sea"]
             elif terrain == "forest":
                 img = self.get_forest_tile_image(y, x, cell_size)
-                fallback_color = BASE_COLORS["forest"]
             else:  # "hills"
                 img = self.get_mountains_tile_image(y, x, cell_size)
-                fallback_color = BASE_COLORS["hills"]
 
             if img:
-                canvas.create_image(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    anchor="nw",
-                    image=img
-                )
+                items.append(item(MAP_TERRAIN, "image", x0, y0, anchor="nw", image=img))
             else:
-                canvas.create_rectangle(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    offset_x + (x + 1) * cell_size,
-                    offset_y + (y + 1) * cell_size,
-                    fill=fallback_color,
-                    outline="gray"
-                )
-            return
+                items.append(item(MAP_TERRAIN, "rectangle", x0, y0, x1, y1, fill=BASE_COLORS[terrain], outline="gray"))
+            return items
 
         # ===== settlement / district =====
         if terrain in ("settlement", "district"):
             # tło jak "field"
-            try:
-                bg_img = self.get_plains_tile(cell_size)
-                canvas.create_image(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    anchor="nw",
-                    image=bg_img
-                )
-            except Exception:
-                ground = BASE_COLORS.get("field", "#CCCC99")
-                canvas.create_rectangle(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    offset_x + (x + 1) * cell_size,
-                    offset_y + (y + 1) * cell_size,
-                    fill=ground,
-                    outline="gray"
-                )
+            items = [plains_or(BASE_COLORS.get("field", "#CCCC99"))]
 
             # nakładka camp.png
             icon = self.get_camp_icon(cell_size, small=(terrain == "district"))
             if icon:
                 img_icon, icon_size = icon
-                if terrain == "settlement":
-                    canvas.create_image(
-                        offset_x + x * cell_size,
-                        offset_y + y * cell_size,
-                        anchor="nw",
-                        image=img_icon
-                    )
-                else:
-                    off = (cell_size - icon_size) // 2
-                    canvas.create_image(
-                        offset_x + x * cell_size + off,
-                        offset_y + y * cell_size + off,
-                        anchor="nw",
-                        image=img_icon
-                    )
-            return
+                off = 0 if terrain == "settlement" else (cell_size - icon_size) // 2
+                items.append(item(MAP_TERRAIN, "image", x0 + off, y0 + off, anchor="nw", image=img_icon))
+            return items
 
         # ===== field (plains sprite) =====
         if terrain == "field":
-            try:
-                img = self.get_plains_tile(cell_size)
-                canvas.create_image(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    anchor="nw",
-                    image=img
-                )
-            except Exception:
-                # fallback na kolor jeśli plains.png nie ma
-                color = BASE_COLORS.get("field", "#CCCC99")
-                canvas.create_rectangle(
-                    offset_x + x * cell_size,
-                    offset_y + y * cell_size,
-                    offset_x + (x + 1) * cell_size,
-                    offset_y + (y + 1) * cell_size,
-                    fill=color,
-                    outline="gray"
-                )
-            return
+            # fallback na kolor jeśli plains.png nie ma
+            return [plains_or(BASE_COLORS.get("field", "#CCCC99"))]
 
         # ===== reszta terenów =====
-        color = BASE_COLORS[terrain]
-        canvas.create_rectangle(
-            offset_x + x * cell_size,
-            offset_y + y * cell_size,
-            offset_x + (x + 1) * cell_size,
-            offset_y + (y + 1) * cell_size,
-            fill=color,
-            outline="gray"
-        )
+        return [item(MAP_GROUND, "rectangle", x0, y0, x1, y1, fill=BASE_COLORS[terrain], outline="gray")]
+
+    def get_terra_incognita_tile(self, cell_size: int):
+        """Kafel nieodkrytego pola przeskalowany do cell_size albo None, gdy brak grafiki."""
+        if not hasattr(self, "terra_incognita_img"):
+            self.terra_incognita_img = {}
+        if cell_size not in self.terra_incognita_img:
+            try:
+                base = Image.open(self.resource_path("img/tiles/terra_incognita.png"))
+                img = base.resize((cell_size, cell_size), Image.LANCZOS)
+                self.terra_incognita_img[cell_size] = ImageTk.PhotoImage(img)
+            except Exception:
+                self.terra_incognita_img[cell_size] = None
+        return self.terra_incognita_img[cell_size]
 
     # ===== WSPÓLNA MAPA (EKSPLORACJA + BUDOWANIE) =====
     def show_world_map(self):
@@ -927,15 +874,13 @@ class MapUIMixin:
                 return False
 
             if not data.get("requires_settlement"):
-                if cell["building"] or any(c[1]["pos"] == (y, x) for c in self.constructions):
+                if cell["building"] or self.constructions_at((y, x)):
                     return False
 
             if data.get("requires_settlement"):
-                if terrain not in ["settlement", "district"]:
+                if terrain not in SETTLEMENT_TERRAINS:
                     return False
-                used = len([b for b in cell["building"] if not b.get("is_district", False)])
-                in_progress = len([c for c in self.constructions if c[1]["pos"] == (y, x)])
-                if used + in_progress >= 5:
+                if self.cell_index().used_slots((y, x)) >= SETTLEMENT_SLOTS:
                     return False
 
             if data.get("requires_adjacent_settlement"):
@@ -946,154 +891,124 @@ class MapUIMixin:
 
             return True
 
-        def draw():
-            canvas.delete("all")
+        # elementy Canvas tworzone raz na pole, potem tylko aktualizowane
+        layers = CanvasLayers(canvas, MAP_LAYERS)
+
+        def cell_key(y, x, cell, frontier):
+            """Wszystko, od czego zależy wygląd pola – ten sam klucz = nic do zrobienia."""
+            if not cell["discovered"]:
+                return "fog", (y, x) in frontier
+
+            terrain = cell["terrain"]
+            # autotiling zależy od terenu sąsiadów
+            around = self.map_grid.terrain_around(y, x) if terrain in ("sea", "forest", "hills") else None
+
+            building_in_progress = next(iter(self.constructions_at((y, x))), None)
+            pct = None
+            if building_in_progress:
+                end, _, _, start = building_in_progress
+                total_days = (end - start).days
+                elapsed = (self.current_date - start).days
+                pct = min(100, max(0, int(elapsed / total_days * 100))) if total_days > 0 else 0
+
+            used = self.cell_index().occupied.get((y, x), 0)
+            highlight = bool(self.selected_building) and can_build_here(y, x, cell)
+            return terrain, around, pct, used, cell["resource"], highlight
+
+        def cell_items(y, x, cell, key):
+            x0, y0 = offset_x + x * cell_size, offset_y + y * cell_size
+            x1, y1 = x0 + cell_size, y0 + cell_size
+            cx, cy = x0 + cell_size // 2, y0 + cell_size // 2
+
+            # --- NIEODKRYTE jak w eksploracji ---
+            if key[0] == "fog":
+                # najpierw zawsze rysujemy tło terra incognita
+                fog = self.get_terra_incognita_tile(cell_size)
+                if fog:
+                    items = [item(MAP_GROUND, "image", x0, y0, anchor="nw", image=fog)]
+                else:
+                    # fallback – szary kwadrat
+                    items = [item(MAP_GROUND, "rectangle", x0, y0, x1, y1, fill="#888888", outline="gray")]
+
+                # pole "przy odkrytym" -> overlay eksploracji
+                if key[1]:
+                    items.append(item(MAP_MARKER, "rectangle", x0, y0, x1, y1, outline="yellow", width=2))
+                    items.append(item(MAP_TEXT, "text", cx, cy, text=self.loc.t("screen.exploration.unknown_tile"),
+                                      fill="white", font=tile_q_font))
+                return items
+
+            # --- ODKRYTE pola: rysunek terenu jak 1:1 z obu map ---
+            terrain, _, pct, used, resource, highlight = key
+            items = self._terrain_cell_items(x, y, offset_x, offset_y, cell_size)
+
+            # --- budowa w toku procent ---
+            if pct is not None:
+                items.append(item(MAP_TEXT, "text", cx, cy + 20, text=f"{pct}%", fill="white", font=tile_label_font))
+
+            # --- ikona budynku (jak w show_map) ---
+            if terrain not in ["settlement", "district"]:
+                if used:
+                    icon = self.get_building_icon(cell_size)
+                    if icon:
+                        img_icon, icon_size = icon
+                        items.append(item(MAP_MARKER, "image", cx, cy, image=img_icon))
+
+            # --- osada/dzielnica (label + used/5) ---
+            if terrain in ["settlement", "district"]:
+                label = self.loc.t(f"terrain.{terrain}.name", default=terrain.capitalize())
+                items.append(item(MAP_LABEL, "text", cx, cy - 20, text=label, fill="white",
+                                  font=settlement_label_font))
+                items.append(item(MAP_TEXT, "text", cx, cy, text=f"{used}/5", fill="yellow", font=tile_num_font))
+
+            # --- surowce na hills (jak w obu mapach) ---
+            if terrain == "hills" and resource:
+                icon = self.get_mine_icon(resource, cell_size)
+                if icon:
+                    img_icon, icon_size = icon
+                    items.append(item(MAP_MARKER, "image", x1 - 5 - icon_size // 2, y1 - 5 - icon_size // 2, image=img_icon))
+                else:
+                    items.append(item(MAP_MARKER, "rectangle", x1 - 20, y1 - 20, x1 - 5, y1 - 5,
+                                      fill=MINE_COLORS[resource], outline="black"))
+
+            # --- ZIELONE RAMKI tylko w trybie budowy ---
+            if highlight:
+                items.append(item(MAP_HIGHLIGHT, "rectangle", x0, y0, x1, y1, outline="lime", width=3))
+            return items
+
+        def draw_cells():
+            # nieodkryte pola przy odkrytych – jedna maska na całą mapę
+            frontier = self.map_grid.frontier()
+            changed = 0
 
             for y in range(self.map_size):
                 for x in range(self.map_size):
                     cell = self.map_grid[y][x]
+                    key = cell_key(y, x, cell, frontier)
+                    changed += layers.update((y, x), key, lambda: cell_items(y, x, cell, key))
+
+            self.profiler.count("map_cells_changed", changed)
+            layers.restack()
+
+        def draw():
+            with self.profiler.frame("map_draw"):
+                draw_cells()
+
+        # okno otwarte dłużej niż jeden dzień: odśwież tylko zmienione pola
+        refresh_job = None
+
+        def refresh():
+            nonlocal refresh_job
+            refresh_job = None
+            if canvas.winfo_exists():
+                draw()
 
-                    # --- NIEODKRYTE jak w eksploracji ---
-                    if not cell["discovered"]:
-                        # najpierw zawsze rysujemy tło terra incognita
-                        try:
-                            if (not hasattr(self, "terra_incognita_img")
-                                    or cell_size not in self.terra_incognita_img):
-                                path = self.resource_path("img/tiles/terra_incognita.png")
-                                base = Image.open(path)
-                                img = base.resize((cell_size, cell_size), Image.LANCZOS)
-
-                                if not hasattr(self, "terra_incognita_img"):
-                                    self.terra_incognita_img = {}
-                                self.terra_incognita_img[cell_size] = ImageTk.PhotoImage(img)
-
-                            canvas.create_image(
-                                offset_x + x * cell_size,
-                                offset_y + y * cell_size,
-                                anchor="nw",
-                                image=self.terra_incognita_img[cell_size]
-                            )
-
-                        except Exception:
-                            # fallback – szary kwadrat
-                            canvas.create_rectangle(
-                                offset_x + x * cell_size,
-                                offset_y + y * cell_size,
-                                offset_x + (x + 1) * cell_size,
-                                offset_y + (y + 1) * cell_size,
-                                fill="#888888",
-                                outline="gray",
-                            )
-
-                        # potem sprawdzamy czy pole jest "przy odkrytym" -> wtedy overlay eksploracji
-                        neighbors = [
-                            (y + dy, x + dx)
-                            for dy, dx in [(0, 1), (1, 0), (0, -1), (-1, 0)]
-                            if 0 <= y + dy < self.map_size and 0 <= x + dx < self.map_size
-                        ]
-                        is_frontier = any(self.map_grid[ny][nx]["discovered"] for ny, nx in neighbors)
-
-                        if is_frontier:
-                            canvas.create_rectangle(
-                                offset_x + x * cell_size,
-                                offset_y + y * cell_size,
-                                offset_x + (x + 1) * cell_size,
-                                offset_y + (y + 1) * cell_size,
-                                outline="yellow",
-                                width=2
-                            )
-                            canvas.create_text(
-                                offset_x + x * cell_size + cell_size // 2,
-                                offset_y + y * cell_size + cell_size // 2,
-                                text=self.loc.t("screen.exploration.unknown_tile"),
-                                fill="white",
-                                font=tile_q_font
-                            )
-
-                        continue
-
-                    # --- ODKRYTE pola: rysunek terenu jak 1:1 z obu map ---
-                    terrain = cell["terrain"]
-                    self._draw_terrain_cell(canvas, x, y, offset_x, offset_y, cell_size)
-
-                    # --- budowa w toku procent ---
-                    building_in_progress = next((c for c in self.constructions if c[1]["pos"] == (y, x)), None)
-                    if building_in_progress:
-                        end, _, _, start = building_in_progress
-                        total_days = (end - start).days
-                        elapsed = (self.current_date - start).days
-                        pct = min(100, max(0, int(elapsed / total_days * 100))) if total_days > 0 else 0
-                        canvas.create_text(
-                            offset_x + x * cell_size + cell_size // 2,
-                            offset_y + y * cell_size + cell_size // 2 + 20,
-                            text=f"{pct}%",
-                            fill="white",
-                            font=tile_label_font
-                        )
-
-                    # --- ikona budynku (jak w show_map) ---
-                    if terrain not in ["settlement", "district"]:
-                        buildings_here = [b for b in cell["building"] if not b.get("is_district", False)]
-                        if buildings_here:
-                            icon = self.get_building_icon(cell_size)
-                            if icon:
-                                img_icon, icon_size = icon
-                                cx = offset_x + x * cell_size + cell_size // 2
-                                cy = offset_y + y * cell_size + cell_size // 2
-                                canvas.create_image(cx, cy, image=img_icon)
-
-                    # --- osada/dzielnica (label + used/5) ---
-                    if terrain in ["settlement", "district"]:
-                        buildings_here = [b for b in cell["building"] if not b.get("is_district", False)]
-                        label = self.loc.t(f"terrain.{terrain}.name", default=terrain.capitalize())
-                        used = len(buildings_here)
-                        canvas.create_text(
-                            offset_x + x * cell_size + cell_size // 2,
-                            offset_y + y * cell_size + cell_size // 2 - 20,
-                            text=label,
-                            fill="white",
-                            font=settlement_label_font,
-                            tags=("tile_label",)
-                        )
-                        canvas.create_text(
-                            offset_x + x * cell_size + cell_size // 2,
-                            offset_y + y * cell_size + cell_size // 2,
-                            text=f"{used}/5",
-                            fill="yellow",
-                            font=tile_num_font
-                        )
-
-                    # --- surowce na hills (jak w obu mapach) ---
-                    if terrain == "hills" and cell["resource"]:
-                        icon = self.get_mine_icon(cell["resource"], cell_size)
-                        if icon:
-                            img_icon, icon_size = icon
-                            cx = offset_x + x * cell_size + cell_size - 5 - icon_size // 2
-                            cy = offset_y + y * cell_size + cell_size - 5 - icon_size // 2
-                            canvas.create_image(cx, cy, image=img_icon)
-                        else:
-                            rc = MINE_COLORS[cell["resource"]]
-                            canvas.create_rectangle(
-                                offset_x + x * cell_size + cell_size - 20,
-                                offset_y + y * cell_size + cell_size - 20,
-                                offset_x + x * cell_size + cell_size - 5,
-                                offset_y + y * cell_size + cell_size - 5,
-                                fill=rc, outline="black"
-                            )
-
-                    # --- ZIELONE RAMKI tylko w trybie budowy ---
-                    if self.selected_building and can_build_here(y, x, cell):
-                        canvas.create_rectangle(
-                            offset_x + x * cell_size,
-                            offset_y + y * cell_size,
-                            offset_x + (x + 1) * cell_size,
-                            offset_y + (y + 1) * cell_size,
-                            outline="lime",
-                            width=3
-                        )
-
-            canvas.tag_raise("tile_label")
-            self.draw_legend(canvas, offset_x, offset_y, cell_size)
+        def on_engine_event(event, **payload):
+            nonlocal refresh_job
+            if event == "changed" and refresh_job is None and {"date", "buildings"} & set(payload["aspects"]):
+                refresh_job = canvas.after_idle(refresh)
+
+        self.subscribe(on_engine_event)
+        canvas.bind("<Destroy>", lambda _e: self.unsubscribe(on_engine_event))
 
         def click(event):
             x = (event.x - offset_x) // cell_size
@@ -1106,16 +1021,11 @@ class MapUIMixin:
                 if building_mode:
                     return  # w trybie budowy klik w nieodkryte pole nic nie robi
 
-                neighbors = [
-                    (y + dy, x + dx)
-                    for dy, dx in [(0, 1), (1, 0), (0, -1), (-1, 0)]
-                    if 0 <= y + dy < self.map_size and 0 <= x + dx < self.map_size
-                ]
-                if not any(self.map_grid[ny][nx]["discovered"] for ny, nx in neighbors):
+                if not self.map_grid.is_frontier(y, x):
                     return
 
                 # identycznie jak w show_explore_map
-                days = random.randint(1, 3) + int(math.hypot(y - self.settlement_pos[0], x - self.settlement_pos[1]))
+                days = self.rng("exploration").randint(1, 3) + int(math.hypot(y - self.settlement_pos[0], x - self.settlement_pos[1]))
                 cost_food = 15;
                 cost_wood = 10
 
@@ -1139,9 +1049,10 @@ class MapUIMixin:
                     self.busy_people += 3
                     self.resources["food"] -= cost_food
                     self.resources["wood"] -= cost_wood
+                    self.notify("resources", "population")
 
                     end_date = self.current_date + timedelta(days=days)
-                    self.expeditions.append((end_date, (y, x), "explore"))
+                    self.start_expedition((y, x), end_date)
                     self.log(self.loc.t("log.exploration.return", y=y, x=x, date=end_date.strftime("%d %b %Y")), "blue")
                     confirm.destroy();
                     win.destroy()
@@ -1182,6 +1093,7 @@ class MapUIMixin:
 
         canvas.bind("<Button-1>", click)
         draw()
+        self.draw_legend(canvas, offset_x, offset_y, cell_size)
         ttk.Button(win, text=self.loc.t("ui.cancel"), command=win.destroy).pack(pady=5)
         self.center_window(win)
 
@@ -1192,87 +1104,3 @@ class MapUIMixin:
     # ===== MAPA EKSPLORACJI =====
     def show_explore_map(self):
         self.show_world_map()
-
-    def finish_expedition(self, exp):
-        self.busy_people -= 3
-        y, x = exp[1]
-        cell = self.map_grid[y][x]
-
-        if exp[2] == "explore":
-            cell["discovered"] = True
-
-            terrain = cell["terrain"]
-            terrain_name = self.loc.t(f"terrain.{terrain}.name", default=terrain)
-
-            raw_res = cell.get("resource")  # to jest ID albo None
-
-            if not raw_res:  # None / "" / brak
-                self.log(
-                    self.loc.t(
-                        "log.discovered_no_resource_cell",
-                        y=y, x=x,
-                        terrain=terrain_name
-                    ),
-                    "DarkOrange"
-                )
-            else:
-                res_name = self.loc.t(RESOURCE_DISPLAY_KEYS.get(raw_res, raw_res), default=raw_res)
-                self.log(
-                    self.loc.t(
-                        "log.discovered_cell",
-                        y=y, x=x,
-                        terrain=terrain_name,
-                        resource=res_name
-                    ),
-                    "DarkOrange"
-                )
-
-            # bonus eksploracyjny państwa (np. Hiszpania ma 'explore': 1.4)
-            from constants import STATES
-            explore_mult = STATES.get(self.state, {}).get("explore", 1.0)
-
-            def scaled(amount):
-                return max(1, int(amount * explore_mult))
-
-            gains = []
-
-            if terrain == "forest":
-                wood = scaled(50)
-                skins = scaled(25)
-                self.resources["wood"] += wood
-                self.resources["skins"] += skins
-                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.wood"), amount=wood))
-                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.skins"), amount=skins))
-
-            elif terrain == "field":
-                food = scaled(50)
-                self.resources["food"] += food
-                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
-
-            elif terrain == "sea":
-                food = scaled(50)
-                self.resources["food"] += food
-                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
-
-            elif terrain == "hills":
-                ore_type = cell.get("resource")
-                if ore_type:
-                    ore_amt = scaled(50)
-                    self.resources[ore_type] = self.resources.get(ore_type, 0) + ore_amt
-                    gains.append(self.loc.t("log.gain_resource", res=self.loc.t(RESOURCE_DISPLAY_KEYS.get(ore_type, ore_type)), amount=ore_amt))
-                else:
-                    food = scaled(50)
-                    self.resources["food"] += food
-                    gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
-
-            else:
-                food = scaled(50)
-                self.resources["food"] += food
-                gains.append(self.loc.t("log.gain_resource", res=self.loc.t("res.food"), amount=food))
-
-            if gains:
-                self.log(
-                    self.loc.t("log.exploration_loot") + ", ".join(gains),
-                    "green"
-                )
-
@@ -1,87 +1,11 @@
 # missions.py
-import random
-from datetime import timedelta
 import tkinter as tk
 from tkinter import ttk
 
-from constants import ROYAL_MISSIONS, EUROPE_PRICES, RESOURCE_DISPLAY_KEYS, TRIBE_DISPLAY_KEYS
+from constants import ROYAL_MISSIONS, EUROPE_PRICES, RESOURCE_DISPLAY_KEYS
 
 
 class MissionsMixin:
-    def deliver_new_mission(self):
-        mission_idx = random.randint(0, len(ROYAL_MISSIONS) - 1)
-        mission = ROYAL_MISSIONS[mission_idx]
-
-        growth = random.uniform(1.05, 1.15)
-
-        if not self.first_mission_given:
-            self.mission_multiplier = 1
-            self.first_mission_given = True
-
-        else:
-            self.mission_multiplier *= growth
-        difficulty = int(self.mission_multiplier * 1.5)  # <-- jak wcześniej
-
-        required = {}
-        mission_name = self.loc.t(mission["name_key"], default=mission["name_key"])
-        for res, base_amt in mission["base"].items():
-            required[res] = max(1, int(base_amt * self.mission_multiplier))
-
-        end_date = self.current_date + timedelta(days=365)
-        monarch = self.get_monarch()
-        resources_txt = ", ".join(
-            f"{v} {self.loc.t(RESOURCE_DISPLAY_KEYS.get(res, res), default=res)}"
-            for res, v in required.items()
-        )
-        mission_text = self.loc.t(
-            "mission.royal.request",
-            monarch=monarch,
-            missionName=mission_name,
-            resources=resources_txt,
-            date=end_date.strftime("%d %b %Y")
-        )
-
-        # (end_date, required, sent, difficulty, mission_text, mission_idx)
-        self.current_mission = (end_date, required.copy(), {}, difficulty, mission_text, mission_idx)
-        self.log(mission_text, "purple")
-        self.play_sound("new_mission")
-
-    def tribe_name(self, tribe: str) -> str:
-        """Zwraca zlokalizowaną nazwę plemienia dla UI."""
-        key = TRIBE_DISPLAY_KEYS.get(tribe)
-        return self.loc.t(key, default=tribe) if key else tribe
-
-    def pay_mission_with_gold(self):
-        if not self.current_mission:
-            self.log(self.loc.t("mission.none_active"), "red")
-            return
-
-        end, req, sent, diff, text, idx = self.current_mission
-
-        # czego jeszcze brakuje
-        remaining = {r: req[r] - sent.get(r, 0) for r in req if sent.get(r, 0) < req[r]}
-        if not remaining:
-            self.log(self.loc.t("mission.already_done"), "gray")
-            return
-
-        # wartość brakujących towarów wg cen europejskich
-        total_value = sum(a * EUROPE_PRICES.get(r, 10) for r, a in remaining.items())
-
-        # *** TU ZMIANA ***
-        # zamiast stałego 1.5 bierzemy poziom trudności diff jako mnożnik
-        # (możesz to łatwo zmienić, np. na diff * 1.2, jeśli będzie za tanio/drogo)
-        cost = int(total_value * diff)
-
-        if self.resources["ducats"] < cost:
-            self.log(self.loc.t("mission.royal.not_enough_ducats", cost=cost), "red")
-            return
-
-        self.resources["ducats"] -= cost
-        self.log(self.loc.t("mission.royal.paid_log", cost=cost), "DarkOrange")
-
-        # nagroda jak poprzednio
-        self.europe_relations[self.state] = min(100, self.europe_relations[self.state] + 10 * diff)
-        self.complete_royal_mission()
 
     def show_missions_overview(self):
         """Okno zbiorcze wszystkich misji: królewskich i indiańskich.
@@ -435,22 +359,9 @@ class MissionsMixin:
                     for r in required:
                         mission["sent"][r] = required[r]
 
-                    remaining_days = (mission["end"] - self.current_date).days
-                    full_months_left = max(0, remaining_days // 30)
-                    reward = 10 + 2 * full_months_left
-
-                    self.native_relations[tribe] = min(
-                        100, self.native_relations[tribe] + reward
-                    )
-
-                    self.log(
-                        self.loc.t("mission.native.done_log", tribe=self.tribe_name(tribe), reward=reward),
-                        "green"
-                    )
-
-                    self.native_missions_active[tribe] = None
-                    cd = random.randint(30, 60)
-                    self.native_missions_cd[tribe] = self.current_date + timedelta(days=cd)
+                    # wcześniejsze wykonanie: wyższa nagroda, krótszy cooldown (1–2 miesiące)
+                    self.complete_native_mission(tribe, base_reward=10, cooldown=(30, 60),
+                                                 log_key="mission.native.done_log")
 
                     win.destroy()
 
@@ -487,23 +398,6 @@ class MissionsMixin:
 
         self.center_window(win)
 
-    def complete_royal_mission(self):
-        """Wywoływane po ukończeniu misji królewskiej."""
-        self.completed_missions += 1
-        self.mission_counter_label.config(
-            text=self.loc.t(
-                "mission.royal.counter",
-                completed=self.completed_missions,
-                to_win=self.missions_to_win
-            )
-        )
-
-        # self.log("Misja królewska wykonana!", "green")
-        self.current_mission = None
-
-        if self.completed_missions >= self.missions_to_win:
-            self.win_game()
-
     def death_game(self):
         win = self.create_window(self.loc.t("screen.death.title"), key="screen.death")
 
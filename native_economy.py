@@ -0,0 +1,125 @@
+# native_economy.py
+"""
+Gospodarka plemion indiańskich jako tablice plemiona × surowce.
+
+Zapasy, dzienna produkcja i pojemność magazynów każdego plemienia leżą
+w trzech równoległych tablicach (wiersz = plemię, kolumna = surowiec
+z NATIVE_RESOURCE_ECONOMY). Upływ dowolnej liczby dni to jedno
+min(cap, stock + prod * dni) na całej tablicy, zamiast pętli po plemionach
+i słownikach surowców. Bez NumPy te same wzory liczymy na listach.
+
+Słownikowe widoki (table_dict()/load_table()) służą do zapisu gry i debugowania –
+zmiany zapasów idą przez deliver()/take().
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from constants import NATIVE_RESOURCE_ECONOMY
+
+# stała kolejność kolumn: NATIVE_RESOURCES[j] <-> kolumna j
+NATIVE_RESOURCES = tuple(NATIVE_RESOURCE_ECONOMY)
+NATIVE_RES_INDEX = {r: j for j, r in enumerate(NATIVE_RESOURCES)}
+
+TABLES = ("prod", "cap", "stock")
+
+
+class NativeEconomy:
+
+    def __init__(self, tribes=()):
+        self.tribes = []
+        self._row = {}
+        width = len(NATIVE_RESOURCES)
+        if np is not None:
+            self.prod = np.zeros((0, width))
+            self.cap = np.zeros((0, width))
+            self.stock = np.zeros((0, width))
+        else:
+            self.prod, self.cap, self.stock = [], [], []
+        for tribe in tribes:
+            self._add_tribe(tribe)
+
+    @classmethod
+    def roll(cls, tribes, rng):
+        """Losuje produkcję i pojemność z NATIVE_RESOURCE_ECONOMY; plemiona startują z pełnym magazynem."""
+        econ = cls(tribes)
+        for tribe in econ.tribes:
+            i = econ._row[tribe]
+            for j, res in enumerate(NATIVE_RESOURCES):
+                p_min, p_max = NATIVE_RESOURCE_ECONOMY[res]["daily_prod"]
+                c_min, c_max = NATIVE_RESOURCE_ECONOMY[res]["stockpile"]
+                prod_val = rng.uniform(p_min, p_max)
+                cap_val = rng.uniform(c_min, c_max)
+                econ.prod[i][j] = prod_val
+                econ.cap[i][j] = cap_val
+                econ.stock[i][j] = cap_val  # startują pełni, żeby handel miał sens od razu
+        return econ
+
+    def _add_tribe(self, tribe):
+        i = self._row.get(tribe)
+        if i is not None:
+            return i
+        i = self._row[tribe] = len(self.tribes)
+        self.tribes.append(tribe)
+        width = len(NATIVE_RESOURCES)
+        for name in TABLES:
+            table = getattr(self, name)
+            if np is not None:
+                setattr(self, name, np.vstack([table, np.zeros(width)]))
+            else:
+                table.append([0.0] * width)
+        return i
+
+    # === Upływ czasu ===
+    def advance(self, days):
+        """Produkcja `days` dni naraz: stock = min(cap, stock + prod * days)."""
+        if days <= 0 or not self.tribes:
+            return
+        if np is not None:
+            np.minimum(self.cap, self.stock + self.prod * days, out=self.stock)
+            return
+        for prod_row, cap_row, stock_row in zip(self.prod, self.cap, self.stock):
+            for j, prod_val in enumerate(prod_row):
+                stock_row[j] = min(cap_row[j], stock_row[j] + prod_val * days)
+
+    # === Handel ===
+    def tracks(self, tribe, res):
+        return tribe in self._row and res in NATIVE_RES_INDEX
+
+    def get(self, name, tribe, res, default=0):
+        """Wartość z tablicy `name` ("prod"/"cap"/"stock") albo default, gdy plemię/surowiec nieśledzone."""
+        if not self.tracks(tribe, res):
+            return default
+        return float(getattr(self, name)[self._row[tribe]][NATIVE_RES_INDEX[res]])
+
+    def deliver(self, tribe, res, amount):
+        """Towar trafia do magazynu plemienia (do pojemności)."""
+        if self.tracks(tribe, res):
+            i, j = self._row[tribe], NATIVE_RES_INDEX[res]
+            self.stock[i][j] = min(self.cap[i][j], self.stock[i][j] + amount)
+
+    def take(self, tribe, res, amount):
+        """Plemię wydaje towar ze swojego zapasu (nie poniżej zera)."""
+        if self.tracks(tribe, res):
+            i, j = self._row[tribe], NATIVE_RES_INDEX[res]
+            self.stock[i][j] = max(0, self.stock[i][j] - amount)
+
+    # === Widoki słownikowe (zapis gry) ===
+    def table_dict(self, name):
+        """{plemię: {surowiec: wartość}} z tablicy `name`."""
+        table = getattr(self, name)
+        return {
+            tribe: {res: float(table[i][j]) for j, res in enumerate(NATIVE_RESOURCES)}
+            for tribe, i in self._row.items()
+        }
+
+    def load_table(self, name, mapping):
+        """Wpisuje {plemię: {surowiec: wartość}} do tablicy `name`; nowe plemiona dostają wiersz."""
+        for tribe, values in (mapping or {}).items():
+            i = self._add_tribe(tribe)
+            table = getattr(self, name)
+            for res, val in values.items():
+                j = NATIVE_RES_INDEX.get(res)
+                if j is not None:
+                    table[i][j] = float(val)
@@ -0,0 +1,184 @@
+# profiling.py
+"""
+Opcjonalne pomiary czasu pętli dnia i UI (domyślnie wyłączone).
+
+Profiler zbiera czasy faz (with profiler.phase("production"): ...) i liczniki
+w obrębie „ramki” – jednego advance_date, odświeżenia paska, rysowania mapy,
+zapisu/wczytania. Po zamknięciu ramki jej podsumowanie trafia do last_frames
+(nakładka debug w main.py) i – jeśli podano trace_path – jako jedna linia
+do pliku JSONL. Fazy mogą być zagnieżdżone, więc ich czasy się nakładają.
+
+Wyłączony profiler zwraca wspólny pusty kontekst, więc instrumentacja
+w gorących ścieżkach kosztuje jedno sprawdzenie flagi.
+
+profile() otacza dowolny fragment (np. jedno advance_date) cProfile albo
+prostym profilerem próbkującym (wątek podglądający stos głównego wątku).
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+_NULL = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+
+    def __init__(self, enabled=False, trace_path=None):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        # ostatnie podsumowanie każdego rodzaju ramki: etykieta → rekord
+        self.last_frames = {}
+        self._phases = {}
+        self._counters = Counter()
+        self._depth = 0
+
+    # === Fazy / liczniki ===
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _NULL
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self._counters[name] += n
+
+    def _add(self, name, seconds):
+        entry = self._phases.get(name)
+        if entry is None:
+            self._phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    # === Ramki ===
+    @contextmanager
+    def frame(self, label):
+        """Ramka pomiaru; zagnieżdżona w innej liczy się tylko jako jej faza."""
+        if not self.enabled:
+            yield
+            return
+        if self._depth:
+            with self.phase(label):
+                yield
+            return
+
+        self._depth += 1
+        self._phases, self._counters = {}, Counter()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self._close_frame(label, time.perf_counter() - start)
+
+    def _close_frame(self, label, seconds):
+        record = {
+            "label": label,
+            "time": time.time(),
+            "ms": round(seconds * 1000, 3),
+            "phases": {
+                name: {"ms": round(total * 1000, 3), "calls": calls}
+                for name, (total, calls) in sorted(self._phases.items(), key=lambda kv: -kv[1][0])
+            },
+            "counters": dict(self._counters),
+        }
+        self.last_frames[label] = record
+        if self.trace_path:
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def summary_lines(self):
+        """Tekst nakładki: ramka → czas i trzy najdroższe fazy."""
+        lines = []
+        for label, rec in self.last_frames.items():
+            top = ", ".join(f"{name} {p['ms']:.1f}" for name, p in list(rec["phases"].items())[:3])
+            lines.append(f"{label}: {rec['ms']:.1f} ms" + (f"  ({top})" if top else ""))
+        return lines
+
+    # === Profilery ===
+    @contextmanager
+    def profile(self, kind="cprofile", out_path=None, interval=0.001):
+        """
+        cProfile ("cprofile") albo próbkowanie stosu co `interval` s ("sampling") wokół bloku.
+        Wynik: .prof (cProfile) albo collapsed stacks do flamegraph (sampling); bez out_path – raport na stdout.
+        """
+        if kind == "sampling":
+            sampler = _StackSampler(interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                text = sampler.collapsed()
+                if out_path:
+                    with open(out_path, "w", encoding="utf-8") as f:
+                        f.write(text)
+                else:
+                    print(text)
+            return
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            if out_path:
+                prof.dump_stats(out_path)
+            else:
+                buf = io.StringIO()
+                pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(25)
+                print(buf.getvalue())
+
+
+class _StackSampler:
+    """Wątek, który co `interval` s zapisuje stos wątku, z którego go uruchomiono."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {n}" for stack, n in self.samples.most_common())
@@ -0,0 +1,102 @@
+# randomness.py
+"""
+Losowania pomocnicze dla symulacji.
+
+binomial() losuje liczbę „sukcesów” z n prób o prawdopodobieństwie p
+w czasie niezależnym od n – np. ilu z tysięcy głodujących kolonistów
+umrze – zamiast rzucać kością osobno dla każdego. Całe losowanie idzie
+z przekazanego strumienia random.Random, więc przy tym samym ziarnie
+wynik jest powtarzalny. geometric() w ten sam sposób zastępuje codzienny
+rzut kością „czy to już dziś?” jednym losowaniem dnia pierwszego sukcesu.
+
+RngStreams to osobne strumienie losowań dla podsystemów gry (mapa, statki,
+misje…), wszystkie wyprowadzone z jednego ziarna gry. Dzięki temu dodatkowe
+losowanie w jednym podsystemie nie przesuwa wyników w pozostałych, a stan
+strumieni trafia do zapisu gry.
+"""
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# poniżej tej średniej (n*p) wystarcza dokładna metoda odwracania dystrybuanty
+_INVERSION_MAX_MEAN = 30
+
+
+class RngStreams:
+    """Niezależne strumienie random.Random wyprowadzone z jednego ziarna gry."""
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed = int(seed)
+        self._streams = {}
+
+    def get(self, name):
+        """Strumień podsystemu `name` (tworzony przy pierwszym użyciu)."""
+        rng = self._streams.get(name)
+        if rng is None:
+            # ziarno-napis random miesza przez sha512 – wynik nie zależy od PYTHONHASHSEED
+            rng = self._streams[name] = random.Random(f"{self.seed}:{name}")
+        return rng
+
+    def getstate(self):
+        return {name: rng.getstate() for name, rng in self._streams.items()}
+
+    def setstate(self, state):
+        """Przywraca stany strumieni (także w postaci list prosto z JSON-a)."""
+        for name, st in (state or {}).items():
+            version, internal, gauss_next = st
+            self.get(name).setstate((version, tuple(internal), gauss_next))
+
+
+def binomial(rng, n, p):
+    """Liczba sukcesów w n próbach Bernoulliego z prawdopodobieństwem p."""
+    n = int(n)
+    if n <= 0 or p <= 0:
+        return 0
+    if p >= 1:
+        return n
+
+    # symetria: losujemy zawsze dla p <= 0.5
+    if p > 0.5:
+        return n - binomial(rng, n, 1.0 - p)
+
+    if n * p < _INVERSION_MAX_MEAN:
+        return _binomial_inversion(rng, n, p)
+
+    if np is not None:
+        # generator NumPy zasiany ze strumienia – dokładny i nadal powtarzalny
+        return int(np.random.default_rng(rng.getrandbits(64)).binomial(n, p))
+
+    # bez NumPy: przybliżenie normalne (średnia >= 30, więc błąd jest pomijalny)
+    mean = n * p
+    sd = math.sqrt(mean * (1.0 - p))
+    return min(n, max(0, int(round(rng.gauss(mean, sd)))))
+
+
+def geometric(rng, p):
+    """Numer pierwszej udanej próby (1, 2, …) przy szansie p w każdej próbie."""
+    if p >= 1:
+        return 1
+    # u z (0, 1]: P(wynik > k) = (1 - p) ** k
+    u = 1.0 - rng.random()
+    return 1 + int(math.log(u) / math.log1p(-p))
+
+
+def _binomial_inversion(rng, n, p):
+    """Przeszukiwanie dystrybuanty od zera; oczekiwany koszt ~ n*p kroków."""
+    q = 1.0 - p
+    s = p / q
+    a = (n + 1) * s
+    r = q ** n
+    u = rng.random()
+    x = 0
+    while u > r and x < n:
+        u -= r
+        x += 1
+        r *= a / x - s
+    return x
@@ -1,15 +1,12 @@
 import tkinter as tk
-from datetime import timedelta
 from tkinter import ttk
-import random
 
 from constants import (
     NATIVE_PRICES,
     EUROPE_PRICES,
     STATES,
-    NATIVE_MISSIONS_DETAILS,
     BLOCK_NATIVE_BUY,
-    BLOCK_EUROPE_BUY, TRIBE_DISPLAY_KEYS, RESOURCE_DISPLAY_KEYS,
+    BLOCK_EUROPE_BUY, RESOURCE_DISPLAY_KEYS,
 )
 
 
@@ -21,11 +18,6 @@ class RelationsMixin:
         except Exception:
             return 0
 
-    def state_name(self, state_id: str) -> str:
-        data = STATES.get(state_id, {})
-        key = data.get("name_key")
-        return self.loc.t(key, default=state_id) if key else state_id
-
     def res_name(self, res_id: str) -> str:
         key = RESOURCE_DISPLAY_KEYS.get(res_id, res_id)
         return self.loc.t(key, default=res_id)
@@ -97,11 +89,6 @@ class RelationsMixin:
 
         return var
 
-    def tribe_name(self, tribe: str) -> str:
-        """Zwraca zlokalizowaną nazwę plemienia dla UI."""
-        key = TRIBE_DISPLAY_KEYS.get(tribe)
-        return self.loc.t(key, default=tribe) if key else tribe
-
     # === Relacje z Indianami ===
     def native_menu(self):
         win = self.create_window(self.loc.t("screen.native_menu.title"), key="screen.native_menu")
@@ -227,6 +214,7 @@ class RelationsMixin:
 
             self.native_relations[tribe] -= cost
             self.people += n
+            self.notify("population")
 
             self.log(
                 self.loc.t("log.integrate_done", n=n, tribe=self.tribe_name(tribe), cost=cost),
@@ -368,9 +356,8 @@ class RelationsMixin:
 
             # --- KUPNO U INDIAN ---
             if res not in BLOCK_NATIVE_BUY:
-                native_stock = self.native_stock.get(tribe, {}).get(res, 0)
-                max_q_buy = int(native_stock)
-                debug_prod = self.native_prod.get(tribe, {}).get(res, 0)
+                max_q_buy = int(self.natives.get("stock", tribe, res))
+                debug_prod = self.natives.get("prod", tribe, res)
                 stock_info = self.loc.t(
                     "debug.native_stock_info",
                     stock=max_q_buy,
@@ -418,17 +405,13 @@ class RelationsMixin:
             for r, a in sell.items():
                 self.resources[r] -= a
                 # Indianie dostają towar do swojego magazynu (jeśli go śledzimy)
-                if r in self.native_stock.get(tribe, {}):
-                    cap = self.native_cap[tribe].get(r, 0)
-                    cur = self.native_stock[tribe].get(r, 0)
-                    self.native_stock[tribe][r] = min(cap, cur + a)
+                self.natives.deliver(tribe, r, a)
 
             for r, a in buy.items():
                 self.resources[r] += a
                 # Indianie sprzedają ze swojego stanu
-                if r in self.native_stock.get(tribe, {}):
-                    cur = self.native_stock[tribe].get(r, 0)
-                    self.native_stock[tribe][r] = max(0, cur - a)
+                self.natives.take(tribe, r, a)
+            self.notify("resources")
 
             net_word = (
                 self.loc.t("screen.trade.net_gain") if net > 0
@@ -695,6 +678,7 @@ class RelationsMixin:
                 self.resources[r] = self.resources.get(r, 0) + a
 
             self.resources["ducats"] += net
+            self.notify("resources")
 
             net_word = (
                 self.loc.t("screen.trade.net_gain") if net > 0
@@ -742,147 +726,3 @@ class RelationsMixin:
 
         # wyśrodkuj okno integracji
         self.center_window(trade_win)
-
-    def send_diplomatic_gift(self, state):
-
-        cost = {"gold": 10, "food": 250, "silver": 20, "steel": 15}
-        if not self.can_afford(cost):
-            self.log(self.loc.t("log.gift_not_enough", state=self.state_name(state)), "red")
-            return
-        self.spend_resources(cost)
-        self.europe_relations[state] = min(100, self.europe_relations[state] + 5)
-        self.log(self.loc.t("log.gift_sent", state=self.state_name(state)), "purple")
-
-    def try_generate_native_missions(self):
-        """Co dzień wywoływane: sprawdza, czy jakieś plemię powinno dostać misję."""
-
-        if self.current_date < self.native_missions_enabled_start:
-            return  # system jeszcze nie wystartował
-
-        for tribe in self.native_relations.keys():
-
-            # 1. Jeśli misja już trwa – sprawdź czy wygasła
-            active = self.native_missions_active.get(tribe)
-            if active:
-                end = active["end"]
-                if self.current_date >= end:
-                    # MISJA NIEWYKONANA → kara
-                    self.native_relations[tribe] = max(
-                        0, self.native_relations[tribe] - 15
-                    )
-                    self.log(
-                        self.loc.t("log.native_mission_expired", tribe=self.tribe_name(tribe)),
-                        "red"
-                    )
-                    self.native_missions_active[tribe] = None
-                    # cooldown 2–3 miesiące
-                    cd = random.randint(60, 90)
-                    self.native_missions_cd[tribe] = self.current_date + timedelta(days=cd)
-                continue
-
-            # 2. Jeśli brak misji aktywnej, ale cooldown trwa → nic nie rób
-            cd_until = self.native_missions_cd.get(tribe)
-            if cd_until and self.current_date < cd_until:
-                continue
-
-            # 3. Losowa szansa — np. 1/14 że dziś dane plemię poprosi o misję
-            # żeby nie waliło się wszystko naraz
-            if random.random() > 1 / 14:
-                continue
-
-            # 4. Generuj misję
-            self.generate_native_mission(tribe)
-
-    def generate_native_mission(self, tribe):
-        """Tworzy nową misję dla konkretnego plemienia."""
-
-        # pierwszy raz? ustaw mnożnik
-        if tribe not in self.native_mission_multiplier:
-            self.native_mission_multiplier[tribe] = 1.0
-        else:
-            # rośnie jak w misjach królewskich
-            self.native_mission_multiplier[tribe] *= random.uniform(1.05, 1.12)
-
-        multiplier = self.native_mission_multiplier[tribe]
-
-        # wybór misji
-        idx = random.randint(0, len(NATIVE_MISSIONS_DETAILS) - 1)
-        data = NATIVE_MISSIONS_DETAILS[idx]
-
-        # wymagania
-        required = {
-            res: max(1, int(base * multiplier))
-            for res, base in data["base"].items()
-        }
-
-        # czas trwania 3–6 miesięcy
-        months = random.randint(3, 6)
-        end_date = self.current_date + timedelta(days=30 * months)
-
-        mission = {
-            "tribe": tribe,
-            "name_key": data["name_key"],
-            "desc_key": data.get("desc_key", ""),
-            "required": required,
-            "sent": {},
-            "end": end_date,
-            "months_limit": months,
-            "idx": idx,
-        }
-
-        self.native_missions_active[tribe] = mission
-
-        mission_name = self.loc.t(data["name_key"], default=data["name_key"])
-        self.log(
-            self.loc.t(
-                "log.native_mission_new",
-                tribe=self.tribe_name(tribe),
-                name=mission_name,
-                months=months
-            ),
-            "purple"
-        )
-        self.play_sound("new_mission")
-
-    def deliver_to_native_mission(self, tribe, resources):
-        """resources = dict {res: amount} wysłanych towarów."""
-
-        mission = self.native_missions_active.get(tribe)
-        if not mission:
-            self.log(self.loc.t("log.native_mission_none", tribe=self.tribe_name(tribe)), "gray")
-            return False
-
-        req = mission["required"]
-        sent = mission["sent"]
-
-        # dodaj zasoby
-        for r, amount in resources.items():
-            if r in req:
-                need = req[r] - sent.get(r, 0)
-                add = min(amount, need)
-                sent[r] = sent.get(r, 0) + add
-
-        # sprawdzenie, czy skończone
-        completed = all(sent.get(r, 0) >= req[r] for r in req)
-
-        if completed:
-            remaining_days = (mission["end"] - self.current_date).days
-            full_months_left = max(0, remaining_days // 30)
-
-            reward = 5 + full_months_left * 2
-
-            self.native_relations[tribe] = min(
-                100, self.native_relations[tribe] + reward
-            )
-            self.log(
-                self.loc.t("log.native_mission_done", tribe=self.tribe_name(tribe), reward=reward),
-                "green"
-            )
-
-            self.native_missions_active[tribe] = None
-
-            # cooldown 2–3 miesiące
-            cd = random.randint(60, 90)
-            self.native_missions_cd[tribe] = self.current_date + timedelta(days=cd)
-
-        return True
@@ -1,12 +1,13 @@
 # reset_manager.py
-import random
-from datetime import timedelta
+from collections import deque
 
+from building_registry import BuildingRegistry
 from constants import (
-    RESOURCES, STATES, TRIBE_DISPLAY_KEYS,
-    NATIVE_RESOURCE_ECONOMY, MAP_SIZE,
-    SHIP_STATUS_IN_PORT
+    LOG_LINES_MAX, RESOURCES, STATES, TRIBE_DISPLAY_KEYS,
+    MAP_SIZE,
 )
+from fleet import Fleet
+from native_economy import NativeEconomy
 
 def reset_game_state(sim, *, to_start_screen=True, keep_settings=True):
     """
@@ -30,6 +31,7 @@ def reset_game_state(sim, *, to_start_screen=True, keep_settings=True):
     sim.people = 10
     sim.busy_people = 0
     sim.days_passed = 0
+    sim.game_over = False
 
     # --- 2) Zasoby (jak w __init__) ---
     sim.resources = {r: 0 for r in RESOURCES}
@@ -42,40 +44,29 @@ def reset_game_state(sim, *, to_start_screen=True, keep_settings=True):
     })
 
     # --- 3) Budynki / konstrukcje / ekspedycje ---
-    sim.buildings = []
+    sim.buildings = BuildingRegistry()
     sim.constructions = []
     sim.upgrades_in_progress = []
     sim.expeditions = []
+    sim.mark_production_dirty()
 
     # --- 4) Statki ---
-    sim.ships = []
+    sim.ships = Fleet()
     sim.flagship_index = 0
 
     # --- 5) Relacje / handel ---
+    # nowa gra = nowe ziarno; plemiona i reszta świata losowane z jego strumieni
+    sim.seed_rng()
+    world = sim.rng("world")
     sim.native_relations = {
-        tribe: 50 for tribe in random.sample(list(TRIBE_DISPLAY_KEYS.keys()), 3)
+        tribe: 50 for tribe in world.sample(list(TRIBE_DISPLAY_KEYS.keys()), 3)
     }
     sim.europe_relations = {s: 0 for s in STATES}
     sim.europe_trade_value = {s: 0 for s in sim.europe_relations}
     sim.native_trade_value = {tribe: 0 for tribe in sim.native_relations}
 
     # --- 6) Produkcja/stock plemion ---
-    sim.native_prod = {}
-    sim.native_cap = {}
-    sim.native_stock = {}
-    for tribe in sim.native_relations:
-        prod_map, cap_map, stock_map = {}, {}, {}
-        for res, econ in NATIVE_RESOURCE_ECONOMY.items():
-            p_min, p_max = econ["daily_prod"]
-            c_min, c_max = econ["stockpile"]
-            prod_val = random.uniform(p_min, p_max)
-            cap_val = random.uniform(c_min, c_max)
-            prod_map[res] = prod_val
-            cap_map[res] = cap_val
-            stock_map[res] = cap_val
-        sim.native_prod[tribe] = prod_map
-        sim.native_cap[tribe] = cap_map
-        sim.native_stock[tribe] = stock_map
+    sim.natives = NativeEconomy.roll(sim.native_relations, world)
 
     sim.trade_reputation_threshold = 1000
     sim.native_missions_enabled_start = None
@@ -90,6 +81,7 @@ def reset_game_state(sim, *, to_start_screen=True, keep_settings=True):
 
     sim.native_missions_active = {}
     sim.native_missions_cd = {}
+    sim.native_missions_next = {}
     sim.native_mission_multiplier = {}
     sim.native_missions = []
 
@@ -100,8 +92,11 @@ def reset_game_state(sim, *, to_start_screen=True, keep_settings=True):
     sim.map_grid = None
     sim.settlement_pos = None
 
+    # kolejka zdarzeń dopiero po wyczyszczeniu budów, statków i misji
+    sim.rebuild_schedule()
+
     # --- 9) Logi ---
-    sim.log_lines = []
+    sim.log_lines = deque(maxlen=LOG_LINES_MAX)
 
     # --- 10) UI / okna ---
     # zamknij wszystkie toplevele poza tymi singletonami trzymanymi w sim
@@ -0,0 +1,43 @@
+# scheduler.py
+"""
+Kolejka priorytetowa (kopiec) zdarzeń z datą: koniec budowy, ulepszenia,
+powrót ekspedycji, auto-rejs flagowca. Zmiany stanu statków trzyma
+osobny kopiec floty (fleet.Fleet).
+
+Wpisy są „leniwe” – anulowane zadanie zostaje w kopcu, a ColonyEngine.tick()
+po zdjęciu sprawdza, czy jest jeszcze aktualne. Kolejki nie zapisujemy:
+po wczytaniu gry odbudowuje ją ColonyEngine.rebuild_schedule().
+"""
+import heapq
+from itertools import count
+
+
+class EventScheduler:
+
+    def __init__(self):
+        self._heap = []
+        # licznik rozstrzyga remisy dat, żeby heapq nie porównywał ładunków
+        self._seq = count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def clear(self):
+        self._heap.clear()
+
+    def schedule(self, when, kind, payload=None):
+        if when is None:
+            return
+        heapq.heappush(self._heap, (when, next(self._seq), kind, payload))
+
+    def next_date(self):
+        """Data najbliższego zdarzenia albo None."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Zdejmuje wszystkie zdarzenia z datą <= now: [(data, rodzaj, ładunek)] w kolejności dat."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, kind, payload = heapq.heappop(self._heap)
+            due.append((when, kind, payload))
+        return due
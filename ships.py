@@ -1,11 +1,9 @@
 # ships.py
 import tkinter as tk
 from tkinter import ttk
-from datetime import timedelta
-import random
 from functools import partial
 
-from constants import EUROPE_PRICES, RESOURCES, STATES, SHIP_STATUS_IN_EUROPE_PORT, SHIP_STATUS_RETURNING, SHIP_STATUS_IN_PORT, SHIP_STATUS_TO_EUROPE, SHIP_STATUS_KEYS, RESOURCE_DISPLAY_KEYS, SHIP_NAMES_BY_STATE, SHIP_TYPES, BUILDINGS
+from constants import EUROPE_PRICES, RESOURCES, SHIP_STATUS_IN_EUROPE_PORT, SHIP_STATUS_RETURNING, SHIP_STATUS_IN_PORT, SHIP_STATUS_TO_EUROPE, SHIP_STATUS_KEYS, RESOURCE_DISPLAY_KEYS, SHIP_TYPES, BUILDINGS
 from tooltip import Tooltip
 
 
@@ -91,7 +89,8 @@ class ShipsMixin:
         display_ships = list(self.ships)
 
         # ======= RENDER 3-KOLUMNOWY =======
-        for i, (arrival_to_eu, arrival_back, load, status, pending, ship_name, ship_type) in enumerate(display_ships):
+        for i, ship in enumerate(display_ships):
+            arrival_to_eu, arrival_back, load, status, pending, ship_name, ship_type = ship.to_tuple()
             row, col = divmod(i, 3)
             is_flagship = (i == self.flagship_index)
 
@@ -229,38 +228,6 @@ class ShipsMixin:
         # wyśrodkuj okno statków
         self.center_window(win)
 
-    def _ship_capacity(self, ship_type):
-        """Zwraca ładowność statku wynikającą z jego typu (fallback na galleon)."""
-        return SHIP_TYPES.get(ship_type, SHIP_TYPES["galleon"])["capacity"]
-
-    def _ensure_ship_names(self):
-        """Dla nowych gier i starych savów: dopina nazwy i typy do statków jeśli ich brak."""
-        used = []
-        new_list = []
-        for ship in self.ships:
-            # nowy format: (arrival_to_eu, arrival_back, load, status, pending, name, ship_type)
-            if len(ship) == 7:
-                new_list.append(ship);
-                used.append(ship[5]);
-                continue
-
-            # format po dodaniu nazw (len==6) → dopnij ship_type
-            if len(ship) == 6:
-                arrival_to_eu, arrival_back, load, status, pending, name = ship
-                ship_type = "galleon"  # default dla starych save’ów
-                new_list.append((arrival_to_eu, arrival_back, load, status, pending, name, ship_type))
-                used.append(name)
-                continue
-
-            # stary format: (arrival_to_eu, arrival_back, load, status, pending)
-            arrival_to_eu, arrival_back, load, status, pending = ship
-            name = self.get_random_ship_name(self.state, used)
-            used.append(name)
-            ship_type = "galleon"  # na start największa jednostka jak dotąd
-            new_list.append((arrival_to_eu, arrival_back, load, status, pending, name, ship_type))
-
-        self.ships = new_list
-
     def open_build_ship_menu(self, parent_win):
         build_win = self.create_window(self.loc.t("screen.build_ship.title"), key="screen.build_ship")
         build_win.geometry("600x900")
@@ -356,93 +323,10 @@ class ShipsMixin:
         ttk.Button(build_win, text=self.loc.t("ui.cancel"), command=build_win.destroy).pack(pady=6)
         self.center_window(build_win)
 
-    def _get_best_harbor_level(self):
-        """Zwraca najwyższy poziom przystani w kolonii albo -1 jeśli brak."""
-        best = -1
-        for b in getattr(self, "buildings", []):
-            base_id = b.get("base")
-            if base_id == "harbor":
-                best = max(best, b.get("level", 0))
-        return best
-
-    def _harbor_allows_ship(self, ship_type):
-        """
-        True jeśli gracz ma przystań i jej poziom pozwala na budowę tego typu statku.
-        Obsługuje dwa warianty:
-          - jeśli SHIP_TYPES[type] ma pole required_harbor_level -> używa go
-          - jeśli nie ma, bierze pole tier (1..3), a wymagany poziom = tier-1
-          - jeśli nie ma ani required_harbor_level ani tier, to traktuje kolejność
-            w SHIP_TYPES jako tier 1..N
-        """
-        data = SHIP_TYPES.get(ship_type, {})
-        harbor_lvl = self._get_best_harbor_level()
-
-        if harbor_lvl < 0:
-            return False, "no_harbor", {}
-
-        if "required_harbor_level" in data:
-            req_lvl = int(data["required_harbor_level"])
-        elif "tier" in data:
-            req_lvl = max(1, int(data["tier"]))
-        else:
-            # fallback: kolejność w SHIP_TYPES (pierwszy typ = tier 1)
-            types_order = list(SHIP_TYPES.keys())
-            tier = types_order.index(ship_type) + 1 if ship_type in types_order else 1
-            req_lvl = max(1, tier)
-
-        if harbor_lvl < req_lvl:
-            return False, "harbor_too_low", {"need": req_lvl, "have": harbor_lvl}
-
-        return True, None, {}
-
     def start_build_ship(self, ship_type, build_win, parent_win):
-        self._ensure_ship_names()
-        data = SHIP_TYPES.get(ship_type)
-        if not data:
-            return
-
-        ok, err, ctx = self._harbor_allows_ship(ship_type)
-        if not ok:
-            if err == "no_harbor":
-                self.log(self.loc.t("log.no_harbor_for_ship"), "red")
-            else:
-                self.log(self.loc.t("log.harbor_level_too_low", level_needed=ctx["need"], level_have=ctx["have"]), "red")
-            return
-
-        # 1) sprawdź surowce
-        cost = data.get("cost", {})
-        missing = {r: a - self.resources.get(r, 0) for r, a in cost.items() if self.resources.get(r, 0) < a}
-        if missing:
-            miss_str = ", ".join(
-                f"{self.loc.t(RESOURCE_DISPLAY_KEYS.get(r, r), default=r)}: {v}"
-                for r, v in missing.items()
-            )
-            self.log(self.loc.t("log.not_enough_resources_for_ship", missing=miss_str), "red")
-            return
-
-        # 2) sprawdź wolnych ludzi (u Ciebie free_workers() jest w main)
-        crew_needed = data.get("crew", 0)
-        free_now = self.free_workers()
-        if free_now < crew_needed:
-            self.log(self.loc.t("log.not_enough_free_workers_for_ship", needed=crew_needed, free=free_now), "red")
+        if not self.build_ship(ship_type):
             return
 
-        # odejmij koszt
-        for r, a in cost.items():
-            self.resources[r] -= a
-
-        # zabierz ludzi z puli na czas budowy
-        self.people -= crew_needed
-
-        # budowa: arrival_to_eu = data ukończenia
-        finish_date = self.current_date + timedelta(days=data.get("build_time", 1))
-
-        used = [s[5] for s in self.ships if len(s) >= 6]
-        name = self.get_random_ship_name(self.state, used)
-
-        self.ships.append((finish_date, None, {}, "building", 0, name, ship_type))
-        self.log(self.loc.t("log.ship_build_started", name=name, days=data.get("build_time", 1)), "blue")
-
         try:
             build_win.destroy()
         except Exception:
@@ -453,109 +337,13 @@ class ShipsMixin:
             pass
         self.ships_menu()
 
-
-    def calculate_load_time(self, load):
-        return 1 + (sum(load.values()) // 500)
-
-    def calculate_travel_days(self, ship_type):
-        base = random.randint(40, 80)
-
-        # prędkość państwa (jeśli brak, to 1.0)
-        state_speed = STATES[self.state].get("speed", 1.0)
-
-        # prędkość statku z typu (fallback na galleon)
-        ship_speed = SHIP_TYPES.get(ship_type, SHIP_TYPES["galleon"]).get("speed", 1.0)
-
-        # im większa prędkość, tym mniej dni
-        days = int(base / state_speed / ship_speed)
-
-        return max(1, days)
-
-    def get_random_ship_name(self, state_key, used=None):
-        """Losuje nazwę statku dla danego państwa, unikając już użytych."""
-        pool = SHIP_NAMES_BY_STATE.get(state_key, [])
-        if not pool:
-            return f"Ship {random.randint(1, 999)}"
-        used = set(used or [])
-        candidates = [n for n in pool if n not in used]
-        return random.choice(candidates if candidates else pool)
-
-    def send_ship(self, load, ship_idx=None):
-        self._ensure_ship_names()
-        total_units = sum(load.values())
-
-        # jeśli wskazano konkretny statek – użyj go
-        if ship_idx is not None:
-            free_ship = ship_idx
-            if free_ship < 0 or free_ship >= len(self.ships):
-                self.log(self.loc.t("log.no_free_ship"), "red")
-                return False
-            if self.ships[free_ship][3] != SHIP_STATUS_IN_PORT:
-                self.log(self.loc.t("log.no_free_ship"), "red")
-                return False
-        else:
-            # fallback: pierwszy wolny (jak było)
-            free_ship = next(
-                (i for i, s in enumerate(self.ships) if s[3] == SHIP_STATUS_IN_PORT),
-                None
-            )
-            if free_ship is None:
-                self.log(self.loc.t("log.no_free_ship"), "red")
-                return False
-
-        # pojemność wynika z typu tego konkretnego statku
-        ship_type = self.ships[free_ship][6]
-        max_cargo = self._ship_capacity(ship_type)
-
-        if total_units > max_cargo:
-            self.log(
-                self.loc.t("ui.too_much_cargo", max_cargo=max_cargo, total=total_units),
-                "red"
-            )
-            return False
-
-        old_arrival_to_eu, old_arrival_back, old_load, old_status, pending, ship_name, ship_type = self.ships[free_ship]
-
-        # >>> NIE LICZYMY MISJI TUTAJ <<<
-
-        for r, a in load.items():
-            self.resources[r] -= a
-
-        load_time = self.calculate_load_time(load)
-        travel_days = self.calculate_travel_days(ship_type)
-        days_to_europe = load_time + travel_days
-        days_in_europe = 7
-        days_back = travel_days
-
-        arrival_to_europe = self.current_date + timedelta(days=days_to_europe)
-        arrival_back = arrival_to_europe + timedelta(days=days_in_europe + days_back)
-
-        self.ships[free_ship] = (
-            arrival_to_europe, arrival_back, load.copy(),
-            SHIP_STATUS_TO_EUROPE, pending, ship_name, ship_type
-        )
-
-        self.auto_sail_timer = None
-
-        self.log(
-            self.loc.t(
-                "log.ship_departed_summary",
-                to_europe=arrival_to_europe.strftime("%d %b %Y"),
-                back=arrival_back.strftime("%d %b %Y"),
-                current=total_units,
-                max=max_cargo
-            ),
-            "blue"
-        )
-        return True
-
     def open_load_menu(self, ship_idx, parent):
 
         load_win = self.create_window(self.loc.t("screen.load_ship.title"), key="screen.load_ship")
 
         load_win.geometry("600x850")
 
-        ship_type = self.ships[ship_idx][6]
+        ship_type = self.ships[ship_idx].ship_type
         max_cargo = self._ship_capacity(ship_type)
 
         top_frame = ttk.Frame(load_win)
@@ -727,137 +515,4 @@ class ShipsMixin:
 
         update_total()
         # wyśrodkuj okno załadunku
-        self.center_window(load_win)
-
-    def process_arriving_ships(self):
-        self._ensure_ship_names()
-        for i, (arrival_to_eu, arrival_back, load, status, pending, ship_name, ship_type) in enumerate(self.ships):
-
-            # 0) budowa statku skończona
-            if status == "building" and arrival_to_eu and self.current_date >= arrival_to_eu:
-                self.ships[i] = (None, None, {}, SHIP_STATUS_IN_PORT, pending, ship_name, ship_type)
-                self.log(self.loc.t("log.ship_built", name=ship_name), "green")
-                continue
-
-            # 1. Statek dotarł do Europy → ROZŁADUNEK + MISJA + 7 DNI POSTOJU
-            if status == SHIP_STATUS_TO_EUROPE and arrival_to_eu and self.current_date >= arrival_to_eu:
-                if load:
-                    excess = load.copy()
-
-                    # === MISJA KRÓLEWSKA (ładunek z każdego statku) ===
-                    if self.current_mission:
-                        _, req, sent, diff, text, idx = self.current_mission
-
-                        for res in req:
-                            if res in excess:  # <--- operujemy na excess
-                                needed = req[res] - sent.get(res, 0)
-                                if needed > 0:
-                                    take = min(excess[res], needed)
-                                    sent[res] = sent.get(res, 0) + take
-                                    excess[res] -= take
-                                    if excess[res] <= 0:
-                                        del excess[res]
-
-                        # misja kończy się dopiero po realnym dopłynięciu
-                        if all(sent.get(r, 0) >= req[r] for r in req):
-                            self.log(self.loc.t("log.royal_mission_done"), "DarkOrange")
-                            self.europe_relations[self.state] = min(
-                                100,
-                                self.europe_relations[self.state] + 10 * diff
-                            )
-                            self.current_mission = None
-                            self.mission_multiplier *= 0.9
-                            self.last_mission_date = self.current_date
-                            self.complete_royal_mission()
-
-                    # === SPRZEDAŻ NADMIARU (tylko to, co zostało po misji) ===
-                    sell_mult = self.get_europe_sell_mult_for_player()
-                    gold = round(
-                        sum(a * EUROPE_PRICES.get(r, 0) * sell_mult for r, a in excess.items())
-                    )
-
-                    if gold > 0:
-                        excess_str = ", ".join(
-                            f"{self.loc.t(RESOURCE_DISPLAY_KEYS.get(k, k), default=k)}: {v}"
-                            for k, v in excess.items()
-                        )
-                        self.log(
-                            self.loc.t(
-                                "log.ship_unloaded_in_europe",
-                                ship_name=ship_name,
-                                cargo=excess_str,
-                                gold=gold
-                            ),
-                            "green"
-                        )
-                        self.resources["ducats"] += gold
-
-                # Statek pusty, czeka 7 dni
-                departure_date = arrival_to_eu + timedelta(days=7)
-                self.ships[i] = (arrival_to_eu, departure_date, {}, SHIP_STATUS_IN_EUROPE_PORT, pending, ship_name, ship_type)
-                self.log(
-                    self.loc.t("log.ship_waiting_in_europe", ship_name=ship_name),
-                    "blue"
-                )
-
-            # 2. Koniec postoju → wypływa PUSTY w drogę powrotną
-            elif status == SHIP_STATUS_IN_EUROPE_PORT    and self.current_date >= arrival_back:
-                days_back = random.randint(60, 90)
-                return_date = self.current_date + timedelta(days=days_back)
-                self.ships[i] = (None, return_date, {}, SHIP_STATUS_RETURNING, pending, ship_name, ship_type)
-                self.log(
-                    self.loc.t(
-                        "log.ship_sailed_from_europe",
-                        ship_name=ship_name,
-                        date=return_date.strftime("%d %b %Y")
-                    ),
-                    "blue"
-                )
-
-            # 3. Statek wrócił do kolonii
-            elif status == SHIP_STATUS_RETURNING and arrival_back and self.current_date >= arrival_back:
-                if pending > 0:
-                    self.people += pending
-                    self.log(
-                        self.loc.t("log.colonists_arrived", pending=pending),
-                        "green"
-                    )
-                    pending = 0  # zeruj po wysadzeniu
-                self.ships[i] = (None, None, {}, SHIP_STATUS_IN_PORT, 0, ship_name, ship_type)
-                if i == self.flagship_index:
-                    self.auto_sail_timer = self.current_date + timedelta(days=14)
-                else:
-                    self.auto_sail_timer = None  # albo zostaw bez zmian, ale nie ustawiaj tu timera
-
-                self.log(
-                    self.loc.t("log.ship_returned_ready", ship_name=ship_name),
-                    "blue"
-                )
-                self.play_sound("ship_arrived")
-
-                # Nowa misja (jeśli minęło 90 dni)
-                if i == self.flagship_index:
-                    if (self.last_mission_date is None or
-                            (self.current_date - self.last_mission_date).days >= 90):
-                        if not self.current_mission:
-                            self.deliver_new_mission()
-
-    def get_europe_sell_mult_for_player(self):
-        # reputacja z własnym państwem europejskim
-        rel = self.europe_relations.get(self.state, 0)
-        t = max(0, min(100, rel)) / 100.0
-        sell_mult = 0.5 + 0.4 * t
-
-        # bonus handlowy gracza (Anglia/Wenecja)
-        if self.state in ("england", "venice"):
-            sell_mult += STATES[self.state]["trade"]
-
-        return sell_mult
-
-    def auto_send_empty_ship(self):
-        if self.auto_sail_timer and self.current_date >= self.auto_sail_timer:
-            i = self.flagship_index
-            # auto tylko jeśli flagowiec stoi w porcie
-            if i is not None and self.ships[i][3] == SHIP_STATUS_IN_PORT:
-                self.send_ship({}, ship_idx=i)
-            self.auto_sail_timer = None
\ No newline at end of file
+        self.center_window(load_win)
\ No newline at end of file
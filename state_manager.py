@@ -3,11 +3,20 @@ from __future__ import annotations
 
 import json
 import os
+from collections import deque
 from datetime import date, datetime
 from copy import deepcopy
 from pathlib import Path
 
+from building_registry import BuildingRegistry
+from fleet import Fleet, Ship
+from map_grid import MapGrid
+from native_economy import NativeEconomy
+from constants import LOG_LINES_MAX
+
 SAVE_DIR = Path("saves")
+# 2: budynki z id, pola mapy i ulepszenia trzymają id budynków (nie dicty / indeksy)
+SAVE_VERSION = 2
 # ==============================
 # WHITELIST: stan gry do zapisu
 # ==============================
@@ -33,7 +42,7 @@ SAVE_FIELDS = [
     # missions royal + native
     "current_mission", "last_mission_date", "mission_multiplier",
     "first_mission_given", "completed_missions", "missions_to_win",
-    "native_missions_active", "native_missions_cd",
+    "native_missions_active", "native_missions_cd", "native_missions_next",
     "native_mission_multiplier", "native_missions",
 
     # monarchy
@@ -41,6 +50,9 @@ SAVE_FIELDS = [
 
     # logs
     "log_lines",
+
+    # losowość: ziarno gry, potem stany strumieni (kolejność ma znaczenie)
+    "rng_seed", "rng_state",
 ]
 
 # ===========================================
@@ -67,9 +79,15 @@ def _to_jsonable(obj):
     if isinstance(obj, (tuple, set)):
         return [_to_jsonable(x) for x in obj]
 
-    if isinstance(obj, list):
+    if isinstance(obj, (list, deque, BuildingRegistry, Fleet)):
         return [_to_jsonable(x) for x in obj]
 
+    if isinstance(obj, Ship):
+        return _to_jsonable(obj.to_tuple())
+
+    if isinstance(obj, MapGrid):
+        return obj.to_rows()
+
     if isinstance(obj, dict):
         return {str(k): _to_jsonable(v) for k, v in obj.items()}
 
@@ -79,7 +97,7 @@ def _to_jsonable(obj):
     return str(obj)
 
 
-def export_state(sim, *, version=1):
+def export_state(sim, *, version=SAVE_VERSION):
     """
     Zwraca dict gotowy do zapisu w JSON:
     {
@@ -88,9 +106,10 @@ def export_state(sim, *, version=1):
     }
     """
     state = {}
-    for f in SAVE_FIELDS:
-        if hasattr(sim, f):
-            state[f] = _to_jsonable(deepcopy(getattr(sim, f)))
+    with sim.profiler.frame("save"):
+        for f in SAVE_FIELDS:
+            if hasattr(sim, f):
+                state[f] = _to_jsonable(deepcopy(getattr(sim, f)))
     return {"version": version, "state": state}
 
 
@@ -131,7 +150,39 @@ def _restore_state_field(field_name, value):
 
     if field_name == "buildings":
         if isinstance(value, list):
-            return [_restore_positions_in_building(deepcopy(b)) for b in value]
+            return BuildingRegistry(_restore_positions_in_building(deepcopy(b)) for b in value)
+        return value
+
+    if field_name == "log_lines":
+        # [(tekst, kolor)] -> ograniczona kolejka jak w ColonyEngine
+        out = deque(maxlen=LOG_LINES_MAX)
+        if isinstance(value, list):
+            for entry in value:
+                if isinstance(entry, list) and len(entry) == 2:
+                    out.append((entry[0], entry[1]))
+        return out
+
+    if field_name == "current_mission":
+        # (end_date, required, sent, difficulty, mission_text, mission_idx)
+        if isinstance(value, list) and len(value) == 6:
+            return (_from_iso(value[0]), *value[1:])
+        return value
+
+    if field_name == "native_missions_active":
+        # tribe -> {..., "end": data} albo None
+        if isinstance(value, dict):
+            out = {}
+            for tribe, m in value.items():
+                if isinstance(m, dict) and "end" in m:
+                    m = dict(m, end=_from_iso(m["end"]))
+                out[tribe] = m
+            return out
+        return value
+
+    if field_name in ("native_missions_cd", "native_missions_next"):
+        # tribe -> data końca cooldownu / następnej prośby o misję
+        if isinstance(value, dict):
+            return {tribe: _from_iso(d) for tribe, d in value.items()}
         return value
 
     if field_name == "expeditions":
@@ -164,80 +215,59 @@ def _restore_state_field(field_name, value):
         return out
 
     if field_name == "upgrades_in_progress":
-        # jeśli masz listę podobną do constructions: (end, b, start, ...)
+        # (end_date, building_id, new_level, start_date)
         out = []
         if isinstance(value, list):
             for u in value:
-                if isinstance(u, list) and len(u) >= 3:
-                    end_d = _from_iso(u[0])
-                    b = _restore_positions_in_building(deepcopy(u[1]))
-                    start_d = _from_iso(u[2])
-                    rest = tuple(u[3:]) if len(u) > 3 else ()
-                    out.append((end_d, b, start_d, *rest))
+                if isinstance(u, list) and len(u) == 4:
+                    out.append((_from_iso(u[0]), u[1], u[2], _from_iso(u[3])))
                 else:
                     out.append(u)
         return out
 
     if field_name == "ships":
-        # formaty:
-        # 7: (arrival_to_eu, arrival_back, load, status, pending, name, ship_type)
-        # 6: (arrival_to_eu, arrival_back, load, status, pending, name)
-        # 5: (arrival_to_eu, arrival_back, load, status, pending)
-        out = []
+        # rekordy Ship zapisane jako listy; stare zapisy: 5/6/7 elementów (Ship.from_tuple)
+        ships = []
         if isinstance(value, list):
             for s in value:
-                if isinstance(s, list) and len(s) == 7:
-                    arrival_to_eu = _from_iso(s[0]) if s[0] else None
-                    arrival_back = _from_iso(s[1]) if s[1] else None
-                    load = deepcopy(s[2]) if isinstance(s[2], dict) else {}
-                    status = s[3]
-                    pending = s[4]
-                    name = s[5]
-                    ship_type = s[6]
-                    out.append((arrival_to_eu, arrival_back, load, status, pending, name, ship_type))
-
-                elif isinstance(s, list) and len(s) == 6:
-                    arrival_to_eu = _from_iso(s[0]) if s[0] else None
-                    arrival_back = _from_iso(s[1]) if s[1] else None
-                    load = deepcopy(s[2]) if isinstance(s[2], dict) else {}
-                    status = s[3]
-                    pending = s[4]
-                    name = s[5]
-                    out.append((arrival_to_eu, arrival_back, load, status, pending, name))
-
-                elif isinstance(s, list) and len(s) == 5:
-                    arrival_to_eu = _from_iso(s[0]) if s[0] else None
-                    arrival_back = _from_iso(s[1]) if s[1] else None
-                    load = deepcopy(s[2]) if isinstance(s[2], dict) else {}
-                    status = s[3]
-                    pending = s[4]
-                    out.append((arrival_to_eu, arrival_back, load, status, pending))
-
-                else:
-                    out.append(s)
-        return out
+                if isinstance(s, list) and 5 <= len(s) <= 7:
+                    s = list(s)
+                    s[0] = _from_iso(s[0]) if s[0] else None
+                    s[1] = _from_iso(s[1]) if s[1] else None
+                    s[2] = deepcopy(s[2]) if isinstance(s[2], dict) else {}
+                    ships.append(Ship.from_tuple(s))
+        return Fleet(ships)
 
     if field_name == "map_grid":
-        # mapa to 2D lista dictów; przywróć tuple pos w buildingach w komórkach
+        # w zapisie mapa to 2D lista dictów; cell["building"] to lista id budynków
         if isinstance(value, list):
-            grid = deepcopy(value)
-            for row in grid:
-                if not isinstance(row, list):
-                    continue
-                for cell in row:
-                    if isinstance(cell, dict) and isinstance(cell.get("building"), list):
-                        cell["building"] = [_restore_positions_in_building(b) for b in cell["building"]]
-            return grid
+            return MapGrid.from_rows(value)
         return value
 
     return value
 
 
 def _migrate_state(version, state):
-    """Szkielet migracji na przyszłość."""
-    # Tu w przyszłości dopisujesz:
-    # if version == 1:
-    #     state.setdefault("event_flags", {})
+    """Podnosi stary zapis do SAVE_VERSION (na surowym JSON-ie, przed _restore_state_field)."""
+    if version < 2:
+        # v1: budynki bez id, ulepszenia wskazują indeks w liście, komórki mapy mają kopie dictów
+        buildings = state.get("buildings") or []
+        for i, b in enumerate(buildings):
+            b["id"] = i + 1
+
+        state["upgrades_in_progress"] = [
+            [u[0], u[1] + 1, *u[2:]] if isinstance(u, list) and len(u) >= 2 and isinstance(u[1], int) else u
+            for u in state.get("upgrades_in_progress") or []
+        ]
+
+        grid = state.get("map_grid")
+        if isinstance(grid, list):
+            for row in grid:
+                for cell in row:
+                    cell["building"] = []
+            for b in buildings:
+                y, x = b["pos"]
+                grid[y][x]["building"].append(b["id"])
     return state
 
 
@@ -261,12 +291,21 @@ def import_state(sim, payload, *, do_runtime_reset=True):
         version = 1
         state = payload if isinstance(payload, dict) else {}
 
-    state = _migrate_state(version, deepcopy(state))
+    with sim.profiler.frame("load"):
+        state = _migrate_state(version, deepcopy(state))
+
+        # tablice plemion wypełnią od zera native_prod/cap/stock z zapisu
+        sim.natives = NativeEconomy()
+
+        # ustaw pola z whitelisty
+        for f in SAVE_FIELDS:
+            if f in state:
+                setattr(sim, f, _restore_state_field(f, state[f]))
 
-    # ustaw pola z whitelisty
-    for f in SAVE_FIELDS:
-        if f in state:
-            setattr(sim, f, _restore_state_field(f, state[f]))
+        # nowa lista budynków → wektory produkcji do przeliczenia
+        sim.mark_production_dirty()
+        # kolejka zdarzeń nie jest zapisywana – odtwórz ją z list
+        sim.rebuild_schedule()
 
     # runtime reset po imporcie (żeby nie zostały stare tryby/okna)
     if do_runtime_reset:
@@ -310,7 +349,7 @@ def save_to_file(sim, name: str):
     name_safe = _sanitize_name(name)
     path = SAVE_DIR / f"{name_safe}.json"
 
-    payload = export_state(sim, version=1)
+    payload = export_state(sim, version=SAVE_VERSION)
 
     # metadane save'a (żeby ładnie pokazać w liście)
     st = payload["state"]